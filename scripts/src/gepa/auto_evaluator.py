@@ -6,6 +6,11 @@ Discovers a skill's existing test harness at runtime and builds a GEPA-compatibl
 evaluator. Zero manual configuration — reads triggers.test.ts to extract trigger
 prompts and construct the fitness function.
 
+This module holds the scoring core and the CLI. Sibling modules hold the rest:
+token_budget.py (token counting and limits), bm25.py (--matcher bm25),
+routing.py (route, confusion-matrix), scoring_server.py (serve) and watch.py
+(score-all --watch).
+
 Usage:
     # Score a skill (no optimization, no LLM calls)
     python auto_evaluator.py score --skill azure-deploy --skills-dir skills --tests-dir tests
@@ -13,20 +18,299 @@ Usage:
     # Optimize a skill (requires LLM API)
     python auto_evaluator.py optimize --skill azure-deploy --skills-dir skills --tests-dir tests
 
-    # Score all skills
-    python auto_evaluator.py score-all --skills-dir skills --tests-dir tests
+    # Checkpoint an optimization run, then continue it after an interruption
+    # (reflection-LM responses are cached in .sensei-cache/ and replayed on reruns)
+    python auto_evaluator.py optimize --skill azure-deploy --run-dir runs/azure-deploy
+    python auto_evaluator.py optimize --skill azure-deploy --run-dir runs/azure-deploy --resume
+
+    # Optimize every skill concurrently; the budget favours the lowest scorers
+    python auto_evaluator.py optimize-all --budget 400 --lm-concurrency 4 --format ndjson
+
+    # Score all skills (in parallel across 4 worker processes)
+    python auto_evaluator.py score-all --skills-dir skills --tests-dir tests --jobs 4
+
+    # Stream results as NDJSON, then sort/format them in a separate step
+    python auto_evaluator.py score-all --format ndjson | python auto_evaluator.py merge-scores --json
+
+    # Split score-all across CI nodes, then merge the partial results
+    python auto_evaluator.py score-all --shard 1/3 --format ndjson > shard-1.ndjson
+    python auto_evaluator.py merge-scores shard-*.ndjson --json
+
+    # On a PR, re-score only skills touched since the base branch; the rest come
+    # from a stored run, and score deltas vs that run are reported
+    python auto_evaluator.py score-all --since origin/main --baseline scores.json --json
 
     # JSON output
     python auto_evaluator.py score --skill azure-deploy --json
+
+    # Parsed test files are cached in .sensei-cache/; bypass or reset it with
+    python auto_evaluator.py score-all --no-cache
+    python auto_evaluator.py cache clear
+
+    # Route prompts across all skills; report which skills steal each other's prompts
+    python auto_evaluator.py route --prompt "deploy my app to azure"
+    python auto_evaluator.py confusion-matrix --skills-dir skills --tests-dir tests
+
+    # Keep a warm scorer running for editors/tooling (JSON-RPC 2.0, one message per line)
+    echo '{"jsonrpc": "2.0", "id": 1, "method": "score", "params": {"skill": "azure-deploy"}}' \\
+        | python auto_evaluator.py serve
+    python auto_evaluator.py serve --socket /tmp/sensei.sock
+
+    # Re-score skills as their SKILL.md or test files change
+    python auto_evaluator.py score-all --watch
+
+    # Score with house quality rules (JSON; see DEFAULT_QUALITY_RULES)
+    python auto_evaluator.py score-all --rules quality-rules.json
+
+    # Add a token_budget score from .token-limits.json (or --token-limits FILE)
+    python auto_evaluator.py score-all --token-limits
+
+    # Score triggers by BM25 over skill descriptions (threshold fitted to the tests)
+    python auto_evaluator.py score-all --matcher bm25
 """
 
 import argparse
+import codecs
+import fnmatch
+import functools
+import hashlib
+import heapq
+import itertools
 import json
+import math
+import mmap
 import os
+import random
 import re
+import sqlite3
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from token_budget import (
+    CHARS_PER_TOKEN,
+    TOKEN_LIMITS_FILE,
+    TokenLimits,
+    _relative_to_cwd,
+    estimate_tokens,
+    utf16_length,
+)
+
+if TYPE_CHECKING:
+    from bm25 import BM25Index
+
+
+# ── Profiling ──────────────────────────────────────────────────────────────
+
+class Profiler:
+    """Per-phase wall time and call counts, plus named counters.
+
+    Disabled by default; instrumented functions then cost one attribute check.
+    Phase times are inclusive (score_skill's time includes its nested phases).
+    Enable with --profile, or SENSEI_PROFILE=1 when the evaluator runs under
+    GEPA from another script.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.phases: dict[str, list] = {}   # name -> [calls, seconds]
+        self.counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, phase: str, seconds: float, calls: int = 1):
+        with self._lock:
+            entry = self.phases.setdefault(phase, [0, 0.0])
+            entry[0] += calls
+            entry[1] += seconds
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def reset(self):
+        with self._lock:
+            self.phases = {}
+            self.counters = {}
+
+    def snapshot(self) -> dict:
+        """Return phases and counters as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                "phases": {
+                    name: {"calls": calls, "seconds": round(seconds, 6)}
+                    for name, (calls, seconds) in sorted(self.phases.items())
+                },
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def merge(self, snapshot: dict):
+        """Add a snapshot taken in another process (e.g. a score-all worker)."""
+        for name, phase in snapshot["phases"].items():
+            self.record(name, phase["seconds"], phase["calls"])
+        with self._lock:
+            for name, n in snapshot["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self) -> str:
+        """Format the snapshot as a table."""
+        snap = self.snapshot()
+        lines = [f"\n{'Phase':<24} {'Calls':>9} {'Total (s)':>11} {'Avg (ms)':>10}", "─" * 57]
+        for name, phase in sorted(snap["phases"].items(), key=lambda kv: -kv[1]["seconds"]):
+            avg_ms = phase["seconds"] / phase["calls"] * 1000 if phase["calls"] else 0.0
+            lines.append(f"{name:<24} {phase['calls']:>9} {phase['seconds']:>11.4f} {avg_ms:>10.3f}")
+        if snap["counters"]:
+            lines.append("")
+            for name, n in snap["counters"].items():
+                lines.append(f"{name:<24} {n:>9}")
+        return "\n".join(lines)
+
+
+PROFILER = Profiler()
+PROFILER.enabled = bool(os.environ.get("SENSEI_PROFILE"))
+
+
+def profiled(phase: str):
+    """Decorator recording each call of the wrapped function under ``phase``."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                PROFILER.record(phase, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorate
+
+
+def _read_text(path: Path) -> str:
+    """Read a text file, counting files and bytes read when profiling."""
+    content = path.read_text()
+    if PROFILER.enabled:
+        PROFILER.count("files_read")
+        PROFILER.count("bytes_read", len(content.encode("utf-8")))
+    return content
+
+
+# ── Result types ───────────────────────────────────────────────────────────
+
+class TriggerResult(NamedTuple):
+    """One prompt's match against a skill: (triggered, matched, confidence)."""
+
+    triggered: bool
+    matched: list[str]
+    confidence: float
+
+    def to_dict(self) -> dict:
+        return {"triggered": self.triggered, "matched": self.matched, "confidence": self.confidence}
+
+
+@dataclass(slots=True)
+class Harness:
+    """A skill's discovered test harness.
+
+    Trigger prompts are interned tuples, so prompts repeated across trigger
+    files, skills and long-lived caches share one string object.
+    """
+
+    has_triggers: bool = False
+    has_integration: bool = False
+    has_unit: bool = False
+    should_trigger: tuple[str, ...] = ()
+    should_not_trigger: tuple[str, ...] = ()
+    _index: dict | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.should_trigger = tuple(map(sys.intern, self.should_trigger))
+        self.should_not_trigger = tuple(map(sys.intern, self.should_not_trigger))
+
+    @property
+    def prompts(self) -> tuple[str, ...]:
+        """Every trigger prompt: should-trigger, then should-not-trigger."""
+        return self.should_trigger + self.should_not_trigger
+
+    def prompt_index(self) -> dict[str, int]:
+        """Map each distinct prompt to a dense position, for array-backed verdicts."""
+        if self._index is None:
+            self._index = {p: i for i, p in enumerate(dict.fromkeys(self.prompts))}
+        return self._index
+
+    def to_dict(self) -> dict:
+        """The dict shape ``discover_test_harness`` used to return."""
+        return {
+            "has_triggers": self.has_triggers,
+            "has_integration": self.has_integration,
+            "has_unit": self.has_unit,
+            "trigger_prompts": {
+                "should_trigger": list(self.should_trigger),
+                "should_not_trigger": list(self.should_not_trigger),
+            },
+        }
+
+
+@dataclass(slots=True)
+class SkillScore:
+    """``score_skill`` result; ``to_dict`` gives the ``--json`` schema.
+
+    A skill that couldn't be scored carries only ``skill`` and ``error``.
+    """
+
+    skill: str
+    quality_score: float = 0.0
+    quality_detail: dict = field(default_factory=dict)
+    quality_feedback: list = field(default_factory=list)
+    has_triggers_test: bool = False
+    has_integration_test: bool = False
+    has_unit_test: bool = False
+    trigger_prompt_count: int = 0
+    trigger_accuracy: float | None = None
+    error: str | None = None
+
+    def to_dict(self) -> dict:
+        if self.error is not None:
+            return {"skill": self.skill, "error": self.error}
+        return {
+            "skill": self.skill,
+            "quality_score": self.quality_score,
+            "quality_detail": self.quality_detail,
+            "quality_feedback": self.quality_feedback,
+            "has_triggers_test": self.has_triggers_test,
+            "has_integration_test": self.has_integration_test,
+            "has_unit_test": self.has_unit_test,
+            "trigger_prompt_count": self.trigger_prompt_count,
+            "trigger_accuracy": self.trigger_accuracy,
+        }
+
+
+def _as_dict(result) -> dict:
+    """Return a result in its JSON form (``SkillScore``s are converted)."""
+    return result.to_dict() if isinstance(result, SkillScore) else result
 
 
 # ── Keyword matching (mirrors trigger-matcher.ts) ──────────────────────────
@@ -57,6 +341,7 @@ def stem(word: str) -> str:
     return word
 
 
+@profiled("keywords")
 def extract_keywords(skill_name: str, description: str) -> list[str]:
     """Extract keywords from skill name + description."""
     keywords = set()
@@ -75,114 +360,434 @@ def extract_keywords(skill_name: str, description: str) -> list[str]:
     return sorted(keywords)
 
 
-def check_trigger(prompt: str, keywords: list[str]) -> tuple[bool, list[str], float]:
-    """Check if a prompt triggers based on keyword matching with stemming."""
-    prompt_lower = prompt.lower()
-    matched = []
-    for kw in keywords:
-        kw_stem = stem(kw)
-        if kw in prompt_lower or kw_stem in prompt_lower:
-            matched.append(kw)
-            continue
-        for word in re.split(r"\s+", prompt_lower):
-            clean = re.sub(r"[^a-z0-9-]", "", word)
-            if clean and stem(clean) == kw_stem:
-                matched.append(kw)
-                break
-    confidence = len(matched) / max(len(keywords), 1)
-    triggered = len(matched) >= 2 or confidence >= 0.2
-    return triggered, matched, confidence
+_NON_WORD = re.compile(r"[^a-z0-9-]")
+
+
+def _trie_regex(patterns) -> str:
+    """Build a regex alternation shaped like a trie over ``patterns``.
+
+    At any position the regex matches the longest pattern that starts there.
+    """
+    trie: dict = {}
+    for pat in patterns:
+        node = trie
+        for ch in pat:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def render(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return f"(?:{body})?"
+        return body
+
+    return render(trie)
+
+
+class TriggerMatcher:
+    """Precompiled trigger matcher for a fixed keyword list.
+
+    Gives the same results as ``check_trigger(prompt, keywords)`` but builds its
+    indexes once: a stem → keyword index for whole-word stem matches, and a
+    single trie-shaped regex over every keyword and keyword stem for substring
+    matches. Each prompt is lowercased, tokenized and stemmed exactly once.
+    """
+
+    @profiled("trigger_compile")
+    def __init__(self, keywords: list[str]):
+        self.keywords = list(keywords)
+        self._stem_index: dict[str, list[int]] = {}
+        owners: dict[str, set[int]] = {}
+        for i, kw in enumerate(self.keywords):
+            kw_stem = stem(kw)
+            self._stem_index.setdefault(kw_stem, []).append(i)
+            owners.setdefault(kw, set()).add(i)
+            owners.setdefault(kw_stem, set()).add(i)
+
+        # An empty pattern is a substring of every prompt.
+        self._always = frozenset(owners.pop("", ()))
+
+        # The regex reports only the longest pattern at each position, so each
+        # pattern also credits every pattern it contains as a substring.
+        lengths = sorted({len(p) for p in owners})
+        self._closure: dict[str, frozenset[int]] = {}
+        for pat in owners:
+            hits = set()
+            for n in lengths:
+                if n > len(pat):
+                    break
+                for start in range(len(pat) - n + 1):
+                    hits.update(owners.get(pat[start : start + n], ()))
+            self._closure[pat] = frozenset(hits)
+
+        self._substring_re = (
+            re.compile(f"(?=({_trie_regex(owners)}))") if owners else None
+        )
+
+    @profiled("trigger_match")
+    def hits(self, prompt: str) -> set[int]:
+        """Return the indexes of the keywords that ``prompt`` matches."""
+        prompt_lower = prompt.lower()
+        found = set(self._always)
+        if self._substring_re is not None:
+            closure = self._closure
+            for pat in set(self._substring_re.findall(prompt_lower)):
+                found.update(closure[pat])
+        stem_index = self._stem_index
+        for word in prompt_lower.split():
+            clean = _NON_WORD.sub("", word)
+            if clean:
+                found.update(stem_index.get(stem(clean), ()))
+        return found
+
+    def match(self, prompt: str) -> TriggerResult:
+        """Match one prompt; returns (triggered, matched_keywords, confidence)."""
+        found = self.hits(prompt)
+        matched = [kw for i, kw in enumerate(self.keywords) if i in found]
+        confidence = len(matched) / max(len(self.keywords), 1)
+        triggered = len(matched) >= 2 or confidence >= 0.2
+        return TriggerResult(triggered, matched, confidence)
+
+    def match_many(self, prompts) -> list[TriggerResult]:
+        """Match a batch of prompts; same result as ``match`` for each one."""
+        return [self.match(p) for p in prompts]
+
+
+@functools.lru_cache(maxsize=256)
+def _keyword_matcher(keywords: tuple[str, ...]) -> TriggerMatcher:
+    return TriggerMatcher(list(keywords))
+
+
+def check_trigger(prompt: str, keywords: list[str]) -> TriggerResult:
+    """Check if a prompt triggers based on keyword matching with stemming.
+
+    Matchers are cached per keyword list, so repeated calls with the same
+    keywords don't recompile them.
+    """
+    return _keyword_matcher(tuple(keywords)).match(prompt)
 
 
 # ── Test harness discovery ─────────────────────────────────────────────────
 
 def parse_trigger_arrays(test_file: Path) -> dict:
-    """Parse shouldTrigger/shouldNotTrigger arrays from a triggers.test.ts file.
-
-    Uses regex to extract string arrays without needing a TS parser.
-    """
-    content = test_file.read_text()
-    result = {"should_trigger": [], "should_not_trigger": []}
-
-    # Match arrays like: shouldTrigger = ["...", "..."] or const shouldTriggerPrompts = [...]
-    for var_pattern, key in [
-        (r"shouldTrigger(?:Prompts)?(?:\s*:\s*\w+(?:\[\])?)?\s*=\s*\[", "should_trigger"),
-        (r"shouldNotTrigger(?:Prompts)?(?:\s*:\s*\w+(?:\[\])?)?\s*=\s*\[", "should_not_trigger"),
-    ]:
-        match = re.search(var_pattern, content, re.IGNORECASE)
-        if match:
-            start = match.end()
-            # Find the closing bracket, handling nested strings
+    """Parse shouldTrigger/shouldNotTrigger arrays from a triggers.test.ts file."""
+    return parse_trigger_source(_read_text(test_file))
+
+
+# Variable names (lowercased) whose array literals hold trigger prompts.
+TRIGGER_ARRAY_NAMES = {
+    "shouldtrigger": "should_trigger",
+    "shouldtriggerprompts": "should_trigger",
+    "shouldnottrigger": "should_not_trigger",
+    "shouldnottriggerprompts": "should_not_trigger",
+}
+
+_TS_TOKEN = re.compile(
+    r"""
+      (?P<ws>\s+)
+    | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+    | (?P<string>"(?:[^"\\\n]|\\.)*"?|'(?:[^'\\\n]|\\.)*'?|`(?:[^`\\]|\\.)*`?)
+    | (?P<ident>[A-Za-z_$][\w$]*)
+    | (?P<number>\d[\w.]*)
+    | (?P<punct>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_TS_REGEX_LITERAL = re.compile(r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+_TS_ESCAPE = re.compile(r"\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|\r\n|.)", re.DOTALL)
+_TS_SIMPLE_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+# After these keywords a "/" starts a regex literal rather than a division.
+_TS_REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "new", "void", "yield", "await"}
+# Declaration stages: name -> [: type[]] -> = -> [ (the type name itself is any identifier).
+_TS_DECL_STAGES = {
+    ("name", ":"): "colon",
+    ("name", "="): "assign",
+    ("type", "["): "type[",
+    ("type[", "]"): "type[]",
+    ("type", "="): "assign",
+    ("type[]", "="): "assign",
+}
+
+
+def _ts_unescape(match: re.Match) -> str:
+    esc = match.group(1)
+    if esc[0] == "u" and len(esc) > 1:
+        return chr(int(esc[1:].strip("{}"), 16))
+    if esc[0] == "x" and len(esc) == 3:
+        return chr(int(esc[1:], 16))
+    if esc in ("\n", "\r\n", "\r", "\u2028", "\u2029"):
+        return ""  # line continuation
+    return _TS_SIMPLE_ESCAPES.get(esc, esc)
+
+
+def _ts_string_value(token: str) -> str:
+    """Decode a TS string or template literal token (quotes included)."""
+    quote = token[0]
+    body = token[1:-1] if len(token) > 1 and token[-1] == quote else token[1:]
+    return _TS_ESCAPE.sub(_ts_unescape, body) if "\\" in body else body
+
+
+@profiled("ts_parse")
+def parse_trigger_source(content: str) -> dict:
+    """Parse shouldTrigger/shouldNotTrigger arrays from triggers.test.ts source.
+
+    A small single-pass lexer walks the file once, skipping comments and regex
+    literals and decoding ", ' and ` string literals with their escapes, so
+    brackets and quotes inside strings are handled. Every array assigned to a
+    trigger variable (``shouldTrigger = [...]``, ``const shouldTriggerPrompts:
+    string[] = [...]``, ...) is collected, in source order, without duplicates
+    or empty strings. Template ``${...}`` placeholders are kept verbatim.
+    """
+    found = {"should_trigger": [], "should_not_trigger": []}
+
+    key = None          # trigger array being declared or collected
+    stage = ""          # position within `name [: type[]] = [`
+    depth = 0           # bracket depth inside the array being collected
+    prev = ""           # previous significant token, to spot regex literals
+    pos = 0
+    end = len(content)
+    while pos < end:
+        m = _TS_TOKEN.match(content, pos)
+        kind, text = m.lastgroup, m.group()
+        pos = m.end()
+        if kind == "ws" or kind == "comment":
+            continue
+        if text == "/" and (not prev or prev in _TS_REGEX_KEYWORDS or prev in "(,=:[!&|?{};+-*%<>~^"):
+            regex = _TS_REGEX_LITERAL.match(content, m.start())
+            if regex:
+                pos = regex.end()
+                prev = "regex"
+                continue
+        prev = text if kind in ("ident", "punct") else kind
+
+        if depth:
+            if kind == "string":
+                found[key].append(_ts_string_value(text))
+            elif text == "[":
+                depth += 1
+            elif text == "]":
+                depth -= 1
+                if not depth:
+                    key = None
+            continue
+
+        if kind == "ident" and text.lower() in TRIGGER_ARRAY_NAMES:
+            key, stage = TRIGGER_ARRAY_NAMES[text.lower()], "name"
+            continue
+        if key is None:
+            continue
+        transition = _TS_DECL_STAGES.get((stage, text))
+        if stage == "colon" and kind == "ident":
+            stage = "type"
+        elif stage == "assign" and text == "[":
             depth = 1
-            i = start
-            while i < len(content) and depth > 0:
-                if content[i] == "[":
-                    depth += 1
-                elif content[i] == "]":
-                    depth -= 1
-                i += 1
-            array_text = content[start : i - 1]
-            # Strip single-line comments to avoid extracting commented-out prompts
-            array_text = re.sub(r"//.*$", "", array_text, flags=re.MULTILINE)
-            # Strip block comments
-            array_text = re.sub(r"/\*.*?\*/", "", array_text, flags=re.DOTALL)
-            # Extract strings from the array — handle ", ', and ` delimiters
-            # Use separate passes for each quote type to avoid apostrophe truncation
-            strings = re.findall(r'"([^"]*)"', array_text)
-            strings += re.findall(r"'([^']*)'", array_text)
-            strings += re.findall(r"`([^`]*)`", array_text)
-            # Deduplicate while preserving order
-            seen = set()
-            unique = []
-            for s in strings:
-                if s and s not in seen:
-                    seen.add(s)
-                    unique.append(s)
-            result[key] = unique
+        elif transition:
+            stage = transition
+        else:
+            key = None
 
+    result = {}
+    for name, strings in found.items():
+        result[name] = list(dict.fromkeys(s for s in strings if s))
     return result
 
 
-def discover_test_harness(tests_dir: Path, skill_name: str) -> dict:
-    """Discover available test files for a skill.
+# Directory and file names skipped while scanning the tests tree (fnmatch globs).
+DEFAULT_TEST_IGNORES = ("node_modules", ".git")
+
+TEST_FILE_FLAGS = {
+    "integration.test.ts": "has_integration",
+    "unit.test.ts": "has_unit",
+}
+
+
+def _ignored(name: str, ignore) -> bool:
+    return any(fnmatch.fnmatchcase(name, pat) for pat in ignore)
+
+
+@profiled("discovery")
+def scan_skill_tests(skill_test_dir: Path, ignore=DEFAULT_TEST_IGNORES) -> dict:
+    """Find a skill's test files with one ``os.scandir`` walk of its test dir.
+
+    Searches nested dirs (like microsoft-foundry/foundry-agent/) depth-first in
+    name order, skipping entries whose name matches an ``ignore`` glob.
 
     Returns dict with:
-      - has_triggers: bool
+      - trigger_files: [Path, ...] for every triggers.test.ts
       - has_integration: bool
       - has_unit: bool
-      - trigger_prompts: {should_trigger: [...], should_not_trigger: [...]}
-    """
-    skill_test_dir = tests_dir / skill_name
-    result = {
-        "has_triggers": False,
-        "has_integration": False,
-        "has_unit": False,
-        "trigger_prompts": {"should_trigger": [], "should_not_trigger": []},
-    }
+    """
+    found = {"trigger_files": [], "has_integration": False, "has_unit": False}
+    stack = [skill_test_dir]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            if _ignored(entry.name, ignore):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.name == "triggers.test.ts":
+                found["trigger_files"].append(Path(entry.path))
+            elif entry.name in TEST_FILE_FLAGS:
+                found[TEST_FILE_FLAGS[entry.name]] = True
+        stack.extend(reversed(subdirs))
+    return found
+
+
+def index_tests_tree(tests_dir: Path, ignore=DEFAULT_TEST_IGNORES) -> dict[str, dict]:
+    """Index every skill's test files in a single walk of ``tests_dir``.
+
+    Returns {skill_name: scan_skill_tests(...)} for each top-level directory.
+    """
+    index = {}
+    try:
+        with os.scandir(tests_dir) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return index
+    for entry in entries:
+        if entry.is_dir() and not _ignored(entry.name, ignore):
+            index[entry.name] = scan_skill_tests(Path(entry.path), ignore)
+    return index
 
-    if not skill_test_dir.exists():
-        return result
 
-    # Check for test files (search recursively for nested dirs like microsoft-foundry/foundry-agent/)
-    for trigger_file in skill_test_dir.rglob("triggers.test.ts"):
-        result["has_triggers"] = True
-        prompts = parse_trigger_arrays(trigger_file)
-        result["trigger_prompts"]["should_trigger"].extend(prompts["should_trigger"])
-        result["trigger_prompts"]["should_not_trigger"].extend(prompts["should_not_trigger"])
+def discover_test_harness(
+    tests_dir: Path,
+    skill_name: str,
+    harness_cache: "HarnessCache | None" = None,
+    test_files: dict | None = None,
+) -> Harness:
+    """Discover available test files for a skill.
 
-    for _ in skill_test_dir.rglob("integration.test.ts"):
-        result["has_integration"] = True
-        break
+    ``test_files`` is the skill's entry from ``index_tests_tree``; without it
+    the skill's test dir is scanned with the default ignores. Prompts from
+    every trigger file are concatenated in file order; ``Harness.to_dict()``
+    gives the old dict form.
+    """
+    if test_files is None:
+        test_files = scan_skill_tests(tests_dir / skill_name)
+    should_trigger, should_not_trigger = [], []
+    for trigger_file in test_files["trigger_files"]:
+        if harness_cache is not None:
+            prompts = harness_cache.trigger_arrays(trigger_file)
+        else:
+            prompts = parse_trigger_arrays(trigger_file)
+        should_trigger.extend(prompts["should_trigger"])
+        should_not_trigger.extend(prompts["should_not_trigger"])
+
+    return Harness(
+        has_triggers=bool(test_files["trigger_files"]),
+        has_integration=test_files["has_integration"],
+        has_unit=test_files["has_unit"],
+        should_trigger=tuple(should_trigger),
+        should_not_trigger=tuple(should_not_trigger),
+    )
 
-    for _ in skill_test_dir.rglob("unit.test.ts"):
-        result["has_unit"] = True
-        break
 
-    return result
+# ── Harness cache ──────────────────────────────────────────────────────────
+
+# Bump when parse_trigger_source output changes so stale entries are dropped.
+HARNESS_CACHE_VERSION = 2
+
+# Files modified more recently than this may change again without changing
+# their mtime, so stat-keyed caches don't trust them.
+MTIME_GRANULARITY_NS = 2_000_000_000
+DEFAULT_CACHE_DIR = Path(".sensei-cache")
+
+
+class HarnessCache:
+    """Persistent cache of parsed triggers.test.ts files.
+
+    Stored in ``<cache_dir>/harness.sqlite`` and keyed by resolved path. An
+    entry is reused while the file's mtime and size are unchanged; if they
+    changed but the content hash still matches, the parse is reused and the
+    stat data refreshed. SQLite serializes writers, so score-all worker
+    processes can share one cache file.
+    """
+
+    FILENAME = "harness.sqlite"
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR):
+        self.path = Path(cache_dir) / self.FILENAME
+        self._conn = None
+
+    def __getstate__(self):
+        # Connections can't cross process boundaries; workers reconnect lazily.
+        return {"path": self.path, "_conn": None}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            if conn.execute("PRAGMA user_version").fetchone()[0] != HARNESS_CACHE_VERSION:
+                conn.execute("DROP TABLE IF EXISTS trigger_files")
+                conn.execute(f"PRAGMA user_version = {HARNESS_CACHE_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS trigger_files ("
+                " path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL,"
+                " size INTEGER NOT NULL, sha256 TEXT NOT NULL, prompts TEXT NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def trigger_arrays(self, test_file: Path) -> dict:
+        """Return ``parse_trigger_arrays(test_file)``, from the cache when valid."""
+        try:
+            conn = self._connect()
+            key = str(test_file.resolve())
+            st = test_file.stat()
+            row = conn.execute(
+                "SELECT mtime_ns, size, sha256, prompts FROM trigger_files WHERE path = ?",
+                (key,),
+            ).fetchone()
+            # A file written within the mtime granularity of the last parse could
+            # change without changing its stat data, so recent files are re-hashed.
+            recent = time.time_ns() - st.st_mtime_ns < MTIME_GRANULARITY_NS
+            if row and (row[0], row[1]) == (st.st_mtime_ns, st.st_size) and not recent:
+                PROFILER.count("harness_cache_hits")
+                return json.loads(row[3])
+
+            PROFILER.count("harness_cache_misses")
+            content = _read_text(test_file)
+            digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            if row and row[2] == digest:
+                prompts = row[3]
+            else:
+                prompts = json.dumps(parse_trigger_source(content))
+            conn.execute(
+                "INSERT OR REPLACE INTO trigger_files VALUES (?, ?, ?, ?, ?)",
+                (key, st.st_mtime_ns, st.st_size, digest, prompts),
+            )
+            conn.commit()
+            return json.loads(prompts)
+        except sqlite3.Error as e:
+            print(f"Warning: harness cache unavailable ({e}), parsing directly", file=sys.stderr)
+            return parse_trigger_arrays(test_file)
+
+    def clear(self) -> bool:
+        """Delete the cache file. Returns True if there was one to delete."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self.path.exists():
+            self.path.unlink()
+            return True
+        return False
 
 
 # ── Content quality scorer ─────────────────────────────────────────────────
 
+@profiled("frontmatter")
 def parse_frontmatter(content: str) -> tuple[dict, str]:
     """Parse YAML frontmatter and return (metadata_dict, body).
 
@@ -197,32 +802,408 @@ def parse_frontmatter(content: str) -> tuple[dict, str]:
 
     fm_text = content[3:end_idx].strip()
     body = content[end_idx + 3:].strip()
+    return _parse_frontmatter_text(fm_text), body
+
 
+def _parse_frontmatter_text(fm_text: str) -> dict:
     metadata = {}
     for line in fm_text.split("\n"):
         if ":" in line:
             key, _, value = line.partition(":")
             metadata[key.strip()] = value.strip().strip('"').strip("'")
+    return metadata
+
+
+def _decode(data: bytes, final: bool = True) -> str:
+    """Decode UTF-8 bytes the way Path.read_text() does, newlines included.
+
+    With ``final=False`` a multi-byte character cut off at the end is dropped.
+    """
+    text = codecs.getincrementaldecoder("utf-8")().decode(data, final)
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+class _TextView:
+    """The body interface of ``SkillDocument`` over an in-memory string."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def lower(self) -> str:
+        return self.text.lower()
+
+    def head(self, n: int) -> str:
+        return self.text[:n]
+
+    def first_lines(self, n: int) -> list[str]:
+        return self.text.strip().split("\n")[:n]
+
+
+class SkillDocument:
+    """Lazy, mmap-backed reader for a SKILL.md file.
 
-    return metadata, body
+    The frontmatter delimiters are found on the raw bytes. The description,
+    the first characters and lines of the body, and section headings are
+    decoded on demand; full-body checks search ``body()``, a zero-copy view of
+    the mapped body bytes, case-insensitively. Matches what
+    ``parse_frontmatter`` and ``read_text()`` give for UTF-8 files, except
+    that byte-level matching has ASCII semantics: only ASCII letters fold
+    case, and ``\\s`` doesn't match Unicode whitespace.
 
+    Use as a context manager so the mapping is closed promptly.
+    """
 
-def score_content_quality(skill_md_content: str, frontmatter: dict | None = None) -> tuple[float, dict]:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # mmap can't map an empty file.
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.size = size
+        PROFILER.count("files_read")
+        PROFILER.count("bytes_mapped", size)
+
+        self._fm_span = None
+        self.body_start = 0
+        if self._buf[:3] == b"---":
+            end = self._buf.find(b"---", 3)
+            if end != -1:
+                self._fm_span = (3, end)
+                self.body_start = end + 3
+        self._frontmatter = None
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def frontmatter(self) -> dict:
+        """Parsed frontmatter metadata ({} when there is none)."""
+        if self._frontmatter is None:
+            if self._fm_span is None:
+                self._frontmatter = {}
+            else:
+                start, end = self._fm_span
+                self._frontmatter = _parse_frontmatter_text(_decode(self._buf[start:end]).strip())
+        return self._frontmatter
+
+    @property
+    def description(self) -> str:
+        return self.frontmatter.get("description", "")
+
+    def _body_text(self, enough) -> str:
+        """Decode a growing prefix of the body until ``enough(text, at_end)``."""
+        chunk = 4096
+        while True:
+            stop = min(self.body_start + chunk, self.size)
+            at_end = stop == self.size
+            text = _decode(self._buf[self.body_start:stop], final=at_end)
+            if at_end:
+                return text.strip() if self._fm_span else text
+            # A trailing "\r" may still pair with a "\n" beyond the chunk.
+            text = text[:-1] if text.endswith("\n") else text
+            if self._fm_span:
+                text = text.lstrip()
+            if enough(text):
+                return text
+            chunk *= 4
+
+    def head(self, n: int) -> str:
+        """Return the first ``n`` characters of the body."""
+        # Stop once a non-space character follows the first n, so no trailing
+        # whitespace that strip() would remove falls inside them.
+        return self._body_text(lambda text: text[n:].strip() != "")[:n]
+
+    def first_lines(self, n: int) -> list[str]:
+        """Return the first ``n`` lines of the (stripped) body."""
+        text = self._body_text(lambda text: text.strip().count("\n") >= n)
+        return text.strip().split("\n")[:n]
+
+    def tokens(self) -> int:
+        """Estimate the whole file's tokens, as ``count_file_tokens`` does."""
+        return -(-utf16_length(self._buf) // CHARS_PER_TOKEN)
+
+    def body(self) -> memoryview:
+        """Return a view of the body bytes without copying them.
+
+        Release it (``with doc.body() as view:``) before the document closes.
+        """
+        return memoryview(self._buf)[self.body_start:]
+
+    def headings(self) -> list[tuple[int, str]]:
+        """Return (level, title) for each Markdown heading in the body."""
+        return [
+            (len(m.group(1)), _decode(m.group(2)).strip())
+            for m in _HEADING_RE.finditer(self._buf, self.body_start)
+        ]
+
+
+_HEADING_RE = re.compile(rb"^(#{1,6})[ \t]+([^\r\n]+)", re.MULTILINE)
+
+
+# ── Content quality rules ──────────────────────────────────────────────────
+
+# Rule kinds:
+#   required  — scores 1.0 if any of its literals ("any") or regexes ("regex")
+#               occurs, else 0.0 plus its feedback.
+#   forbidden — scores 0.0 if any of its "patterns" occurs, with the feedback
+#               of the first pattern (in list order) that does; else 1.0.
+#   note      — adds its feedback when it matches; not scored.
+# Matching is case-insensitive: the text is lowercased, literals are
+# lowercased, and regexes must be written in lowercase. Scope "body"
+# (default) searches the body; "description+body" searches the frontmatter
+# description joined to the body with a space (literals only).
+DEFAULT_QUALITY_RULES = [
+    # Required body sections (execution-focused, not routing)
+    {"kind": "required", "name": "has_rules", "any": ["## rule", "# rule"],
+     "feedback": "Missing '## Rules' section"},
+    {"kind": "required", "name": "has_steps", "any": ["## step", "# step"],
+     "feedback": "Missing '## Steps' section"},
+    # Routing patterns — check frontmatter description (where routing belongs)
+    {"kind": "required", "name": "has_use_for", "any": ["use for:"], "scope": "description+body",
+     "feedback": "Missing 'USE FOR:' pattern (best in frontmatter description)"},
+    {"kind": "required", "name": "has_when", "any": ["when:"], "scope": "description+body",
+     "feedback": "Missing 'WHEN:' pattern (best in frontmatter description)"},
+    # DO NOT USE FOR: is contextual — not penalized or required.
+    # In multi-skill environments (10+ skills), anti-triggers cause keyword
+    # contamination on fast-pattern-matching models. Safe for small skill sets.
+    {"kind": "note", "any": ["do not use for:"],
+     "feedback": "Has 'DO NOT USE FOR:' — safe for small skill sets, risky for 10+ skills"},
+    {"kind": "forbidden", "name": "no_bad_patterns", "patterns": [
+        {"regex": r"api[_-]?key\s*[:=]", "feedback": "Contains API key pattern"},
+        {"regex": r"password\s*[:=]", "feedback": "Contains password pattern"},
+        {"regex": r"todo|fixme|hack", "feedback": "Contains TODO/FIXME markers"},
+    ]},
+]
+
+RULE_KINDS = ("required", "forbidden", "note")
+RULE_SCOPES = ("body", "description+body")
+
+
+class QualityRules:
+    """A declarative rule set compiled into one matcher.
+
+    Every literal and regex of every rule becomes an alternative of a single
+    regex run over the lowercased body, or case-insensitively over a
+    ``SkillDocument``'s mapped bytes so no copy is made. Each search stops at
+    the next position where some check matches, and only then are the
+    still-undecided checks tried there. The body is scanned once however many
+    rules there are, and the scan ends early once every rule is decided.
+    """
+
+    def __init__(self, rules: list[dict]):
+        self.rules = rules
+        # One check per literal/regex: (rule index, regex source, literal or None).
+        self._checks = []
+        for r, rule in enumerate(rules):
+            for literal, regex in _rule_entries(r, rule):
+                source = re.escape(literal.lower()) if literal is not None else regex
+                self._checks.append((r, source, literal))
+        # Bytes patterns are compiled on first use, for SkillDocument bodies.
+        self._compiled = {str: self._compile(str)}
+        self._description_checks = [
+            i for i, (r, _, _) in enumerate(self._checks)
+            if rules[r].get("scope", "body") == "description+body"
+        ]
+
+    def _compile(self, kind):
+        sources = [src if kind is str else src.encode("utf-8") for _, src, _ in self._checks]
+        sep = "|" if kind is str else b"|"
+        # Bytes patterns search the raw body: ASCII-only IGNORECASE matches
+        # the way lowercasing the bytes first would.
+        flags = 0 if kind is str else re.IGNORECASE
+        return re.compile(sep.join(sources), flags), [re.compile(src, flags) for src in sources]
+
+    @classmethod
+    def load(cls, path: Path) -> "QualityRules":
+        """Load rules from a JSON file.
+
+        The file holds a list of rules, or ``{"rules": [...]}``; with
+        ``"include_defaults": true`` they are appended to the default rules.
+        """
+        try:
+            config = json.loads(Path(path).read_text())
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Cannot load rules from {path}: {e}") from None
+        if isinstance(config, list):
+            return cls(config)
+        rules = config.get("rules", [])
+        if config.get("include_defaults"):
+            rules = DEFAULT_QUALITY_RULES + rules
+        return cls(rules)
+
+    def __getstate__(self):
+        return {"rules": self.rules}
+
+    def __setstate__(self, state):
+        self.__init__(state["rules"])
+
+    def find(self, content, description: str = "") -> set[int]:
+        """Return the indices of the checks that match.
+
+        ``content`` is a ``SkillDocument`` or ``_TextView``; checks scoped to
+        "description+body" also see ``description``. Checks that can no
+        longer change a rule's outcome are skipped.
+        """
+        found = set()
+        pending = dict.fromkeys(range(len(self._checks)))
+
+        def hit(i):
+            found.add(i)
+            r = self._checks[i][0]
+            # Any match decides a required rule or note; the first pattern in
+            # list order decides a forbidden rule, so only earlier ones remain.
+            for j in list(pending):
+                if self._checks[j][0] == r and (j > i or self.rules[r]["kind"] != "forbidden"):
+                    del pending[j]
+
+        if self._description_checks:
+            desc_lower = description.lower()
+            _, checks = self._compiled[str]
+            for i in self._description_checks:
+                # Also covers matches across the join of description + " " + body.
+                k = len(self._checks[i][2]) - 1
+                join = desc_lower[len(desc_lower) - k:] + " " + content.head(k).lower() if k else " "
+                if i in pending and (checks[i].search(desc_lower) or checks[i].search(join)):
+                    hit(i)
+        if not pending:
+            return found
+
+        if isinstance(content, SkillDocument):
+            if bytes not in self._compiled:
+                self._compiled[bytes] = self._compile(bytes)
+            with content.body() as text:
+                self._scan(text, self._compiled[bytes], pending, hit)
+        else:
+            self._scan(content.lower(), self._compiled[str], pending, hit)
+        return found
+
+    @staticmethod
+    def _scan(text, compiled, pending: dict, hit):
+        """Call ``hit`` for each pending check at the next position any check matches."""
+        matcher, checks = compiled
+        pos = 0
+        while pending:
+            m = matcher.search(text, pos)
+            if m is None:
+                break
+            pos = m.start()
+            for i in list(pending):
+                if i in pending and checks[i].match(text, pos):
+                    hit(i)
+            pos += 1
+
+    def evaluate(self, content, description: str = "") -> tuple[dict, list[str]]:
+        """Return ({rule name: score}, feedback) for a body and description."""
+        first_hit = {}
+        for i in sorted(self.find(content, description)):
+            first_hit.setdefault(self._checks[i][0], i)
+        first_check = {}
+        for i, (r, _, _) in enumerate(self._checks):
+            first_check.setdefault(r, i)
+
+        scores = {}
+        feedback = []
+        for r, rule in enumerate(self.rules):
+            matched = r in first_hit
+            if rule["kind"] == "required":
+                scores[rule["name"]] = 1.0 if matched else 0.0
+                if not matched:
+                    feedback.append(rule["feedback"])
+            elif rule["kind"] == "note":
+                if matched:
+                    feedback.append(rule["feedback"])
+            else:
+                scores[rule["name"]] = 0.0 if matched else 1.0
+                if matched:
+                    feedback.append(rule["patterns"][first_hit[r] - first_check[r]]["feedback"])
+        return scores, feedback
+
+
+def _rule_entries(index: int, rule: dict) -> list[tuple[str | None, str | None]]:
+    """Validate a rule and return its (literal, regex) pairs in order."""
+    kind = rule.get("kind")
+    label = rule.get("name") or f"rule {index}"
+    if kind not in RULE_KINDS:
+        raise ValueError(f"{label}: unknown kind {kind!r} (expected one of {RULE_KINDS})")
+    if kind != "note" and not rule.get("name"):
+        raise ValueError(f"{label}: {kind} rules need a 'name'")
+    scope = rule.get("scope", "body")
+    if scope not in RULE_SCOPES:
+        raise ValueError(f"{label}: unknown scope {scope!r} (expected one of {RULE_SCOPES})")
+
+    if kind == "forbidden":
+        patterns = rule.get("patterns") or []
+        if any("feedback" not in p for p in patterns):
+            raise ValueError(f"{label}: every forbidden pattern needs a 'feedback'")
+        entries = [(p.get("literal"), p.get("regex")) for p in patterns]
+    else:
+        if "feedback" not in rule:
+            raise ValueError(f"{label}: missing 'feedback'")
+        entries = [(lit, None) for lit in rule.get("any", [])]
+        entries += [(None, rx) for rx in rule.get("regex", [])]
+    if not entries:
+        raise ValueError(f"{label}: nothing to match")
+
+    for literal, regex in entries:
+        if (literal is None) == (regex is None):
+            raise ValueError(f"{label}: each pattern needs exactly one of 'literal' or 'regex'")
+        if literal == "":
+            raise ValueError(f"{label}: empty literal")
+        if regex is None:
+            continue
+        if scope != "body":
+            raise ValueError(f"{label}: scope {scope!r} supports literals only")
+        # Uppercase letters outside escapes (\S, \W, ...) can't match lowercased text.
+        bare = re.sub(r"\\.|\(\?P", "", regex)
+        if bare != bare.lower():
+            raise ValueError(f"{label}: regex {regex!r} must be lowercase (it matches lowercased text)")
+        try:
+            re.compile(regex)
+        except re.error as e:
+            raise ValueError(f"{label}: invalid regex {regex!r}: {e}") from None
+    return entries
+
+
+DEFAULT_RULES = QualityRules(DEFAULT_QUALITY_RULES)
+
+
+@profiled("quality")
+def score_content_quality(
+    skill_md_content: "str | SkillDocument",
+    frontmatter: dict | None = None,
+    rules: QualityRules | None = None,
+    token_budget: tuple[int, int] | None = None,
+) -> tuple[float, dict]:
     """Score SKILL.md content quality. Pure Python, no LLM calls.
 
+    ``skill_md_content`` is the body text, or a ``SkillDocument`` whose body
+    is searched in place. ``rules`` defaults to ``DEFAULT_RULES``.
+    ``token_budget`` is (tokens, limit) for the whole SKILL.md; when given,
+    a "token_budget" score is added.
+
     Returns (score, detail_scores).
     """
     scores = {}
     feedback = []
-    content_lower = skill_md_content.lower()
+    if isinstance(skill_md_content, SkillDocument):
+        content = skill_md_content
+    else:
+        content = _TextView(skill_md_content)
 
     # Score the frontmatter description if available
     if frontmatter and frontmatter.get("description"):
         desc_text = frontmatter["description"]
     else:
         # Fallback: first non-heading paragraph from body
-        lines = skill_md_content.strip().split("\n")
-        desc_text = " ".join(l for l in lines[:5] if l.strip() and not l.startswith("#"))
+        lines = content.first_lines(5)
+        desc_text = " ".join(l for l in lines if l.strip() and not l.startswith("#"))
     if 150 <= len(desc_text) <= 1024:
         scores["description_length"] = 1.0
     elif len(desc_text) < 150:
@@ -232,46 +1213,18 @@ def score_content_quality(skill_md_content: str, frontmatter: dict | None = None
         scores["description_length"] = min(1.0, 1024 / len(desc_text))
         feedback.append(f"Description too long ({len(desc_text)} chars, max 1024)")
 
-    # Required body sections (execution-focused, not routing)
-    for section in ["rule", "step"]:
-        if f"## {section}" in content_lower or f"# {section}" in content_lower:
-            scores[f"has_{section}s"] = 1.0
-        else:
-            scores[f"has_{section}s"] = 0.0
-            feedback.append(f"Missing '## {section.title()}s' section")
+    description = (frontmatter or {}).get("description", "")
+    rule_scores, rule_feedback = (rules or DEFAULT_RULES).evaluate(content, description)
+    scores.update(rule_scores)
+    feedback.extend(rule_feedback)
 
-    # Routing patterns — check frontmatter description (where routing belongs)
-    desc_lower = (frontmatter or {}).get("description", "").lower() if frontmatter else ""
-    combined = desc_lower + " " + content_lower
-    for pattern, label in [
-        ("use for:", "has_use_for"),
-        ("when:", "has_when"),
-    ]:
-        if pattern in combined:
-            scores[label] = 1.0
+    if token_budget is not None:
+        tokens, limit = token_budget
+        if tokens <= limit:
+            scores["token_budget"] = 1.0
         else:
-            scores[label] = 0.0
-            feedback.append(f"Missing '{pattern.upper()}' pattern (best in frontmatter description)")
-
-    # DO NOT USE FOR: is contextual — not penalized or required.
-    # In multi-skill environments (10+ skills), anti-triggers cause keyword
-    # contamination on fast-pattern-matching models. Safe for small skill sets.
-    if "do not use for:" in content_lower:
-        feedback.append("Has 'DO NOT USE FOR:' — safe for small skill sets, risky for 10+ skills")
-
-    # Bad patterns
-    bad = [
-        (r"api[_-]?key\s*[:=]", "Contains API key pattern"),
-        (r"password\s*[:=]", "Contains password pattern"),
-        (r"TODO|FIXME|HACK", "Contains TODO/FIXME markers"),
-    ]
-    for pat, msg in bad:
-        if re.search(pat, skill_md_content, re.IGNORECASE):
-            scores["no_bad_patterns"] = 0.0
-            feedback.append(msg)
-            break
-    else:
-        scores["no_bad_patterns"] = 1.0
+            scores["token_budget"] = limit / tokens
+            feedback.append(f"Exceeds token limit: {tokens} tokens ({tokens - limit} over limit of {limit})")
 
     score = sum(scores.values()) / len(scores) if scores else 0.0
     return score, {"scores": scores, "feedback": feedback}
@@ -279,177 +1232,1159 @@ def score_content_quality(skill_md_content: str, frontmatter: dict | None = None
 
 # ── Composite evaluator builder ────────────────────────────────────────────
 
-def build_evaluator(skill_name: str, tests_dir: Path):
-    """Auto-build a GEPA evaluator for a skill from its test harness.
+class CandidateCache:
+    """Bounded, thread-safe LRU cache of per-candidate analysis results.
 
-    Returns a callable(candidate, example) -> (score, asi_dict).
+    Keyed by a SHA-256 hash of the candidate text. ``hits`` and ``misses``
+    count lookups since the cache was created.
     """
-    harness = discover_test_harness(tests_dir, skill_name)
 
-    def evaluator(candidate: str, example: dict) -> tuple[float, dict]:
-        import gepa.optimize_anything as oa
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, candidate: str, compute) -> dict:
+        """Return the cached entry for ``candidate``, computing it on a miss."""
+        key = hashlib.sha256(candidate.encode("utf-8")).hexdigest()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                PROFILER.count("evaluator_cache_hits")
+                return entry
+            self.misses += 1
+        PROFILER.count("evaluator_cache_misses")
+        # Compute outside the lock so parallel evaluator threads don't serialize.
+        entry = compute(candidate)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def info(self) -> dict:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+def _candidate_keywords(skill_name: str, candidate: str) -> list[str]:
+    """Extract routing keywords from a candidate SKILL.md."""
+    desc_lines = []
+    for line in candidate.split("\n"):
+        if line.strip() and not line.startswith("#"):
+            desc_lines.append(line)
+        if len(desc_lines) >= 5:
+            break
+    desc_text = " ".join(desc_lines)
+    return extract_keywords(skill_name, desc_text + " " + candidate[:500])
 
-        scores = {}
-        asi = {}
 
-        # 1. Content quality (always, fast)
-        frontmatter, body = parse_frontmatter(candidate)
-        quality_score, quality_detail = score_content_quality(body, frontmatter)
-        scores["quality"] = quality_score
-        if quality_detail["feedback"]:
-            asi["QualityIssues"] = "\n".join(quality_detail["feedback"])
+def _analyze_candidate(
+    skill_name: str,
+    candidate: str,
+    rules: QualityRules | None = None,
+    token_limit: int | None = None,
+    bm25: "BM25Index | None" = None,
+) -> dict:
+    """Run the candidate-level checks shared by every example.
 
-        # 2. Trigger accuracy (if tests discovered)
-        if harness["has_triggers"] and harness["trigger_prompts"]["should_trigger"]:
-            # Extract description from candidate for keyword matching
-            desc_lines = []
-            for line in candidate.split("\n"):
-                if line.strip() and not line.startswith("#"):
-                    desc_lines.append(line)
-                if len(desc_lines) >= 5:
-                    break
-            desc_text = " ".join(desc_lines)
-            keywords = extract_keywords(skill_name, desc_text + " " + candidate[:500])
+    Covers frontmatter, quality and keywords; trigger verdicts are filled in
+    lazily by ``_trigger_verdict`` and ``_trigger_suite``. With ``bm25``, the
+    candidate's description is matched by BM25 instead of keywords.
+    """
+    frontmatter, body = parse_frontmatter(candidate)
+    token_budget = (estimate_tokens(candidate), token_limit) if token_limit is not None else None
+    quality_score, quality_detail = score_content_quality(body, frontmatter, rules, token_budget)
+    if bm25 is not None:
+        matcher = bm25.matcher(skill_name, str(frontmatter.get("description", "")))
+        keywords = sorted(matcher.weights)
+    else:
+        keywords = _candidate_keywords(skill_name, candidate)
+        matcher = TriggerMatcher(keywords)
+    return {
+        "frontmatter": frontmatter,
+        "quality_score": quality_score,
+        "quality_detail": quality_detail,
+        "keywords": keywords,
+        "matcher": matcher,
+        "verdicts": None,
+        "suite": None,
+        "staged": None,
+    }
+
+
+class TriggerVerdicts:
+    """Memoized trigger verdicts for one candidate over a harness's prompts.
 
-            correct = 0
-            total = 0
-            trigger_failures = []
+    Verdicts for harness prompts live in flat arrays indexed by
+    ``Harness.prompt_index()``: a state byte (0 unknown, 1 not triggered,
+    2 triggered) and a confidence double. Matched keywords are only needed
+    for failures and example-mode ASI, so a prompt's are kept (as a tuple in
+    a lazily allocated slot list) only once ``result`` has asked for them.
+    Prompts outside the harness are memoized in a side dict.
+    """
+
+    __slots__ = ("matcher", "index", "state", "confidence", "matched", "extra")
 
-            for prompt in harness["trigger_prompts"]["should_trigger"]:
-                triggered, matched, conf = check_trigger(prompt, keywords)
+    def __init__(self, matcher, index: dict[str, int]):
+        self.matcher = matcher
+        self.index = index
+        self.state = bytearray(len(index))
+        self.confidence = array("d", bytes(8 * len(index)))
+        self.matched: list[tuple[str, ...] | None] | None = None
+        self.extra: dict[str, TriggerResult] = {}
+
+    def _store(self, prompt: str, result: TriggerResult) -> int | None:
+        i = self.index.get(prompt)
+        if i is None:
+            self.extra[prompt] = result
+        else:
+            self.state[i] = 2 if result.triggered else 1
+            self.confidence[i] = result.confidence
+        return i
+
+    def fill(self, prompts, results):
+        """Store precomputed ``TriggerResult``s, e.g. from ``match_many``."""
+        for prompt, result in zip(prompts, results):
+            self._store(prompt, result)
+
+    def verdict(self, prompt: str) -> tuple[bool, float]:
+        """Return (triggered, confidence), matching ``prompt`` on first use."""
+        i = self.index.get(prompt)
+        if i is None:
+            result = self.extra.get(prompt) or self.result(prompt)
+            return result.triggered, result.confidence
+        if not self.state[i]:
+            self._store(prompt, self.matcher.match(prompt))
+        return self.state[i] == 2, self.confidence[i]
+
+    def result(self, prompt: str) -> TriggerResult:
+        """Return the full ``TriggerResult``, matching ``prompt`` only on first use."""
+        i = self.index.get(prompt)
+        if i is None:
+            cached = self.extra.get(prompt)
+            if cached is None:
+                cached = self.extra[prompt] = self.matcher.match(prompt)
+            return cached
+        if self.matched is None:
+            self.matched = [None] * len(self.state)
+        matched = self.matched[i]
+        if matched is None:
+            result = self.matcher.match(prompt)
+            self._store(prompt, result)
+            self.matched[i] = tuple(result.matched)
+            return result
+        return TriggerResult(self.state[i] == 2, list(matched), self.confidence[i])
+
+
+def _verdicts(entry: dict, harness: Harness) -> TriggerVerdicts:
+    """Return a cached candidate's verdict store, creating it on first use."""
+    if entry["verdicts"] is None:
+        entry["verdicts"] = TriggerVerdicts(entry["matcher"], harness.prompt_index())
+    return entry["verdicts"]
+
+
+def _trigger_verdict(entry: dict, harness: Harness, prompt: str) -> tuple[bool, float]:
+    """Match ``prompt`` against a cached candidate, memoizing the verdict."""
+    return _verdicts(entry, harness).verdict(prompt)
+
+
+def _trigger_failure(expected: bool, prompt: str, matched: list[str], conf: float) -> str:
+    """Format a trigger miss (FN) or false alarm (FP) for the ASI."""
+    kind = "FN" if expected else "FP"
+    return f"{kind}: '{prompt[:60]}...' (matched: {matched}, conf: {conf:.1%})"
+
+
+def _trigger_suite(entry: dict, harness: Harness) -> tuple[float, list[str]]:
+    """Score a cached candidate against the whole trigger suite."""
+    if entry["suite"] is None:
+        correct = 0
+        total = 0
+        trigger_failures = []
+        verdicts = _verdicts(entry, harness)
+        if not isinstance(entry["matcher"], TriggerMatcher):
+            # BM25: score the suite in one sparse product instead of prompt by prompt.
+            verdicts.fill(harness.prompts, entry["matcher"].match_many(harness.prompts))
+        for expected, prompts in ((True, harness.should_trigger), (False, harness.should_not_trigger)):
+            for prompt in prompts:
+                triggered, _ = verdicts.verdict(prompt)
                 total += 1
-                if triggered:
+                if triggered == expected:
                     correct += 1
                 else:
-                    trigger_failures.append(
-                        f"FN: '{prompt[:60]}...' (matched: {matched}, conf: {conf:.1%})"
-                    )
+                    _, matched, conf = verdicts.result(prompt)
+                    trigger_failures.append(_trigger_failure(expected, prompt, matched, conf))
+        entry["suite"] = (correct / total if total else 1.0, trigger_failures)
+    return entry["suite"]
 
-            for prompt in harness["trigger_prompts"]["should_not_trigger"]:
-                triggered, matched, conf = check_trigger(prompt, keywords)
-                total += 1
-                if not triggered:
+
+# Staged evaluation scores at least this many prompts before it may prune.
+STAGE_MIN_PROMPTS = 8
+
+
+def _stratified_order(harness: Harness, seed: int = 0) -> list[tuple[bool, str]]:
+    """Order the trigger suite so every prefix is a stratified sample.
+
+    Each class is shuffled deterministically, then the two are interleaved in
+    proportion to their sizes, so the first k prompts hold about k·p
+    should-trigger prompts for a suite that is a fraction p should-trigger.
+    """
+    rng = random.Random(seed)
+    ranked = []
+    for expected, prompts in ((True, harness.should_trigger), (False, harness.should_not_trigger)):
+        prompts = list(prompts)
+        rng.shuffle(prompts)
+        n = len(prompts)
+        ranked += [((i + 0.5) / n, not expected, expected, p) for i, p in enumerate(prompts)]
+    ranked.sort(key=lambda r: r[:2])
+    return [(expected, prompt) for _, _, expected, prompt in ranked]
+
+
+def _stage_sizes(total: int, fraction: float) -> list[int]:
+    """Prompt counts for each rung: ``fraction`` of the suite, doubling to all of it."""
+    sizes = []
+    while fraction < 1:
+        size = max(STAGE_MIN_PROMPTS, math.ceil(total * fraction))
+        if size >= total:
+            break
+        if not sizes or size > sizes[-1]:
+            sizes.append(size)
+        fraction *= 2
+    return sizes + [total]
+
+
+def _staged_suite(
+    entry: dict,
+    harness: Harness,
+    order: list[tuple[bool, str]],
+    sizes: list[int],
+    best: float | None,
+    margin: float,
+) -> tuple[float, list[str], str]:
+    """Score a cached candidate by successive halving over the trigger suite.
+
+    The candidate is scored on growing stratified prefixes of ``order``; after
+    each rung short of the full suite, it is dropped if its partial composite
+    score falls more than ``margin`` below ``best``. Candidates that survive
+    are scored on the whole suite. Returns (trigger_score, failures, decision)
+    and memoizes it, so every example sees the same verdict.
+    """
+    if entry["staged"] is None:
+        total = len(order)
+        correct = done = 0
+        failures = []
+        for size in sizes[:-1]:
+            for expected, prompt in order[done:size]:
+                triggered, _ = _trigger_verdict(entry, harness, prompt)
+                if triggered == expected:
                     correct += 1
                 else:
-                    trigger_failures.append(
-                        f"FP: '{prompt[:60]}...' (matched: {matched}, conf: {conf:.1%})"
-                    )
+                    _, matched, conf = _verdicts(entry, harness).result(prompt)
+                    failures.append(_trigger_failure(expected, prompt, matched, conf))
+            done = size
+            partial = (entry["quality_score"] + correct / size) / 2
+            if best is not None and partial < best - margin:
+                PROFILER.count("stage_pruned")
+                decision = (
+                    f"pruned after {size}/{total} prompts: partial score {partial:.2f} "
+                    f"is more than {margin:.2f} below best {best:.2f}"
+                )
+                entry["staged"] = (correct / size, failures, decision)
+                return entry["staged"]
+        PROFILER.count("stage_promoted")
+        if best is None:
+            decision = f"promoted to all {total} prompts: no fully scored candidate yet"
+        elif done:
+            decision = (
+                f"promoted to all {total} prompts: partial score {partial:.2f} after "
+                f"{done} prompts is within {margin:.2f} of best {best:.2f}"
+            )
+        else:
+            decision = f"scored all {total} prompts: suite too small to stage"
+        entry["staged"] = (*_trigger_suite(entry, harness), decision)
+    return entry["staged"]
+
+
+def _gepa_log(message: str):
+    """Log through GEPA's per-evaluation log when running under GEPA."""
+    try:
+        import gepa.optimize_anything as oa
+    except ImportError:
+        return
+    oa.log(message)
+
+
+EVAL_MODES = ("suite", "example")
+
+
+def build_evaluator(
+    skill_name: str,
+    tests_dir: Path,
+    cache_size: int = 256,
+    mode: str = "suite",
+    harness_cache: HarnessCache | None = None,
+    test_files: dict | None = None,
+    rules: QualityRules | None = None,
+    token_limit: int | None = None,
+    stage_margin: float | None = None,
+    stage_fraction: float = 0.125,
+    bm25: "BM25Index | None" = None,
+):
+    """Auto-build a GEPA evaluator for a skill from its test harness.
 
-            scores["triggers"] = correct / total if total else 1.0
+    Returns a callable(candidate, example) -> (score, asi_dict). GEPA calls it
+    once per (candidate, example) pair, so candidate analysis is memoized in a
+    ``CandidateCache`` of ``cache_size`` entries, exposed as ``evaluator.cache``.
+
+    ``mode`` selects how trigger accuracy is scored:
+      - "suite": every call scores the candidate against all trigger prompts.
+      - "example": a call with a ``prompt``/``expected`` example scores only
+        that prompt, so one pass over the dataset costs N trigger checks
+        instead of N². Examples without a prompt fall back to the suite.
+
+    ``harness_cache`` and ``test_files`` are passed to ``discover_test_harness``;
+    ``rules`` to ``score_content_quality``. With ``token_limit``, candidates
+    over that many estimated tokens lose "token_budget" quality score. With
+    ``bm25``, triggers are scored by BM25 over the candidate's description
+    instead of keyword counting.
+
+    With ``stage_margin`` (suite mode only), candidates are first scored on a
+    stratified ``stage_fraction`` of the trigger prompts, doubling per rung,
+    and only promoted to the full suite while their partial score stays within
+    ``stage_margin`` of the best fully scored candidate so far. Dropped
+    candidates keep their partial score, which is below the best, and the
+    decision is reported in the "Staging" ASI field.
+    """
+    if mode not in EVAL_MODES:
+        raise ValueError(f"Unknown evaluator mode '{mode}' (expected one of {EVAL_MODES})")
+    if stage_margin is not None:
+        if mode != "suite":
+            raise ValueError("Staged evaluation requires mode='suite'")
+        if stage_margin < 0 or not 0 < stage_fraction <= 1:
+            raise ValueError("stage_margin must be >= 0 and stage_fraction in (0, 1]")
+    harness = discover_test_harness(tests_dir, skill_name, harness_cache, test_files)
+    has_triggers = harness.has_triggers and bool(harness.should_trigger)
+    cache = CandidateCache(cache_size)
+    if stage_margin is not None and has_triggers:
+        order = _stratified_order(harness)
+        sizes = _stage_sizes(len(order), stage_fraction)
+    best = [None]
+    best_lock = threading.Lock()
+
+    def analyze(candidate: str) -> dict:
+        return _analyze_candidate(skill_name, candidate, rules, token_limit, bm25)
+
+    @profiled("evaluator")
+    def evaluator(candidate: str, example: dict) -> tuple[float, dict]:
+        entry = cache.get(candidate, analyze)
+        scores = {}
+        asi = {}
+
+        # 1. Content quality (always, fast)
+        scores["quality"] = entry["quality_score"]
+        if entry["quality_detail"]["feedback"]:
+            asi["QualityIssues"] = "\n".join(entry["quality_detail"]["feedback"])
+
+        # 2. Trigger accuracy (if tests discovered)
+        example = example or {}
+        if mode == "example" and "prompt" in example and "expected" in example:
+            prompt, expected = example["prompt"], bool(example["expected"])
+            triggered, matched, conf = _verdicts(entry, harness).result(prompt)
+            scores["triggers"] = 1.0 if triggered == expected else 0.0
+            asi["TriggerMatch"] = f"matched: {matched}, conf: {conf:.1%}"
+            if triggered != expected:
+                asi["TriggerFailures"] = _trigger_failure(expected, prompt, matched, conf)
+        elif has_triggers and stage_margin is not None:
+            trigger_score, trigger_failures, decision = _staged_suite(
+                entry, harness, order, sizes, best[0], stage_margin
+            )
+            scores["triggers"] = trigger_score
+            asi["Staging"] = decision
+            if trigger_failures:
+                asi["TriggerFailures"] = "\n".join(trigger_failures[:5])
+            if not decision.startswith("pruned"):
+                with best_lock:
+                    full_score = (scores["quality"] + trigger_score) / 2
+                    if best[0] is None or full_score > best[0]:
+                        best[0] = full_score
+        elif has_triggers:
+            trigger_score, trigger_failures = _trigger_suite(entry, harness)
+            scores["triggers"] = trigger_score
             if trigger_failures:
                 asi["TriggerFailures"] = "\n".join(trigger_failures[:5])
 
         # Aggregate
         final_score = sum(scores.values()) / len(scores) if scores else 0.0
 
-        oa.log(
+        _gepa_log(
             f"[{skill_name}] quality={scores.get('quality', 0):.2f} "
             f"triggers={scores.get('triggers', 'N/A')}"
         )
 
         return final_score, asi
 
+    evaluator.cache = cache
     return evaluator, harness
 
 
+# ── Batch candidate scoring ────────────────────────────────────────────────
+
+def _require_numpy():
+    """Import NumPy, which the batch scoring paths need."""
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("Batch scoring requires numpy: pip install numpy") from None
+    return np
+
+
+def trigger_matrix(keyword_sets: list[list[str]], prompts: list[str]) -> dict:
+    """Match every keyword set against every prompt with array operations.
+
+    The prompts are matched once against the union of all keywords, giving a
+    prompt × keyword occurrence matrix. Each keyword set is a count vector over
+    that vocabulary, so matched counts for all sets × prompts are one matrix
+    product. Results equal ``check_trigger(prompt, keywords)`` for each pair.
+
+    Returns dict of (len(keyword_sets), len(prompts)) arrays:
+      - matched: number of matched keywords
+      - confidence: matched / len(keywords)
+      - triggered: bool
+    """
+    np = _require_numpy()
+    vocab = list(dict.fromkeys(kw for keywords in keyword_sets for kw in keywords))
+    vocab_ids = {kw: i for i, kw in enumerate(vocab)}
+
+    matcher = TriggerMatcher(vocab)
+    occurrence = np.zeros((len(prompts), len(vocab)), dtype=np.int64)
+    for row, prompt in enumerate(prompts):
+        hits = matcher.hits(prompt)
+        if hits:
+            occurrence[row, list(hits)] = 1
+
+    # Counts, not flags: check_trigger counts a repeated keyword once per entry.
+    weights = np.zeros((len(keyword_sets), len(vocab)), dtype=np.int64)
+    for row, keywords in enumerate(keyword_sets):
+        np.add.at(weights[row], [vocab_ids[kw] for kw in keywords], 1)
+
+    matched = weights @ occurrence.T
+    sizes = np.array([max(len(k), 1) for k in keyword_sets], dtype=np.int64)
+    confidence = matched / sizes[:, None]
+    triggered = (matched >= 2) | (confidence >= 0.2)
+    return {"matched": matched, "confidence": confidence, "triggered": triggered}
+
+
+def score_candidates(candidates: list[str], harness: Harness, skill_name: str) -> dict:
+    """Score many candidate SKILL.md texts against a harness's trigger prompts.
+
+    Keywords are extracted from each candidate the same way the evaluator does.
+    Returns ``trigger_matrix`` output over the should-trigger then
+    should-not-trigger prompts, plus:
+      - keywords: the keyword list for each candidate
+      - expected: bool array, True for should-trigger prompts
+      - accuracy: fraction of prompts each candidate gets right, equal to the
+        evaluator's suite trigger score
+    """
+    np = _require_numpy()
+    should, should_not = harness.should_trigger, harness.should_not_trigger
+    keyword_sets = [_candidate_keywords(skill_name, c) for c in candidates]
+
+    result = trigger_matrix(keyword_sets, should + should_not)
+    expected = np.array([True] * len(should) + [False] * len(should_not), dtype=bool)
+    total = len(expected)
+    correct = (result["triggered"] == expected).sum(axis=1)
+    result["keywords"] = keyword_sets
+    result["expected"] = expected
+    result["accuracy"] = correct / total if total else np.ones(len(candidates))
+    return result
+
+
 # ── Score command ──────────────────────────────────────────────────────────
 
+@profiled("score_skill")
 def score_skill(
     skill_name: str,
     skills_dir: Path,
     tests_dir: Path,
-) -> dict:
-    """Score a single skill's SKILL.md content quality + trigger accuracy."""
+    harness_cache: HarnessCache | None = None,
+    test_files: dict | None = None,
+    rules: QualityRules | None = None,
+    token_limits: TokenLimits | None = None,
+    bm25: "BM25Index | None" = None,
+) -> SkillScore:
+    """Score a single skill's SKILL.md content quality + trigger accuracy.
+
+    ``test_files`` is the skill's entry from ``index_tests_tree``, if known.
+    ``rules`` overrides the default quality rules. With ``token_limits``,
+    the file's token budget is scored too. With ``bm25``, trigger accuracy
+    uses BM25 over the description instead of keyword counting.
+    ``SkillScore.to_dict()`` gives the ``--json`` form.
+    """
     skill_md = skills_dir / skill_name / "SKILL.md"
     if not skill_md.exists():
-        return {"skill": skill_name, "error": f"SKILL.md not found at {skill_md}"}
-
-    content = skill_md.read_text()
-    # Parse frontmatter safely
-    frontmatter, body = parse_frontmatter(content)
-
-    # Build evaluator and score
-    harness = discover_test_harness(tests_dir, skill_name)
-    quality_score, quality_detail = score_content_quality(body, frontmatter)
-
-    should_count = len(harness["trigger_prompts"]["should_trigger"])
-    should_not_count = len(harness["trigger_prompts"]["should_not_trigger"])
-
-    result = {
-        "skill": skill_name,
-        "quality_score": round(quality_score, 2),
-        "quality_detail": quality_detail["scores"],
-        "quality_feedback": quality_detail["feedback"],
-        "has_triggers_test": harness["has_triggers"],
-        "has_integration_test": harness["has_integration"],
-        "has_unit_test": harness["has_unit"],
-        "trigger_prompt_count": should_count + should_not_count,
-    }
+        return SkillScore(skill_name, error=f"SKILL.md not found at {skill_md}")
+
+    # Map the file instead of reading it: only the frontmatter and the start
+    # of the body are decoded; the other checks search the mapped bytes.
+    with SkillDocument(skill_md) as doc:
+        frontmatter = doc.frontmatter
+        token_budget = None
+        if token_limits is not None:
+            token_budget = (doc.tokens(), token_limits.limit_for(_relative_to_cwd(skill_md))[0])
+        quality_score, quality_detail = score_content_quality(doc, frontmatter, rules, token_budget)
+        body_head = doc.head(1000)
+
+    harness = discover_test_harness(tests_dir, skill_name, harness_cache, test_files)
+
+    result = SkillScore(
+        skill=skill_name,
+        quality_score=round(quality_score, 2),
+        quality_detail=quality_detail["scores"],
+        quality_feedback=quality_detail["feedback"],
+        has_triggers_test=harness.has_triggers,
+        has_integration_test=harness.has_integration,
+        has_unit_test=harness.has_unit,
+        trigger_prompt_count=len(harness.should_trigger) + len(harness.should_not_trigger),
+    )
 
     # Trigger accuracy if test data available
-    if harness["has_triggers"] and harness["trigger_prompts"]["should_trigger"]:
+    if harness.has_triggers and harness.should_trigger and bm25 is not None:
+        matcher = bm25.matcher(skill_name, str(frontmatter.get("description", "")))
+        correct = int(matcher.triggered(harness.should_trigger).sum())
+        correct += int((~matcher.triggered(harness.should_not_trigger)).sum())
+        result.trigger_accuracy = round(correct / result.trigger_prompt_count, 2)
+    elif harness.has_triggers and harness.should_trigger:
         # Use full content for keyword extraction
-        keywords = extract_keywords(skill_name, body[:1000])
+        keywords = extract_keywords(skill_name, body_head)
+        matcher = TriggerMatcher(keywords)
         correct = total = 0
-        for p in harness["trigger_prompts"]["should_trigger"]:
-            t, _, _ = check_trigger(p, keywords)
+        for t, _, _ in matcher.match_many(harness.should_trigger):
             total += 1
             correct += int(t)
-        for p in harness["trigger_prompts"]["should_not_trigger"]:
-            t, _, _ = check_trigger(p, keywords)
+        for t, _, _ in matcher.match_many(harness.should_not_trigger):
             total += 1
             correct += int(not t)
-        result["trigger_accuracy"] = round(correct / total, 2) if total else None
-    else:
-        result["trigger_accuracy"] = None
+        result.trigger_accuracy = round(correct / total, 2) if total else None
 
     return result
 
 
+def shard_of(skill_name: str, count: int) -> int:
+    """Return the 1-based shard of ``count`` that scores ``skill_name``.
+
+    Depends only on the name's SHA-1, so adding or removing skills never
+    moves other skills between shards.
+    """
+    digest = hashlib.sha1(skill_name.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse an ``i/N`` shard spec (1 <= i <= N), as given to ``--shard``."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}' (expected i/N, e.g. 2/4)") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{spec}' (need 1 <= i <= N)")
+    return index, count
+
+
+def list_skills(skills_dir: Path) -> list[str]:
+    """List skill directory names under ``skills_dir``, sorted by name."""
+    return sorted(
+        d.name for d in skills_dir.iterdir() if d.is_dir() and not d.name.startswith(".")
+    )
+
+
+def score_all(
+    skills_dir: Path,
+    tests_dir: Path,
+    jobs: int | None = None,
+    harness_cache: HarnessCache | None = None,
+    ignore=DEFAULT_TEST_IGNORES,
+    rules: QualityRules | None = None,
+    token_limits: TokenLimits | None = None,
+    shard: tuple[int, int] | None = None,
+    bm25: "BM25Index | None" = None,
+    skills: list[str] | None = None,
+) -> list[SkillScore]:
+    """Score every skill under ``skills_dir``, in skill-name order.
+
+    The tests tree is indexed once up front. ``jobs`` > 1 fans skills out
+    across a process pool (default: CPU count); results come back in the
+    same order as the serial path. With ``shard`` (index, count), only the
+    skills ``shard_of`` assigns to that 1-based shard are scored. ``bm25``
+    is passed to ``score_skill``. With ``skills``, only those are scored.
+    """
+    return list(iter_scores(
+        skills_dir, tests_dir, jobs, harness_cache, ignore, rules, token_limits, shard, bm25, skills
+    ))
+
+
+def iter_scores(
+    skills_dir: Path,
+    tests_dir: Path,
+    jobs: int | None = None,
+    harness_cache: HarnessCache | None = None,
+    ignore=DEFAULT_TEST_IGNORES,
+    rules: QualityRules | None = None,
+    token_limits: TokenLimits | None = None,
+    shard: tuple[int, int] | None = None,
+    bm25: "BM25Index | None" = None,
+    skills: list[str] | None = None,
+):
+    """Yield ``score_skill`` results in skill-name order as they are computed.
+
+    Only a small window of skills is in flight at once, so memory doesn't grow
+    with the number of skills however slowly the consumer reads. ``skills``
+    restricts scoring to those names (default: every skill).
+    """
+    skills = sorted(skills) if skills is not None else list_skills(skills_dir)
+    if shard is not None:
+        index, count = shard
+        skills = [s for s in skills if shard_of(s, count) == index]
+    index = index_tests_tree(tests_dir, ignore)
+    no_tests = {"trigger_files": [], "has_integration": False, "has_unit": False}
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    workers = min(jobs, len(skills))
+    if workers <= 1:
+        for s in skills:
+            yield score_skill(
+                s, skills_dir, tests_dir, harness_cache, index.get(s, no_tests), rules,
+                token_limits, bm25,
+            )
+        return
+
+    profile = PROFILER.enabled
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(profile,)
+    ) as pool:
+        pending = deque()
+        for s in skills:
+            pending.append(pool.submit(
+                _score_skill_worker, s, skills_dir, tests_dir, harness_cache,
+                index.get(s, no_tests), rules, token_limits, bm25,
+            ))
+            if len(pending) >= workers * 4:
+                yield _collect_worker_result(pending.popleft())
+        while pending:
+            yield _collect_worker_result(pending.popleft())
+
+
+def _collect_worker_result(future) -> SkillScore:
+    result, snapshot = future.result()
+    if snapshot is not None:
+        PROFILER.merge(snapshot)
+    return result
+
+
+def _init_worker(profile: bool):
+    """Process pool initializer: carry --profile into worker processes."""
+    PROFILER.enabled = profile
+
+
+def _score_skill_worker(*args) -> tuple[SkillScore, dict | None]:
+    """Run score_skill in a worker; returns its profile snapshot when profiling."""
+    if not PROFILER.enabled:
+        return score_skill(*args), None
+    PROFILER.reset()
+    result = score_skill(*args)
+    return result, PROFILER.snapshot()
+
+
+# ── Streaming results ──────────────────────────────────────────────────────
+
+SCORE_FORMATS = ("table", "json", "ndjson")
+
+# Serial score-all scores skills in name order, then stable-sorts by score,
+# so (score, name) reproduces its order from any input order.
+SORT_KEYS = {
+    "score": lambda r: (r.get("quality_score", 0), r["skill"]),
+    "name": lambda r: r["skill"],
+}
+
+
+def sort_scores(results, sort: str, chunk_size: int = 10_000):
+    """Sort a stream of score results with an external merge sort.
+
+    Up to ``chunk_size`` results are sorted in memory; larger streams are
+    spilled to temporary NDJSON runs and merged lazily, so memory stays
+    bounded by ``chunk_size`` rather than the number of skills. Results may
+    be ``SkillScore``s or dicts; dicts are yielded.
+    """
+    key = SORT_KEYS[sort]
+    runs = []
+    try:
+        chunk = []
+        for result in results:
+            chunk.append(_as_dict(result))
+            if len(chunk) >= chunk_size:
+                runs.append(_spill_run(sorted(chunk, key=key)))
+                chunk = []
+        chunk.sort(key=key)
+        if not runs:
+            yield from chunk
+            return
+        runs.append(_spill_run(chunk))
+        del chunk
+        yield from heapq.merge(*(_iter_ndjson(run) for run in runs), key=key)
+    finally:
+        for run in runs:
+            run.close()
+
+
+def _spill_run(results: list[dict]):
+    run = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+    for result in results:
+        run.write(json.dumps(result) + "\n")
+    run.seek(0)
+    return run
+
+
+def _iter_ndjson(lines):
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _read_score_inputs(paths: list[str]):
+    """Yield results from score-all output files, with "-" meaning stdin.
+
+    Each input may be NDJSON or a ``--format json`` array. A skill found in
+    more than one input (e.g. overlapping shards) raises ValueError.
+    """
+    seen = set()
+    for path in paths:
+        if path == "-":
+            results = _iter_score_file(sys.stdin)
+        else:
+            f = open(path, encoding="utf-8")
+            results = _iter_score_file(f)
+        try:
+            for result in results:
+                if result["skill"] in seen:
+                    raise ValueError(f"Skill '{result['skill']}' appears in more than one input")
+                seen.add(result["skill"])
+                yield result
+        finally:
+            if path != "-":
+                f.close()
+
+
+def _iter_score_file(f):
+    """Yield results from one NDJSON stream or JSON array."""
+    for line in f:
+        if line.strip():
+            break
+    else:
+        return
+    if line.lstrip().startswith("["):
+        yield from json.loads(line + f.read())
+    else:
+        yield json.loads(line)
+        yield from _iter_ndjson(f)
+
+
+def _emit_scores(results, fmt: str) -> bool:
+    """Write a stream of score results in ``fmt``; returns True if any errored.
+
+    The json format is written incrementally but is byte-identical to
+    ``json.dumps(list(results), indent=2)``. If the reader goes away (e.g.
+    ``| head``), output stops and the process exits quietly with status 1.
+    """
+    try:
+        return _write_scores(results, fmt)
+    except BrokenPipeError:
+        # Point stdout at devnull so the interpreter's final flush can't
+        # raise again on the closed pipe.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+
+
+def _write_scores(results, fmt: str) -> bool:
+    has_errors = False
+
+    def tracked():
+        nonlocal has_errors
+        for result in results:
+            result = _as_dict(result)
+            if "error" in result:
+                has_errors = True
+            yield result
+
+    if fmt == "table":
+        _print_score_table(tracked())
+    elif fmt == "ndjson":
+        for result in tracked():
+            print(json.dumps(result), flush=True)
+    else:
+        first = True
+        for result in tracked():
+            item = json.dumps(result, indent=2).replace("\n", "\n  ")
+            sys.stdout.write(("[\n  " if first else ",\n  ") + item)
+            first = False
+        print("[]" if first else "\n]")
+    return has_errors
+
+
+# ── Incremental scoring ────────────────────────────────────────────────────
+
+def git_changed_paths(since: str, cwd: Path) -> list[Path]:
+    """Return the paths changed in ``cwd``'s git repo since revision ``since``.
+
+    Covers committed, staged and unstaged changes (``git diff --name-only``,
+    with both sides of renames) plus untracked files. Raises ValueError if
+    git fails, e.g. for an unknown revision.
+    """
+    if since.startswith("-"):
+        raise ValueError(f"Invalid revision '{since}'")
+
+    def git(*args) -> list[str]:
+        try:
+            out = subprocess.run(
+                ["git", *args], cwd=cwd, capture_output=True, check=True
+            ).stdout.decode("utf-8", errors="surrogateescape")
+        except FileNotFoundError:
+            raise ValueError("--since needs git on PATH") from None
+        except subprocess.CalledProcessError as e:
+            message = e.stderr.decode("utf-8", errors="replace").strip()
+            raise ValueError(f"git {args[0]} failed: {message}") from None
+        return [line for line in out.split("\0" if "-z" in args else "\n") if line]
+
+    top = Path(git("rev-parse", "--show-toplevel")[0])
+    changed = git("diff", "--name-only", "--no-renames", "-z", since, "--")
+    changed += git("ls-files", "--others", "--exclude-standard", "-z", "--full-name", ":/")
+    return [top / path for path in changed]
+
+
+def changed_skills(paths, skills_dir: Path, tests_dir: Path) -> set[str]:
+    """Map changed paths to the skills they belong to (their top-level dir)."""
+    skills = set()
+    roots = (Path(skills_dir).resolve(), Path(tests_dir).resolve())
+    for path in paths:
+        path = Path(path).resolve()
+        for root in roots:
+            try:
+                rel = path.relative_to(root)
+            except ValueError:
+                continue
+            if rel.parts and not rel.parts[0].startswith("."):
+                skills.add(rel.parts[0])
+            break
+    return skills
+
+
+def skills_changed_since(since: str, skills_dir: Path, tests_dir: Path) -> set[str]:
+    """Skills whose SKILL.md dir or test dir changed since git revision ``since``."""
+    return changed_skills(git_changed_paths(since, Path(skills_dir)), skills_dir, tests_dir)
+
+
+def load_baseline(path: Path) -> dict[str, dict]:
+    """Read a stored score-all result (JSON or NDJSON) into {skill: result}."""
+    return {result["skill"]: result for result in _read_score_inputs([str(path)])}
+
+
+def skills_to_rescore(names: list[str], baseline: dict[str, dict], changed: set[str] | None) -> list[str]:
+    """Skills among ``names`` that can't reuse their ``baseline`` result.
+
+    Those are the ``changed`` skills and any missing from the baseline; with
+    ``changed`` None, every skill.
+    """
+    return [n for n in names if changed is None or n in changed or n not in baseline]
+
+
+def merge_baseline(names: list[str], fresh, baseline: dict[str, dict]):
+    """Yield a result for each of ``names``, in order.
+
+    ``fresh`` yields the re-scored skills' results in name order; every other
+    skill's result is taken from ``baseline``.
+    """
+    fresh = iter(fresh)
+    pending = next(fresh, None)
+    for name in names:
+        if pending is not None and _as_dict(pending)["skill"] == name:
+            yield pending
+            pending = next(fresh, None)
+        else:
+            yield baseline[name]
+
+
+def score_deltas(baseline: dict[str, dict], rescored: dict[str, dict], names: list[str]) -> list[dict]:
+    """Compare re-scored skills, and skills no longer in ``names``, to the baseline.
+
+    Each record's "status" is "rescored", "new" (not in the baseline) or
+    "removed". Scores are the mean of quality and trigger accuracy, as
+    optimize-all ranks skills; None when there is no result or it errored.
+    """
+    def overall(result):
+        if result is None or "error" in result:
+            return None
+        return round(1 - skill_need(result), 2)
+
+    current = set(names)
+    deltas = []
+    for name in sorted(set(rescored) | (set(baseline) - current)):
+        before = overall(baseline.get(name))
+        after = overall(rescored.get(name))
+        if name not in current:
+            status = "removed"
+        else:
+            status = "rescored" if name in baseline else "new"
+        deltas.append({
+            "skill": name,
+            "status": status,
+            "baseline": before,
+            "score": after,
+            "delta": round(after - before, 2) if None not in (before, after) else None,
+        })
+    return deltas
+
+
+def _print_score_deltas(deltas: list[dict], reused: int):
+    def fmt(score):
+        return "error" if score is None else f"{score:.2f}"
+
+    print(f"\n  Changes vs baseline: {len(deltas)} skill(s), {reused} reused unchanged")
+    for d in deltas:
+        if d["status"] == "removed":
+            change = "removed"
+        elif d["status"] == "new":
+            change = f"new, {fmt(d['score'])}"
+        else:
+            change = f"{fmt(d['baseline'])} → {fmt(d['score'])}"
+            if d["delta"] is not None:
+                change += f" ({d['delta']:+.2f})"
+        print(f"    {d['skill']:<30} {change}")
+
+
 # ── Optimize command ───────────────────────────────────────────────────────
 
+RUN_FILE = "run.json"
+RESULT_FILE = "result.json"
+
+
+class LMCache:
+    """Persistent cache of reflection-LM responses, addressed by request content.
+
+    Stored in ``<cache_dir>/lm.sqlite`` and keyed by the SHA-256 of the model
+    name and prompt, so re-running an optimization with the same seed replays
+    every proposal instead of calling the LM again. Safe to share between
+    threads.
+    """
+
+    FILENAME = "lm.sqlite"
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR):
+        self.path = Path(cache_dir) / self.FILENAME
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"path": self.path, "_conn": None}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state, _lock=threading.Lock())
+
+    @staticmethod
+    def key(model: str, prompt) -> str:
+        """Content address of a request; ``prompt`` is a string or chat messages."""
+        request = json.dumps({"model": model, "prompt": prompt}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, model: str, response: str):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, model, response))
+            conn.commit()
+
+    def clear(self) -> bool:
+        """Delete the cache file. Returns True if there was one to delete."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            if self.path.exists():
+                self.path.unlink()
+                return True
+        return False
+
+
+class CachedLM:
+    """Wrap a GEPA language model so responses are served from an ``LMCache``.
+
+    Only successful calls are stored; errors from ``lm`` propagate uncached.
+    If the cache database fails, calls fall through to ``lm``.
+    """
+
+    def __init__(self, lm, model: str, cache: LMCache):
+        self.lm = lm
+        self.model = model
+        self.cache = cache
+
+    def __call__(self, prompt):
+        key = self.cache.key(self.model, prompt)
+        try:
+            response = self.cache.get(key)
+        except sqlite3.Error as e:
+            print(f"Warning: LM cache unavailable ({e}), calling the model", file=sys.stderr)
+            return self.lm(prompt)
+        if response is not None:
+            PROFILER.count("lm_cache_hits")
+            return response
+        PROFILER.count("lm_cache_misses")
+        response = self.lm(prompt)
+        try:
+            self.cache.put(key, self.model, response)
+        except sqlite3.Error as e:
+            print(f"Warning: could not cache LM response ({e})", file=sys.stderr)
+        return response
+
+
+def _prepare_run_dir(run_dir: Path, meta: dict, resume: bool):
+    """Create or validate an optimization run directory.
+
+    A new run writes ``run.json`` describing the skill, model, eval mode and
+    seed content. Resuming requires that file and that it still matches, so a
+    checkpoint is never continued against a different skill or an edited
+    SKILL.md. Raises ValueError on a mismatch.
+    """
+    run_file = run_dir / RUN_FILE
+    if run_file.exists():
+        if not resume:
+            raise ValueError(f"{run_dir} already holds a run; pass --resume to continue it")
+        saved = json.loads(run_file.read_text())
+        changed = [k for k, v in meta.items() if saved.get(k) != v]
+        if changed:
+            raise ValueError(
+                f"Cannot resume {run_dir}: {', '.join(changed)} changed since the run started"
+            )
+        return
+    if resume:
+        raise ValueError(f"No run to resume in {run_dir}")
+    run_dir.mkdir(parents=True, exist_ok=True)
+    _write_json_atomic(run_file, meta)
+
+
+def _write_json_atomic(path: Path, data):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f, indent=2, default=str)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
 def optimize_skill(
     skill_name: str,
     skills_dir: Path,
     tests_dir: Path,
     max_iterations: int = 80,
     model: str = "openai/gpt-4o",
+    eval_mode: str = "example",
+    harness_cache: HarnessCache | None = None,
+    test_files: dict | None = None,
+    rules: QualityRules | None = None,
+    token_limits: TokenLimits | None = None,
+    run_dir: Path | None = None,
+    resume: bool = False,
+    lm_cache: LMCache | None = None,
+    lm=None,
+    stage_margin: float | None = None,
+    stage_fraction: float = 0.125,
+    bm25: "BM25Index | None" = None,
 ) -> dict:
-    """Run GEPA optimize_anything on a skill's SKILL.md body content."""
+    """Run GEPA optimize_anything on a skill's SKILL.md body content.
+
+    ``eval_mode``, ``rules``, ``stage_margin``, ``stage_fraction`` and
+    ``bm25`` are passed to ``build_evaluator``; the default "example" mode scores each
+    dataset example's own trigger prompt. With ``token_limits``, candidates
+    are held to the SKILL.md token limit.
+
+    With ``run_dir``, GEPA checkpoints its state (candidates, scores, budget
+    used) there after every iteration and the final result is written to
+    ``result.json``; ``resume`` continues a stopped run from its checkpoint.
+    Reflection-LM calls go through ``lm_cache`` when given. ``lm`` replaces
+    the LiteLLM model, e.g. with an offline stub.
+    """
     import gepa.optimize_anything as oa
 
     skill_md = skills_dir / skill_name / "SKILL.md"
     if not skill_md.exists():
         return {"skill": skill_name, "error": f"SKILL.md not found at {skill_md}"}
 
-    content = skill_md.read_text()
+    content = _read_text(skill_md)
     frontmatter, body = parse_frontmatter(content)
 
+    if run_dir is not None:
+        meta = {
+            "skill": skill_name,
+            "model": model,
+            "eval_mode": eval_mode,
+            "seed_sha256": hashlib.sha256(content.encode("utf-8")).hexdigest(),
+        }
+        try:
+            _prepare_run_dir(run_dir, meta, resume)
+        except ValueError as e:
+            return {"skill": skill_name, "error": str(e)}
+
     # Auto-build evaluator from test harness
-    evaluator, harness = build_evaluator(skill_name, tests_dir)
+    evaluator, harness = build_evaluator(
+        skill_name, tests_dir, mode=eval_mode, harness_cache=harness_cache,
+        test_files=test_files, rules=rules,
+        token_limit=token_limits.limit_for(_relative_to_cwd(skill_md))[0] if token_limits else None,
+        stage_margin=stage_margin, stage_fraction=stage_fraction, bm25=bm25,
+    )
 
     # Build dataset from discovered trigger prompts
     dataset = []
-    if harness["has_triggers"]:
-        for prompt in harness["trigger_prompts"]["should_trigger"]:
+    if harness.has_triggers:
+        for prompt in harness.should_trigger:
             dataset.append({"skill_name": skill_name, "prompt": prompt, "expected": True})
-        for prompt in harness["trigger_prompts"]["should_not_trigger"]:
+        for prompt in harness.should_not_trigger:
             dataset.append({"skill_name": skill_name, "prompt": prompt, "expected": False})
 
     if not dataset:
         dataset = [{"skill_name": skill_name, "aspect": "overall"}]
 
-    # Configure LLM via GitHub Models
-    try:
-        token = subprocess.check_output(["gh", "auth", "token"]).decode().strip()
-        # Validate token looks reasonable (not an error message)
-        if token and len(token) >= 10 and not token.startswith("ERROR"):
-            os.environ.setdefault("OPENAI_API_KEY", token)
-            os.environ.setdefault("OPENAI_API_BASE", "https://models.github.ai/inference")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        pass  # Let litellm find credentials from env
+    if lm is None:
+        _configure_github_models()
+        lm = oa.make_litellm_lm(model)
 
-    proposer_lm = oa.make_litellm_lm(model)
+    # Cache hits skip the "llm" phase, so it only times real model calls.
+    proposer_lm = _profiled_lm(lm)
+    if lm_cache is not None:
+        proposer_lm = CachedLM(proposer_lm, model, lm_cache)
 
     # Seed with full content so GEPA can optimize frontmatter + body
     seed = content
@@ -474,17 +2409,196 @@ def optimize_skill(
             f"contain execution guidance, not routing signals."
         ),
         config=oa.GEPAConfig(
-            engine=oa.EngineConfig(max_metric_calls=max_iterations),
+            engine=oa.EngineConfig(
+                max_metric_calls=max_iterations,
+                run_dir=str(run_dir) if run_dir is not None else None,
+            ),
             reflection=oa.ReflectionConfig(reflection_lm=proposer_lm),
         ),
     )
 
-    return {
+    output = {
         "skill": skill_name,
         "original": body,
         "optimized": result.best_candidate,
         "best_score": getattr(result, "best_score", None),
+        "evaluator_cache": evaluator.cache.info(),
+        **({"profile": PROFILER.snapshot()} if PROFILER.enabled else {}),
     }
+    if run_dir is not None:
+        _write_json_atomic(run_dir / RESULT_FILE, output)
+    return output
+
+
+def _configure_github_models():
+    """Point LiteLLM at GitHub Models using the ``gh`` CLI's token, if any."""
+    try:
+        token = subprocess.check_output(["gh", "auth", "token"]).decode().strip()
+        # Validate token looks reasonable (not an error message)
+        if token and len(token) >= 10 and not token.startswith("ERROR"):
+            os.environ.setdefault("OPENAI_API_KEY", token)
+            os.environ.setdefault("OPENAI_API_BASE", "https://models.github.ai/inference")
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        pass  # Let litellm find credentials from env
+
+
+def _profiled_lm(lm):
+    """Wrap a reflection LM so its calls are recorded under the "llm" phase."""
+
+    def call(prompt):
+        with PROFILER.phase("llm"):
+            return lm(prompt)
+
+    return call
+
+
+# ── Optimize-all command ───────────────────────────────────────────────────
+
+# No skill is allotted fewer metric calls than this; when the budget can't
+# cover every skill, the lowest-scoring skills are funded first.
+MIN_SKILL_BUDGET = 10
+
+# Every skill gets some weight, so near-perfect skills still get a share.
+NEED_FLOOR = 0.05
+
+
+def skill_need(result: dict) -> float:
+    """Headroom of a ``score_skill`` result: 1 minus its mean quality/trigger score."""
+    parts = [result["quality_score"]]
+    if result.get("trigger_accuracy") is not None:
+        parts.append(result["trigger_accuracy"])
+    return 1 - sum(parts) / len(parts)
+
+
+def allocate_budget(
+    scores: list[dict], total: int, min_calls: int = MIN_SKILL_BUDGET
+) -> dict[str, int]:
+    """Split ``total`` metric calls across scored skills, favouring low scores.
+
+    Skills are ranked by ``skill_need``; as many as the budget allows get
+    ``min_calls`` each, and the rest of the budget is shared among them in
+    proportion to need (largest remainder, so shares sum to ``total``).
+    Unfunded skills map to 0.
+    """
+    if total < 0:
+        raise ValueError(f"Metric-call budget must be >= 0, got {total}")
+    ranked = sorted(scores, key=lambda r: (-skill_need(r), r["skill"]))
+    funded = ranked[: total // min_calls] if min_calls else ranked
+    budget = {r["skill"]: 0 for r in ranked}
+    if not funded:
+        return budget
+    spare = total - min_calls * len(funded)
+    weights = [skill_need(r) + NEED_FLOOR for r in funded]
+    shares = [spare * w / sum(weights) for w in weights]
+    for r, share in zip(funded, shares):
+        budget[r["skill"]] = min_calls + int(share)
+    leftover = total - sum(budget.values())
+    by_remainder = sorted(range(len(funded)), key=lambda i: (-(shares[i] % 1), i))
+    for i in by_remainder[:leftover]:
+        budget[funded[i]["skill"]] += 1
+    return budget
+
+
+def _limited_lm(lm, slots: threading.Semaphore):
+    """Wrap a reflection LM so at most ``slots`` calls are in flight across skills."""
+
+    def call(prompt):
+        with slots:
+            return lm(prompt)
+
+    return call
+
+
+def optimize_all(
+    skills_dir: Path,
+    tests_dir: Path,
+    budget: int,
+    jobs: int | None = None,
+    lm_concurrency: int = 4,
+    model: str = "openai/gpt-4o",
+    eval_mode: str = "example",
+    harness_cache: HarnessCache | None = None,
+    ignore=DEFAULT_TEST_IGNORES,
+    rules: QualityRules | None = None,
+    token_limits: TokenLimits | None = None,
+    run_dir: Path | None = None,
+    resume: bool = False,
+    lm_cache: LMCache | None = None,
+    lm=None,
+    stage_margin: float | None = None,
+    stage_fraction: float = 0.125,
+    skills: list[str] | None = None,
+    bm25: "BM25Index | None" = None,
+):
+    """Optimize many skills concurrently, yielding each result as it finishes.
+
+    Every skill (or just ``skills``) is scored first, and ``budget`` metric
+    calls are split across them with ``allocate_budget``. Funded skills run
+    ``optimize_skill`` on a pool of ``jobs`` threads (default: one per skill,
+    up to 32), neediest first, while reflection-LM calls across all of them
+    share ``lm_concurrency`` slots. With ``run_dir``, each skill checkpoints
+    to ``run_dir/<skill>``. ``bm25`` selects BM25 trigger scoring throughout.
+
+    Results carry "baseline_score" and "budget"; unfunded skills are yielded
+    first with "skipped" set, and failures as "error" results.
+    """
+    if lm_concurrency < 1:
+        raise ValueError(f"lm_concurrency must be >= 1, got {lm_concurrency}")
+    if jobs is not None and jobs < 1:
+        raise ValueError(f"jobs must be >= 1, got {jobs}")
+    import gepa.optimize_anything as oa
+
+    index = index_tests_tree(tests_dir, ignore)
+    names = skills if skills is not None else list_skills(skills_dir)
+    no_tests = {"trigger_files": [], "has_integration": False, "has_unit": False}
+    scored = []
+    for name in names:
+        result = score_skill(
+            name, skills_dir, tests_dir, harness_cache, index.get(name, no_tests), rules,
+            token_limits, bm25,
+        ).to_dict()
+        if "error" in result:
+            yield result
+        else:
+            scored.append(result)
+    shares = allocate_budget(scored, budget)
+    baseline = {r["skill"]: round(1 - skill_need(r), 2) for r in scored}
+
+    funded = []
+    for r in sorted(scored, key=lambda r: (-skill_need(r), r["skill"])):
+        if shares[r["skill"]]:
+            funded.append(r["skill"])
+        else:
+            yield {"skill": r["skill"], "baseline_score": baseline[r["skill"]], "budget": 0,
+                   "skipped": "budget exhausted by lower-scoring skills"}
+    if not funded:
+        return
+
+    if lm is None:
+        _configure_github_models()
+        lm = oa.make_litellm_lm(model)
+    lm = _limited_lm(lm, threading.Semaphore(lm_concurrency))
+
+    def run(name: str) -> dict:
+        # SQLite connections are per-thread, so each skill opens its own.
+        cache = HarnessCache(harness_cache.path.parent) if harness_cache is not None else None
+        try:
+            result = optimize_skill(
+                name, skills_dir, tests_dir, shares[name], model, eval_mode, cache,
+                index.get(name, no_tests), rules, token_limits,
+                run_dir=run_dir / name if run_dir is not None else None,
+                resume=resume, lm_cache=lm_cache, lm=lm,
+                stage_margin=stage_margin, stage_fraction=stage_fraction, bm25=bm25,
+            )
+        except Exception as e:  # one skill's failure shouldn't stop the others
+            result = {"skill": name, "error": f"{type(e).__name__}: {e}"}
+        result.pop("profile", None)
+        return {**result, "baseline_score": baseline[name], "budget": shares[name]}
+
+    with ThreadPoolExecutor(max_workers=jobs or min(32, len(funded))) as pool:
+        futures = [pool.submit(run, name) for name in funded]
+        for future in as_completed(futures):
+            yield future.result()
 
 
 # ── CLI ────────────────────────────────────────────────────────────────────
@@ -501,13 +2615,38 @@ def main():
     score_p.add_argument("--skills-dir", default="skills")
     score_p.add_argument("--tests-dir", default="tests")
     score_p.add_argument("--json", action="store_true")
+    _add_cache_args(score_p)
+    _add_rules_args(score_p)
+    _add_profile_args(score_p)
 
     # score-all command
     all_p = subparsers.add_parser("score-all", help="Score all skills")
     all_p.add_argument("--skills-dir", default="skills")
     all_p.add_argument("--tests-dir", default="tests")
-    all_p.add_argument("--json", action="store_true")
-    all_p.add_argument("--sort", choices=["score", "name"], default="score")
+    all_p.add_argument("--json", action="store_const", const="json", dest="format",
+                       default="table", help="Same as --format json")
+    all_p.add_argument("--format", choices=SCORE_FORMATS, default="table",
+                       help="ndjson streams one result per line as soon as it is scored, "
+                            "in skill-name order; pipe it to merge-scores to sort")
+    all_p.add_argument("--sort", choices=list(SORT_KEYS), default="score")
+    all_p.add_argument("--jobs", type=_positive_int, default=None,
+                       help="Worker processes for scoring (default: CPU count)")
+    all_p.add_argument("--watch", action="store_true",
+                       help="Keep running and re-score skills as their files change "
+                            "(table or ndjson format)")
+    all_p.add_argument("--poll", type=float, metavar="SECONDS",
+                       help="With --watch, poll mtimes every SECONDS instead of using inotify")
+    all_p.add_argument("--shard", metavar="I/N",
+                       help="Score only shard I of N (skills split by a hash of their name); "
+                            "combine the shards' outputs with merge-scores")
+    all_p.add_argument("--baseline", metavar="FILE",
+                       help="Stored score-all output (JSON or NDJSON) to report score deltas "
+                            "against; with --since, untouched skills reuse their result from it")
+    all_p.add_argument("--since", metavar="REV",
+                       help="Re-score only skills changed since git revision REV (requires --baseline)")
+    _add_cache_args(all_p)
+    _add_rules_args(all_p)
+    _add_profile_args(all_p)
 
     # optimize command
     opt_p = subparsers.add_parser("optimize", help="Optimize a skill with GEPA")
@@ -515,12 +2654,131 @@ def main():
     opt_p.add_argument("--skills-dir", default="skills")
     opt_p.add_argument("--tests-dir", default="tests")
     opt_p.add_argument("--iterations", type=int, default=80)
-    opt_p.add_argument("--model", default="openai/gpt-4o")
+    opt_p.add_argument("--run-dir", metavar="DIR",
+                       help="Checkpoint GEPA state and write the result here")
     opt_p.add_argument("--json", action="store_true")
+    _add_optimize_args(opt_p)
+    _add_cache_args(opt_p)
+    _add_rules_args(opt_p)
+    _add_profile_args(opt_p)
+
+    # optimize-all command
+    opt_all_p = subparsers.add_parser(
+        "optimize-all", help="Optimize many skills concurrently under one metric-call budget"
+    )
+    opt_all_p.add_argument("--skills-dir", default="skills")
+    opt_all_p.add_argument("--tests-dir", default="tests")
+    opt_all_p.add_argument("--skill", action="append", dest="skills", metavar="NAME",
+                           help="Only optimize this skill (repeatable; default: all)")
+    opt_all_p.add_argument("--budget", type=_non_negative_int, default=400,
+                           help="Total metric calls, weighted toward the lowest-scoring skills")
+    opt_all_p.add_argument("--jobs", type=_positive_int, default=None,
+                           help="Skills optimized at once (default: all funded skills, up to 32)")
+    opt_all_p.add_argument("--lm-concurrency", type=_positive_int, default=4,
+                           help="Reflection-LM calls in flight across all skills (default: 4)")
+    opt_all_p.add_argument("--run-dir", metavar="DIR",
+                           help="Checkpoint each skill's run in DIR/<skill>")
+    opt_all_p.add_argument("--format", choices=("table", "ndjson"), default="table",
+                           help="Line per finished skill, or one JSON result per line")
+    _add_optimize_args(opt_all_p)
+    _add_cache_args(opt_all_p)
+    _add_rules_args(opt_all_p)
+    _add_profile_args(opt_all_p)
+
+    # route command
+    route_p = subparsers.add_parser("route", help="Show which skills prompts route to")
+    route_p.add_argument("--prompt", action="append",
+                         help="Prompt to route (repeatable; default: one per line on stdin)")
+    route_p.add_argument("--skills-dir", default="skills")
+    route_p.add_argument("--top", type=int, default=3, help="Candidates to show per prompt")
+    route_p.add_argument("--json", action="store_true")
+    _add_profile_args(route_p)
+
+    # confusion-matrix command
+    cm_p = subparsers.add_parser(
+        "confusion-matrix", help="Route every skill's trigger prompts across all skills"
+    )
+    cm_p.add_argument("--skills-dir", default="skills")
+    cm_p.add_argument("--tests-dir", default="tests")
+    cm_p.add_argument("--json", action="store_true")
+    _add_cache_args(cm_p)
+    _add_profile_args(cm_p)
+
+    # serve command
+    serve_p = subparsers.add_parser(
+        "serve", help="Serve line-delimited JSON-RPC over stdin/stdout or a Unix socket"
+    )
+    serve_p.add_argument("--skills-dir", default="skills")
+    serve_p.add_argument("--tests-dir", default="tests")
+    serve_p.add_argument("--socket", metavar="PATH",
+                         help="Listen on this Unix socket instead of stdin/stdout")
+    _add_cache_args(serve_p)
+    _add_rules_args(serve_p)
+    _add_profile_args(serve_p)
+
+    # merge-scores command
+    merge_p = subparsers.add_parser(
+        "merge-scores", help="Sort and format results from score-all (NDJSON or JSON, e.g. shards)"
+    )
+    merge_p.add_argument("inputs", nargs="*", default=["-"],
+                         help="NDJSON files to merge (default: stdin)")
+    merge_p.add_argument("--json", action="store_const", const="json", dest="format",
+                         default="table", help="Same as --format json")
+    merge_p.add_argument("--format", choices=SCORE_FORMATS, default="table")
+    merge_p.add_argument("--sort", choices=list(SORT_KEYS), default="score")
+    merge_p.add_argument("--chunk-size", type=int, default=10_000,
+                         help="Results held in memory before spilling a sorted run to disk")
+
+    # cache command
+    cache_p = subparsers.add_parser("cache", help="Manage the harness and LM response caches")
+    cache_p.add_argument("action", choices=["clear"])
+    cache_p.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR))
 
     args = parser.parse_args()
+
+    if args.command == "merge-scores":
+        records = sort_scores(_read_score_inputs(args.inputs), args.sort, args.chunk_size)
+        try:
+            # Sorting reads every input before the first result is written.
+            first = next(records, None)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        except OSError as e:
+            merge_p.error(f"argument inputs: can't open '{e.filename}': {e.strerror}")
+        records = itertools.chain([first], records) if first is not None else iter(())
+        has_errors = _emit_scores(records, args.format)
+        sys.exit(1 if has_errors else 0)
+
+    if args.command == "cache":
+        for cache in (HarnessCache(Path(args.cache_dir)), LMCache(Path(args.cache_dir))):
+            if cache.clear():
+                print(f"✓ Removed {cache.path}")
+            else:
+                print(f"No cache at {cache.path}")
+        return
+
+    if args.command in ("optimize", "optimize-all"):
+        if args.resume and not args.run_dir:
+            parser.error("--resume requires --run-dir")
+        if args.stage_margin is not None and args.eval_mode != "suite":
+            parser.error("--stage-margin requires --eval-mode suite")
+
+    if args.profile or os.environ.get("SENSEI_PROFILE"):
+        PROFILER.enabled = True
+    cprofile = None
+    if args.profile_out:
+        import cProfile
+
+        cprofile = cProfile.Profile()
+        cprofile.enable()
+
+    harness_cache = None
+    if hasattr(args, "no_cache") and not args.no_cache:
+        harness_cache = HarnessCache(Path(args.cache_dir))
+    ignore = tuple(args.ignore) if getattr(args, "ignore", None) else DEFAULT_TEST_IGNORES
     skills_dir = Path(args.skills_dir)
-    tests_dir = Path(args.tests_dir)
+    tests_dir = Path(getattr(args, "tests_dir", "tests"))
     has_errors = False
 
     # Validate skills directory exists
@@ -528,8 +2786,32 @@ def main():
         print(f"Error: skills directory '{skills_dir}' not found", file=sys.stderr)
         sys.exit(1)
 
+    rules = token_limits = None
+    if hasattr(args, "rules"):
+        try:
+            rules = QualityRules.load(Path(args.rules)) if args.rules else None
+            # The token budget is opt-in: a .token-limits.json in the cwd
+            # (this repo has one for its docs) must not change default scores.
+            if args.token_limits:
+                token_limits = TokenLimits.load(Path("."), Path(args.token_limits))
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    bm25 = None
+    if getattr(args, "matcher", "keyword") == "bm25":
+        from bm25 import BM25Index, calibrate_bm25
+
+        bm25 = BM25Index.from_skills_dir(skills_dir)
+        if args.bm25_threshold == "auto":
+            calibrate_bm25(bm25, skills_dir, tests_dir, harness_cache, ignore)
+        else:
+            bm25.threshold = args.bm25_threshold
+
     if args.command == "score":
-        result = score_skill(args.skill, skills_dir, tests_dir)
+        test_files = scan_skill_tests(tests_dir / args.skill, ignore)
+        result = score_skill(
+            args.skill, skills_dir, tests_dir, harness_cache, test_files, rules, token_limits, bm25
+        ).to_dict()
         if "error" in result:
             has_errors = True
         if args.json:
@@ -538,22 +2820,119 @@ def main():
             _print_score(result)
 
     elif args.command == "score-all":
-        skills = sorted(
-            d.name for d in skills_dir.iterdir() if d.is_dir() and not d.name.startswith(".")
+        shard = None
+        if args.shard:
+            try:
+                shard = parse_shard(args.shard)
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(1)
+        if args.since and not args.baseline:
+            print("Error: --since requires --baseline", file=sys.stderr)
+            sys.exit(1)
+        if args.baseline and (args.watch or shard is not None):
+            print("Error: --baseline can't be combined with --watch or --shard", file=sys.stderr)
+            sys.exit(1)
+        if args.watch:
+            if shard is not None:
+                print("Error: --watch can't be combined with --shard", file=sys.stderr)
+                sys.exit(1)
+            if args.format == "json":
+                print("Error: --watch supports --format table or ndjson", file=sys.stderr)
+                sys.exit(1)
+            from scoring_server import ScoringSession
+            from watch import make_watcher, watch_scores
+
+            session = ScoringSession(
+                skills_dir, tests_dir, harness_cache, ignore, rules, token_limits, bm25
+            )
+            watcher = make_watcher([skills_dir, tests_dir], ignore, args.poll)
+            watch_scores(session, args.format, args.sort, args.jobs, watcher)
+            return
+        names = rescore = None
+        if args.baseline:
+            try:
+                baseline = load_baseline(Path(args.baseline))
+                changed = skills_changed_since(args.since, skills_dir, tests_dir) if args.since else None
+            except (OSError, ValueError) as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(1)
+            names = list_skills(skills_dir)
+            rescore = skills_to_rescore(names, baseline, changed)
+        results = iter_scores(
+            skills_dir, tests_dir, args.jobs, harness_cache, ignore, rules, token_limits, shard, bm25,
+            rescore,
         )
-        results = [score_skill(s, skills_dir, tests_dir) for s in skills]
-        if args.sort == "score":
-            results.sort(key=lambda r: r.get("quality_score", 0))
-        if any("error" in r for r in results):
-            has_errors = True
+        if args.baseline:
+            rescored = {}
+
+            def track(fresh):
+                for result in fresh:
+                    rescored[result.skill] = result = result.to_dict()
+                    yield result
+
+            results = merge_baseline(names, track(results), baseline)
+        if args.format != "ndjson":
+            results = sort_scores(results, args.sort)
+        has_errors = _emit_scores(results, args.format)
+        if args.baseline:
+            deltas = score_deltas(baseline, rescored, names)
+            if args.format == "table":
+                _print_score_deltas(deltas, len(names) - len(rescore))
+            else:
+                # stderr, so stdout keeps the score-all schema.
+                print(json.dumps({"deltas": deltas}, indent=2), file=sys.stderr)
+
+    elif args.command == "serve":
+        from scoring_server import ScoringSession, serve_socket, serve_stream
+
+        session = ScoringSession(
+            skills_dir, tests_dir, harness_cache, ignore, rules, token_limits, bm25
+        )
+        if args.socket:
+            try:
+                serve_socket(session, Path(args.socket))
+            except OSError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(1)
+        else:
+            serve_stream(session, sys.stdin, sys.stdout)
+
+    elif args.command == "route":
+        from routing import SkillRouter
+
+        router = SkillRouter.from_skills_dir(skills_dir)
+        prompts = args.prompt or [line.rstrip("\n") for line in sys.stdin if line.strip()]
+        routes = [
+            {"prompt": prompt, "route": c[0][0] if c else None,
+             "candidates": [{"skill": name, "matched": matched, "confidence": round(conf, 3)}
+                            for name, matched, conf in c[:args.top]]}
+            for prompt, c in ((p, router.candidates(p, args.top)) for p in prompts)
+        ]
+        if args.json:
+            print(json.dumps(routes, indent=2))
+        else:
+            _print_routes(routes)
+
+    elif args.command == "confusion-matrix":
+        from routing import confusion_matrix
+
+        result = confusion_matrix(skills_dir, tests_dir, harness_cache, ignore)
         if args.json:
-            print(json.dumps(results, indent=2))
+            print(json.dumps(result, indent=2))
         else:
-            _print_score_table(results)
+            _print_collision_report(result)
 
     elif args.command == "optimize":
         result = optimize_skill(
-            args.skill, skills_dir, tests_dir, args.iterations, args.model
+            args.skill, skills_dir, tests_dir, args.iterations, args.model, args.eval_mode,
+            harness_cache, scan_skill_tests(tests_dir / args.skill, ignore), rules, token_limits,
+            run_dir=Path(args.run_dir) if args.run_dir else None,
+            resume=args.resume,
+            lm_cache=None if args.no_lm_cache else LMCache(Path(args.cache_dir)),
+            stage_margin=args.stage_margin,
+            stage_fraction=args.stage_fraction,
+            bm25=bm25,
         )
         if "error" in result:
             has_errors = True
@@ -570,10 +2949,166 @@ def main():
                 print(f"\n--- Optimized content (first 500 chars) ---")
                 print(result["optimized"][:500])
 
+    elif args.command == "optimize-all":
+        start = time.perf_counter()
+        results = optimize_all(
+            skills_dir, tests_dir, args.budget, args.jobs, args.lm_concurrency, args.model,
+            args.eval_mode, harness_cache, ignore, rules, token_limits,
+            run_dir=Path(args.run_dir) if args.run_dir else None,
+            resume=args.resume,
+            lm_cache=None if args.no_lm_cache else LMCache(Path(args.cache_dir)),
+            stage_margin=args.stage_margin,
+            stage_fraction=args.stage_fraction,
+            skills=args.skills,
+            bm25=bm25,
+        )
+        optimized = 0
+        for result in results:
+            has_errors |= "error" in result
+            optimized += "optimized" in result
+            if args.format == "ndjson":
+                print(json.dumps(result, default=str), flush=True)
+            else:
+                _print_optimize_result(result)
+        if args.format == "table":
+            print(f"\nOptimized {optimized} skill(s) in {time.perf_counter() - start:.1f}s")
+
+    if cprofile is not None:
+        cprofile.disable()
+        cprofile.dump_stats(args.profile_out)
+    if PROFILER.enabled:
+        # stderr, so --json stdout stays machine-readable.
+        if getattr(args, "json", False) or getattr(args, "format", "table") != "table":
+            print(json.dumps({"profile": PROFILER.snapshot()}, indent=2), file=sys.stderr)
+        else:
+            print(PROFILER.report(), file=sys.stderr)
+
     if has_errors:
         sys.exit(1)
 
 
+def _add_cache_args(parser: argparse.ArgumentParser):
+    """Add the harness discovery and cache flags shared by the scoring commands."""
+    parser.add_argument("--ignore", action="append", metavar="GLOB",
+                        help="Skip matching file/dir names in --tests-dir "
+                             f"(repeatable; default: {', '.join(DEFAULT_TEST_IGNORES)})")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR),
+                        help="Directory for the parsed-harness cache")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Parse test files directly, bypassing the harness cache")
+
+
+def _add_rules_args(parser: argparse.ArgumentParser):
+    """Add the quality rule, token limit and matcher flags shared by the scoring commands."""
+    from bm25 import BM25_THRESHOLD, MATCHERS
+
+    parser.add_argument("--rules", metavar="FILE",
+                        help="JSON file of content quality rules to score with instead of "
+                             "the defaults (set \"include_defaults\": true to extend them)")
+    parser.add_argument("--token-limits", metavar="FILE", nargs="?", const=TOKEN_LIMITS_FILE,
+                        help=f"Add a token_budget quality score using this token limits config "
+                             f"(FILE defaults to {TOKEN_LIMITS_FILE}); without the flag, token "
+                             f"counts don't affect scores")
+    parser.add_argument("--matcher", choices=MATCHERS, default="keyword",
+                        help="Score triggers by keyword counting, or by BM25 over skill "
+                             "descriptions (IDF across all skills)")
+    parser.add_argument("--bm25-threshold", type=_bm25_threshold, default="auto",
+                        metavar="SCORE|auto",
+                        help=f"BM25 score needed to trigger (default: auto, fitted to the labelled "
+                             f"trigger prompts under --tests-dir, or {BM25_THRESHOLD} if there are none)")
+
+
+def _bm25_threshold(value: str):
+    if value == "auto":
+        return value
+    try:
+        threshold = float(value)
+    except ValueError:
+        threshold = 0.0
+    if not threshold > 0:
+        raise argparse.ArgumentTypeError(f"expected a positive number or 'auto', got {value!r}")
+    return threshold
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected an integer >= 1, got {value!r}")
+    return number
+
+
+def _non_negative_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = -1
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"expected an integer >= 0, got {value!r}")
+    return number
+
+
+def _stage_margin(value: str) -> float:
+    try:
+        margin = float(value)
+    except ValueError:
+        margin = -1.0
+    if not margin >= 0:
+        raise argparse.ArgumentTypeError(f"expected a number >= 0, got {value!r}")
+    return margin
+
+
+def _stage_fraction(value: str) -> float:
+    try:
+        fraction = float(value)
+    except ValueError:
+        fraction = 0.0
+    if not 0 < fraction <= 1:
+        raise argparse.ArgumentTypeError(f"expected a number in (0, 1], got {value!r}")
+    return fraction
+
+
+def _add_optimize_args(parser: argparse.ArgumentParser):
+    """Add the model, evaluator and run flags shared by the optimize commands."""
+    parser.add_argument("--model", default="openai/gpt-4o")
+    parser.add_argument("--eval-mode", choices=EVAL_MODES, default="example",
+                        help="Score each example's prompt only, or the full trigger suite per call")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the interrupted run in --run-dir")
+    parser.add_argument("--no-lm-cache", action="store_true",
+                        help="Always call the model instead of replaying cached responses")
+    parser.add_argument("--stage-margin", type=_stage_margin, metavar="M",
+                        help="Suite mode: score candidates on a stratified subset of prompts "
+                             "first and drop those more than M below the best score")
+    parser.add_argument("--stage-fraction", type=_stage_fraction, default=0.125,
+                        help="Share of prompts in the first stage (default: 0.125)")
+
+
+def _add_profile_args(parser: argparse.ArgumentParser):
+    """Add the --profile flags shared by the scoring commands."""
+    parser.add_argument("--profile", action="store_true",
+                        help="Print per-phase timings and counters to stderr "
+                             "(also enabled by SENSEI_PROFILE=1)")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="Write cProfile stats for the main process to FILE (pstats format)")
+
+
+def _print_optimize_result(result: dict):
+    """Print one finished optimize-all skill as a single line."""
+    name = result["skill"]
+    if "error" in result:
+        print(f"⚠ {name}: {result['error']}", flush=True)
+    elif "skipped" in result:
+        print(f"- {name:<30} {result['baseline_score']:.2f}  skipped: {result['skipped']}", flush=True)
+    else:
+        best = result.get("best_score")
+        best = f"{best:.2f}" if isinstance(best, (int, float)) else "N/A"
+        print(f"✓ {name:<30} {result['baseline_score']:.2f} → {best}  "
+              f"({result['budget']} metric calls)", flush=True)
+
+
 def _print_score(result: dict):
     """Pretty-print a single skill score."""
     if "error" in result:
@@ -594,11 +3129,44 @@ def _print_score(result: dict):
             print(f"    ⚠ {fb}")
 
 
-def _print_score_table(results: list[dict]):
-    """Pretty-print score table for all skills."""
+def _print_routes(routes: list[dict]):
+    """Pretty-print ``route`` results."""
+    from routing import UNROUTED
+
+    for r in routes:
+        print(f"\n  {r['prompt']!r}")
+        if not r["candidates"]:
+            print(f"    {UNROUTED}")
+        for i, c in enumerate(r["candidates"]):
+            arrow = "→" if i == 0 else " "
+            print(f"    {arrow} {c['skill']:<30} {c['confidence']:>6.1%}  {', '.join(c['matched'])}")
+
+
+def _print_collision_report(result: dict):
+    """Pretty-print the per-skill collision report of ``confusion_matrix``."""
+    print(f"\n{'Skill':<30} {'Prompts':>8} {'Routed':>7} {'Unrouted':>9}  Stolen by")
+    print("─" * 80)
+    for r in sorted(result["report"], key=lambda r: (r["accuracy"] is None, r["accuracy"] or 0, r["skill"])):
+        if not r["prompts"]:
+            print(f"  {r['skill']:<28} {0:>8} {'N/A':>7} {'-':>9}")
+            continue
+        icon = "✓" if r["accuracy"] >= 0.8 else "✗"
+        stolen = ", ".join(f"{name} ({n})" for name, n in list(r["stolen_by"].items())[:3])
+        print(f"{icon} {r['skill']:<28} {r['prompts']:>8} {r['accuracy']:>7.2f} "
+              f"{r['unrouted']:>9}  {stolen}")
+    if result["prompts"]:
+        print(f"\n  {result['correct']}/{result['prompts']} trigger prompts routed to their own skill "
+              f"({result['accuracy']:.2f}) across {result['skills']} skills")
+
+
+def _print_score_table(results):
+    """Pretty-print score table for all skills (any iterable of results)."""
     print(f"\n{'Skill':<30} {'Quality':>8} {'Triggers':>9} {'Tests':>6}")
     print("─" * 56)
+    passing = total = 0
     for r in results:
+        total += 1
+        passing += r.get("quality_score", 0) >= 0.8
         if "error" in r:
             print(f"{r['skill']:<30} {'ERROR':>8}")
             continue
@@ -613,9 +3181,12 @@ def _print_score_table(results: list[dict]):
         t_str = f"{t:.2f}" if t is not None else "N/A"
         print(f"{icon} {r['skill']:<28} {q:>8.2f} {t_str:>9} {tests:>6}")
 
-    passing = sum(1 for r in results if r.get("quality_score", 0) >= 0.8)
-    print(f"\n  {passing}/{len(results)} skills at quality >= 0.80")
+    print(f"\n  {passing}/{total} skills at quality >= 0.80")
 
 
 if __name__ == "__main__":
-    main()
+    # Run from the importable module rather than __main__, so the sibling
+    # modules that import auto_evaluator share its classes and PROFILER.
+    import auto_evaluator
+
+    auto_evaluator.main()
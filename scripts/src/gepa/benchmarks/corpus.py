@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic skills/tests corpus for benchmarking auto_evaluator.py.
+
+Writes skills/<name>/SKILL.md and tests/<name>/triggers.test.ts trees shaped
+like a real skill repository. The same (skills, prompts, seed) always produces
+byte-identical files.
+
+Usage:
+    python corpus.py --out /tmp/corpus --skills 100 --prompts 50
+"""
+
+import argparse
+import random
+from pathlib import Path
+
+SERVICES = [
+    "azure", "storage", "cosmos", "sql", "redis", "keyvault", "functions",
+    "container", "aks", "kubernetes", "bicep", "terraform", "monitor",
+    "diagnostics", "rbac", "identity", "entra", "foundry", "agent", "model",
+    "networking", "observability", "pipeline", "database", "cache", "queue",
+]
+ACTIONS = [
+    "deploy", "configure", "create", "troubleshoot", "migrate", "scale",
+    "secure", "monitor", "optimize", "provision", "validate", "debug",
+]
+FILLER = [
+    "the", "my", "a", "new", "existing", "production", "staging", "quickly",
+    "please", "with", "using", "for", "team", "project", "app", "service",
+    "workload", "resources", "settings", "environment", "region", "costs",
+]
+OFF_TOPIC = [
+    "What is the weather today?",
+    "Write a haiku about autumn leaves",
+    "How do I bake sourdough bread?",
+    "Summarize the plot of Hamlet",
+    "Translate good morning into French",
+    "Explain the rules of chess",
+    "Recommend a good science fiction novel",
+    "What time zone is Tokyo in?",
+]
+
+
+def skill_names(count: int, seed: int = 0) -> list[str]:
+    """Return ``count`` unique, deterministic skill names."""
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(SERVICES)}-{rng.choice(ACTIONS)}-{i:05d}" for i in range(count)
+    ]
+
+
+def skill_md(name: str, rng: random.Random) -> str:
+    """Render a SKILL.md with frontmatter, routing patterns and body sections."""
+    service, action = name.split("-")[:2]
+    topics = rng.sample(SERVICES, 4)
+    description = (
+        f"{action.title()} and manage {service} resources for {', '.join(topics)} workloads. "
+        f"USE FOR: {action} {service}, {rng.choice(ACTIONS)} {topics[0]}, "
+        f"{rng.choice(ACTIONS)} {topics[1]}. "
+        f"WHEN: user asks to {action} {service} or {rng.choice(ACTIONS)} {topics[2]}."
+    )
+    lines = [
+        "---",
+        f"name: {name}",
+        f'description: "{description}"',
+        "---",
+        "",
+        f"# {name}",
+        "",
+    ]
+    if rng.random() < 0.9:
+        lines += ["## Rules", "", f"- Confirm the target {service} resource before changes.",
+                  "- Never print secrets.", ""]
+    if rng.random() < 0.9:
+        lines += ["## Steps", ""]
+        lines += [f"{i}. {rng.choice(ACTIONS).title()} the {rng.choice(SERVICES)} "
+                  f"{rng.choice(FILLER)} {rng.choice(FILLER)}." for i in range(1, 8)]
+        lines.append("")
+    lines += ["## Reference", ""]
+    for _ in range(rng.randint(5, 40)):
+        lines.append(" ".join(rng.choice(SERVICES + ACTIONS + FILLER) for _ in range(14)) + ".")
+    if rng.random() < 0.05:
+        lines.append("TODO: document the rollback path.")
+    return "\n".join(lines) + "\n"
+
+
+def trigger_prompt(name: str, rng: random.Random) -> str:
+    """Write a prompt that mentions the skill's service and action."""
+    service, action = name.split("-")[:2]
+    words = [action, rng.choice(FILLER), service, rng.choice(FILLER), rng.choice(SERVICES)]
+    rng.shuffle(words)
+    return " ".join(words).capitalize() + rng.choice(["", "?", " please", " now"])
+
+
+def triggers_test_ts(name: str, prompts: int, rng: random.Random) -> str:
+    """Render a triggers.test.ts with shouldTrigger/shouldNotTrigger arrays."""
+    should = [trigger_prompt(name, rng) for _ in range(prompts - prompts // 3)]
+    should_not = [rng.choice(OFF_TOPIC) + f" ({i})" for i in range(prompts // 3)]
+
+    def render(var, items):
+        body = "\n".join(f"    '{p}'," for p in items)
+        return f"  const {var}: string[] = [\n{body}\n  ];\n"
+
+    return (
+        "import { describe, it, expect } from 'vitest';\n"
+        "import { TriggerMatcher } from '../utils/trigger-matcher';\n\n"
+        f"describe('{name} - Trigger Tests', () => {{\n"
+        + render("shouldTriggerPrompts", should)
+        + render("shouldNotTriggerPrompts", should_not)
+        + "\n  it.each(shouldTriggerPrompts)('triggers on: %s', (prompt) => {\n"
+        "    expect(matcher.shouldTrigger(prompt).triggered).toBe(true);\n"
+        "  });\n});\n"
+    )
+
+
+def generate_corpus(root: Path, skills: int = 10, prompts: int = 10, seed: int = 0) -> tuple[Path, Path]:
+    """Write a synthetic corpus under ``root``; returns (skills_dir, tests_dir)."""
+    rng = random.Random(seed)
+    skills_dir = Path(root) / "skills"
+    tests_dir = Path(root) / "tests"
+    for name in skill_names(skills, seed):
+        (skills_dir / name).mkdir(parents=True, exist_ok=True)
+        (skills_dir / name / "SKILL.md").write_text(skill_md(name, rng))
+        test_dir = tests_dir / name
+        if rng.random() < 0.1:
+            test_dir = test_dir / "nested"
+        test_dir.mkdir(parents=True, exist_ok=True)
+        (test_dir / "triggers.test.ts").write_text(triggers_test_ts(name, prompts, rng))
+        if rng.random() < 0.5:
+            (test_dir / "unit.test.ts").write_text("// unit tests\n")
+        if rng.random() < 0.3:
+            (test_dir / "integration.test.ts").write_text("// integration tests\n")
+    return skills_dir, tests_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic skills/tests corpus")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--skills", type=int, default=10)
+    parser.add_argument("--prompts", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    skills_dir, tests_dir = generate_corpus(Path(args.out), args.skills, args.prompts, args.seed)
+    print(f"✓ Wrote {args.skills} skills to {skills_dir} and {tests_dir}")
+
+
+if __name__ == "__main__":
+    main()
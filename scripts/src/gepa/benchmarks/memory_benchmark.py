@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for auto_evaluator.py's harness, verdict and score types.
+
+Measures the memory retained by every skill's test harness, one candidate's
+trigger verdicts over each suite, and the score-all results, both as the
+nested dicts auto_evaluator.py used to hold and as the slotted ``Harness``,
+``TriggerVerdicts`` and ``SkillScore`` types, using tracemalloc.
+
+Usage:
+    python memory_benchmark.py --skills 1000 --prompts 50
+    python memory_benchmark.py --skills 1000 --prompts 50 --output memory.json
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import auto_evaluator as ae  # noqa: E402
+from corpus import generate_corpus  # noqa: E402
+
+
+def retained(build) -> tuple[object, int]:
+    """Return ``build()`` and the bytes it still holds once built."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        value = build()
+        gc.collect()
+        return value, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def legacy_harness(tests_dir: Path, name: str, test_files: dict) -> dict:
+    """The nested dict ``discover_test_harness`` used to return."""
+    result = {
+        "has_triggers": False,
+        "has_integration": test_files["has_integration"],
+        "has_unit": test_files["has_unit"],
+        "trigger_prompts": {"should_trigger": [], "should_not_trigger": []},
+    }
+    for trigger_file in test_files["trigger_files"]:
+        result["has_triggers"] = True
+        prompts = ae.parse_trigger_arrays(trigger_file)
+        result["trigger_prompts"]["should_trigger"].extend(prompts["should_trigger"])
+        result["trigger_prompts"]["should_not_trigger"].extend(prompts["should_not_trigger"])
+    return result
+
+
+def run_memory_benchmarks(skills_dir: Path, tests_dir: Path) -> dict:
+    """Measure each structure both ways; returns {name: {legacy, slotted, ratio}}."""
+    names = ae.list_skills(skills_dir)
+    index = ae.index_tests_tree(tests_dir)
+    no_tests = {"trigger_files": [], "has_integration": False, "has_unit": False}
+    files = {n: index.get(n, no_tests) for n in names}
+    results = {}
+
+    def record(name, legacy, slotted):
+        results[name] = {"legacy_bytes": legacy, "slotted_bytes": slotted,
+                         "ratio": slotted / legacy if legacy else None}
+
+    legacy, legacy_bytes = retained(lambda: [legacy_harness(tests_dir, n, files[n]) for n in names])
+    harnesses, slotted_bytes = retained(
+        lambda: [ae.discover_test_harness(tests_dir, n, test_files=files[n]) for n in names])
+    record("harnesses", legacy_bytes, slotted_bytes)
+
+    # A long-running process re-discovers harnesses as files change; prompts
+    # it has seen before resolve to the interned copies.
+    rebuilt, legacy_bytes = retained(lambda: [legacy_harness(tests_dir, n, files[n]) for n in names])
+    _, slotted_bytes = retained(
+        lambda: [ae.discover_test_harness(tests_dir, n, test_files=files[n]) for n in names])
+    record("rediscovered", legacy_bytes, slotted_bytes)
+    del rebuilt
+
+    # One candidate's verdicts over each skill's suite, as the evaluator keeps them.
+    matchers = [
+        ae.TriggerMatcher(ae.extract_keywords(n, (skills_dir / n / "SKILL.md").read_text()[:1000]))
+        for n in names
+    ]
+    _, legacy_bytes = retained(lambda: [
+        {p: m.match(p) for p in h["trigger_prompts"]["should_trigger"] + h["trigger_prompts"]["should_not_trigger"]}
+        for h, m in zip(legacy, matchers)
+    ])
+
+    def slotted_verdicts():
+        stores = []
+        for h, m in zip(harnesses, matchers):
+            store = ae.TriggerVerdicts(m, h.prompt_index())
+            for p in h.prompts:
+                store.verdict(p)
+            stores.append(store)
+        return stores
+
+    _, slotted_bytes = retained(slotted_verdicts)
+    record("verdicts", legacy_bytes, slotted_bytes)
+    del legacy
+
+    scores = ae.score_all(skills_dir, tests_dir, jobs=1)
+    dumped = json.dumps([s.to_dict() for s in scores])
+    _, legacy_bytes = retained(lambda: json.loads(dumped))
+    _, slotted_bytes = retained(lambda: [ae.SkillScore(**d) for d in json.loads(dumped)])
+    record("scores", legacy_bytes, slotted_bytes)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure auto-evaluator memory use")
+    parser.add_argument("--skills", type=int, default=200)
+    parser.add_argument("--prompts", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus-dir", help="Reuse/keep the corpus here instead of a temp dir")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(args.corpus_dir or tmp)
+        skills_dir, tests_dir = root / "skills", root / "tests"
+        if not skills_dir.exists():
+            generate_corpus(root, args.skills, args.prompts, args.seed)
+        results = run_memory_benchmarks(skills_dir, tests_dir)
+
+    print(f"\n{'Structure':<14} {'legacy KiB':>12} {'slotted KiB':>12} {'ratio':>8}")
+    print("─" * 49)
+    for name, r in results.items():
+        print(f"{name:<14} {r['legacy_bytes'] / 1024:>12.1f} {r['slotted_bytes'] / 1024:>12.1f} "
+              f"{r['ratio']:>8.2f}")
+
+    if args.output:
+        report = {"meta": {"skills": args.skills, "prompts": args.prompts, "seed": args.seed},
+                  "results": results}
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\n✓ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for auto_evaluator.py on a synthetic corpus.
+
+Times the scoring pipeline phase by phase (frontmatter parsing, quality
+scoring, keyword extraction, keyword and BM25 trigger matching, TS parsing),
+whole-skill scoring, score-all and evaluator throughput, and writes JSON
+results that can be compared across commits.
+
+Usage:
+    # Run and save results
+    python run_benchmarks.py --skills 200 --prompts 100 --output bench.json
+
+    # Compare against a saved baseline; exits 1 on a >10% slowdown
+    python run_benchmarks.py --skills 200 --prompts 100 --compare bench.json --threshold 0.10
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import auto_evaluator as ae  # noqa: E402
+from bm25 import BM25Index, PromptBatch  # noqa: E402
+from corpus import generate_corpus  # noqa: E402
+
+
+def timed(fn, ops: int = 1, repeat: int = 5, min_time: float = 0.2) -> dict:
+    """Time ``fn`` (which performs ``ops`` operations) and report the best run.
+
+    Each run calls ``fn`` in a loop until ``min_time`` has elapsed; the best
+    of ``repeat`` runs is reported to filter out scheduler noise.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            fn()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / (calls * ops))
+    return {"seconds_per_op": best, "ops_per_sec": 1 / best if best else None, "ops": ops}
+
+
+def run_benchmarks(skills_dir: Path, tests_dir: Path, repeat: int = 5, jobs: int | None = None) -> dict:
+    """Run every benchmark against a corpus and return {name: timing}."""
+    names = ae.list_skills(skills_dir)
+    contents = [(skills_dir / n / "SKILL.md").read_text() for n in names]
+    parsed = [ae.parse_frontmatter(c) for c in contents]
+    index = ae.index_tests_tree(tests_dir)
+    trigger_files = [f for n in names for f in index.get(n, {}).get("trigger_files", [])]
+    harnesses = [ae.discover_test_harness(tests_dir, n, test_files=index.get(n)) for n in names]
+    keyword_sets = [ae.extract_keywords(n, body[:1000]) for n, (_, body) in zip(names, parsed)]
+    prompt_pairs = [
+        (p, kws)
+        for h, kws in zip(harnesses, keyword_sets)
+        for p in h.prompts
+    ]
+
+    results = {}
+    results["parse_frontmatter"] = timed(
+        lambda: [ae.parse_frontmatter(c) for c in contents], len(contents), repeat)
+    results["score_content_quality"] = timed(
+        lambda: [ae.score_content_quality(body, fm) for fm, body in parsed], len(parsed), repeat)
+    results["extract_keywords"] = timed(
+        lambda: [ae.extract_keywords(n, body[:1000]) for n, (_, body) in zip(names, parsed)],
+        len(names), repeat)
+    results["check_trigger"] = timed(
+        lambda: [ae.check_trigger(p, kws) for p, kws in prompt_pairs], len(prompt_pairs), repeat)
+    results["trigger_matcher"] = timed(
+        lambda: [ae.TriggerMatcher(kws).match_many(h.prompts) for h, kws in zip(harnesses, keyword_sets)],
+        len(prompt_pairs), repeat)
+    bm25_index = BM25Index.from_skills_dir(skills_dir)
+    bm25_sets = [
+        (bm25_index.matcher(n, str(fm.get("description", ""))), PromptBatch(h.prompts))
+        for n, (fm, _), h in zip(names, parsed, harnesses)
+    ]
+    results["bm25_scores"] = timed(
+        lambda: [m.scores(batch) for m, batch in bm25_sets], len(prompt_pairs), repeat)
+    results["parse_trigger_arrays"] = timed(
+        lambda: [ae.parse_trigger_arrays(f) for f in trigger_files], len(trigger_files), repeat)
+    results["score_skill"] = timed(
+        lambda: [ae.score_skill(n, skills_dir, tests_dir) for n in names], len(names), repeat)
+    results["score_all_serial"] = timed(
+        lambda: ae.score_all(skills_dir, tests_dir, jobs=1), len(names), repeat)
+    results["score_all_parallel"] = timed(
+        lambda: ae.score_all(skills_dir, tests_dir, jobs=jobs), len(names), min(repeat, 3))
+
+    # Evaluator throughput: one distinct candidate per pass over the dataset,
+    # the way a GEPA iteration evaluates a fresh proposal on every example.
+    skill = names[0]
+    for mode in ae.EVAL_MODES:
+        evaluator, harness = ae.build_evaluator(skill, tests_dir, mode=mode)
+        dataset = [{"prompt": p, "expected": True} for p in harness.should_trigger]
+        dataset += [{"prompt": p, "expected": False} for p in harness.should_not_trigger]
+        counter = iter(range(10**9))
+
+        def one_pass():
+            candidate = contents[0] + f"\n<!-- {next(counter)} -->\n"
+            for example in dataset:
+                evaluator(candidate, example)
+
+        results[f"evaluator_{mode}_calls"] = timed(one_pass, len(dataset), repeat)
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return a message for each benchmark slower than baseline by > threshold."""
+    regressions = []
+    for name, timing in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        ratio = timing["seconds_per_op"] / base["seconds_per_op"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {ratio:.2f}x slower than baseline")
+    return regressions
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL,
+            cwd=Path(__file__).parent,
+        ).decode().strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the GEPA auto-evaluator")
+    parser.add_argument("--skills", type=int, default=50)
+    parser.add_argument("--prompts", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--corpus-dir", help="Reuse/keep the corpus here instead of a temp dir")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed slowdown vs baseline before failing (default: 0.10)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(args.corpus_dir or tmp)
+        skills_dir, tests_dir = root / "skills", root / "tests"
+        if not skills_dir.exists():
+            generate_corpus(root, args.skills, args.prompts, args.seed)
+        timings = run_benchmarks(skills_dir, tests_dir, args.repeat, args.jobs)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "skills": args.skills,
+            "prompts": args.prompts,
+            "seed": args.seed,
+        },
+        "results": timings,
+    }
+
+    print(f"\n{'Benchmark':<28} {'µs/op':>12} {'ops/sec':>12}")
+    print("─" * 54)
+    for name, t in timings.items():
+        print(f"{name:<28} {t['seconds_per_op'] * 1e6:>12.1f} {t['ops_per_sec']:>12.0f}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\n✓ Results written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for msg in regressions:
+                print(f"  {msg}")
+            sys.exit(1)
+        print(f"\n✓ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
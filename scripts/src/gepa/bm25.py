@@ -0,0 +1,268 @@
+"""
+BM25 trigger scoring for the GEPA auto-evaluator (``--matcher bm25``).
+
+Scores prompts against each skill's name and description with BM25, using
+corpus statistics (IDF) across all skills, as an alternative to keyword
+counting. ``BM25Matcher`` has the ``TriggerMatcher`` interface, so the
+evaluator and scorers in auto_evaluator.py take either.
+"""
+
+import functools
+import math
+import re
+from collections import OrderedDict
+from pathlib import Path
+
+from auto_evaluator import (
+    DEFAULT_TEST_IGNORES,
+    STOP_WORDS,
+    HarnessCache,
+    SkillDocument,
+    TriggerResult,
+    _require_numpy,
+    discover_test_harness,
+    index_tests_tree,
+    list_skills,
+    profiled,
+    stem,
+)
+
+
+MATCHERS = ("keyword", "bm25")
+
+# Fallback raw BM25 score a prompt needs to trigger a skill, used when no
+# skill has labelled trigger prompts to calibrate against (the CLI fits the
+# threshold to the tests by default; see calibrate_bm25). It was only tuned
+# on the synthetic benchmark corpus (benchmarks/corpus.py), not on real
+# skill descriptions.
+BM25_THRESHOLD = 3.0
+
+_BM25_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def bm25_terms(text: str) -> list[str]:
+    """Tokenize text for BM25: lowercase words, stop words dropped, stemmed."""
+    terms = []
+    for word in _BM25_TOKEN.findall(text.lower()):
+        term = _bm25_term(word)
+        if term:
+            terms.append(term)
+    return terms
+
+
+@functools.lru_cache(maxsize=65536)
+def _bm25_term(word: str) -> str | None:
+    if (len(word) > 2 or word == "ai") and word not in STOP_WORDS:
+        return stem(word)
+    return None
+
+
+class PromptBatch:
+    """Prompts encoded once as a sparse term-incidence matrix (CSR arrays).
+
+    Row i lists the distinct vocabulary ids of prompt i's BM25 terms in
+    ``indices[indptr[i]:indptr[i + 1]]``.
+    """
+
+    def __init__(self, prompts):
+        np = _require_numpy()
+        self.prompts = list(prompts)
+        self.vocab: dict[str, int] = {}
+        indices = []
+        indptr = [0]
+        for prompt in self.prompts:
+            for term in dict.fromkeys(bm25_terms(prompt)):
+                indices.append(self.vocab.setdefault(term, len(self.vocab)))
+            indptr.append(len(indices))
+        self.terms = list(self.vocab)
+        self.indices = np.array(indices, dtype=np.int64)
+        self.indptr = np.array(indptr, dtype=np.int64)
+        # Row of each entry in ``indices``, so row sums are one bincount.
+        self._rows = np.repeat(np.arange(len(self.prompts)), np.diff(self.indptr))
+
+    def __len__(self) -> int:
+        return len(self.prompts)
+
+    def dot(self, weights: dict[str, float]):
+        """Return each prompt's summed ``weights`` over its terms (sparse dot product)."""
+        np = _require_numpy()
+        if not len(self.indices):
+            return np.zeros(len(self.prompts))
+        dense = np.zeros(len(self.vocab))
+        for term, weight in weights.items():
+            j = self.vocab.get(term)
+            if j is not None:
+                dense[j] = weight
+        return np.bincount(self._rows, weights=dense[self.indices], minlength=len(self.prompts))
+
+
+class BM25Index:
+    """BM25 corpus statistics over every skill's name and description.
+
+    Each skill is a document: its name parts plus its frontmatter description.
+    ``matcher`` turns a skill (or a candidate description) into a term-weight
+    vector against these statistics; prompts are the queries. A prompt
+    triggers when its score reaches ``threshold``.
+    """
+
+    def __init__(
+        self,
+        documents: dict[str, str],
+        threshold: float = BM25_THRESHOLD,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.threshold = threshold
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(documents)
+        self.df: dict[str, int] = {}
+        total_len = 0
+        for name, description in documents.items():
+            terms = self.document_terms(name, description)
+            total_len += len(terms)
+            for term in set(terms):
+                self.df[term] = self.df.get(term, 0) + 1
+        self.avgdl = total_len / self.n_docs if self.n_docs else 1.0
+
+    @classmethod
+    def from_skills_dir(cls, skills_dir: Path, threshold: float = BM25_THRESHOLD) -> "BM25Index":
+        documents = {}
+        for name in list_skills(skills_dir):
+            skill_md = skills_dir / name / "SKILL.md"
+            if skill_md.exists():
+                with SkillDocument(skill_md) as doc:
+                    documents[name] = str(doc.frontmatter.get("description", ""))
+        return cls(documents, threshold)
+
+    @staticmethod
+    def document_terms(skill_name: str, description: str) -> list[str]:
+        return bm25_terms(skill_name.replace("-", " ") + " " + description)
+
+    def idf(self, term: str) -> float:
+        df = self.df.get(term, 0)
+        return math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+
+    def weights(self, skill_name: str, description: str) -> dict[str, float]:
+        """BM25 term weights (idf × saturated term frequency) for one document."""
+        terms = self.document_terms(skill_name, description)
+        norm = self.k1 * (1 - self.b + self.b * len(terms) / (self.avgdl or 1.0))
+        counts: dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        return {
+            term: self.idf(term) * tf * (self.k1 + 1) / (tf + norm)
+            for term, tf in counts.items()
+        }
+
+    def matcher(self, skill_name: str, description: str) -> "BM25Matcher":
+        return BM25Matcher(self.weights(skill_name, description), self.threshold)
+
+
+class BM25Matcher:
+    """Trigger matcher scoring prompts by BM25 against one skill's terms.
+
+    Has the ``TriggerMatcher`` interface; matched terms are the prompt's
+    terms found in the skill's document, and confidence is
+    score / (score + threshold), so it crosses 0.5 exactly at the threshold.
+    """
+
+    def __init__(self, weights: dict[str, float], threshold: float):
+        self.weights = weights
+        self.threshold = threshold
+        self._batches: OrderedDict[tuple, PromptBatch] = OrderedDict()
+
+    def _batch(self, prompts) -> PromptBatch:
+        if isinstance(prompts, PromptBatch):
+            return prompts
+        key = tuple(prompts)
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = PromptBatch(key)
+            if len(self._batches) > 4:
+                self._batches.popitem(last=False)
+        return batch
+
+    @profiled("trigger_match")
+    def scores(self, prompts):
+        """BM25 score of every prompt (a list or a ``PromptBatch``), as an array."""
+        return self._batch(prompts).dot(self.weights)
+
+    def triggered(self, prompts):
+        """Boolean array: which prompts reach the threshold."""
+        return self.scores(prompts) >= self.threshold
+
+    def match(self, prompt: str) -> TriggerResult:
+        """Match one prompt; returns (triggered, matched_terms, confidence)."""
+        return self.match_many(PromptBatch([prompt]))[0]
+
+    def match_many(self, prompts) -> list[TriggerResult]:
+        """Match a batch of prompts; same result as ``match`` for each one."""
+        batch = self._batch(prompts)
+        scores = self.scores(batch)
+        results = []
+        for i, score in enumerate(scores.tolist()):
+            row = batch.indices[batch.indptr[i]:batch.indptr[i + 1]].tolist()
+            matched = [batch.terms[j] for j in row if batch.terms[j] in self.weights]
+            confidence = score / (score + self.threshold) if score > 0 else 0.0
+            results.append(TriggerResult(score >= self.threshold, matched, confidence))
+        return results
+
+
+def calibrate_threshold(scores, expected) -> float:
+    """Return the score threshold that classifies ``expected`` most accurately.
+
+    ``scores`` and ``expected`` are parallel sequences (BM25 score, should
+    trigger). The threshold is placed midway between the two scores that
+    bound the best split, so it doesn't sit on any observed score.
+    """
+    np = _require_numpy()
+    scores = np.asarray(scores, dtype=float)
+    expected = np.asarray(expected, dtype=bool)
+    order = np.argsort(scores, kind="stable")
+    s, y = scores[order], expected[order]
+    n = len(s)
+    if not n:
+        return BM25_THRESHOLD
+    # Splitting before index i predicts "trigger" for s[i:].
+    negatives_below = np.concatenate([[0], np.cumsum(~y)])
+    positives_above = y.sum() - np.concatenate([[0], np.cumsum(y)])
+    correct = negatives_below + positives_above
+    distinct = np.ones(n + 1, dtype=bool)
+    distinct[1:n] = s[1:] != s[:-1]
+    best = int(np.argmax(np.where(distinct, correct, -1)))
+    if best == 0:
+        threshold = s[0] / 2
+    elif best == n:
+        threshold = s[-1] + 1.0
+    else:
+        threshold = (s[best - 1] + s[best]) / 2
+    return max(float(threshold), 1e-6)
+
+
+def calibrate_bm25(
+    index: BM25Index,
+    skills_dir: Path,
+    tests_dir: Path,
+    harness_cache: "HarnessCache | None" = None,
+    ignore=None,
+) -> float:
+    """Fit ``index.threshold`` to every skill's labelled trigger prompts.
+
+    Returns the new threshold. ``ignore`` defaults to ``DEFAULT_TEST_IGNORES``.
+    """
+    np = _require_numpy()
+    tests = index_tests_tree(tests_dir, ignore or DEFAULT_TEST_IGNORES)
+    scores, expected = [], []
+    for name in list_skills(skills_dir):
+        skill_md = skills_dir / name / "SKILL.md"
+        if not skill_md.exists() or name not in tests:
+            continue
+        harness = discover_test_harness(tests_dir, name, harness_cache, tests[name])
+        with SkillDocument(skill_md) as doc:
+            matcher = index.matcher(name, str(doc.frontmatter.get("description", "")))
+        for label, prompts in ((True, harness.should_trigger), (False, harness.should_not_trigger)):
+            scores.append(matcher.scores(prompts))
+            expected += [label] * len(prompts)
+    index.threshold = calibrate_threshold(np.concatenate(scores) if scores else [], expected)
+    return index.threshold
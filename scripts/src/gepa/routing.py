@@ -0,0 +1,161 @@
+"""
+Cross-skill routing for the GEPA auto-evaluator (``route`` and ``confusion-matrix``).
+"""
+
+from pathlib import Path
+
+from auto_evaluator import (
+    DEFAULT_TEST_IGNORES,
+    HarnessCache,
+    SkillDocument,
+    TriggerMatcher,
+    discover_test_harness,
+    extract_keywords,
+    index_tests_tree,
+    list_skills,
+)
+
+
+UNROUTED = "(unrouted)"
+
+
+class SkillRouter:
+    """Routes prompts across every skill through an inverted keyword index.
+
+    One ``TriggerMatcher`` over the union of all skills' keywords finds the
+    keywords a prompt matches; a posting list per keyword names the skills
+    that use it. Scoring a prompt against all skills costs one pass over the
+    prompt plus the postings of the keywords it hits, not skills × keywords.
+    Per-skill verdicts equal ``check_trigger(prompt, keywords)``.
+    """
+
+    def __init__(self, keyword_sets: dict[str, list[str]]):
+        self.skills = list(keyword_sets)
+        self.keywords = [list(kws) for kws in keyword_sets.values()]
+        vocab = list(dict.fromkeys(kw for kws in self.keywords for kw in kws))
+        vocab_ids = {kw: i for i, kw in enumerate(vocab)}
+        self._postings: list[list[int]] = [[] for _ in vocab]
+        for skill_id, kws in enumerate(self.keywords):
+            # Counts, not flags: check_trigger counts a repeated keyword once per entry.
+            for kw in kws:
+                self._postings[vocab_ids[kw]].append(skill_id)
+        self._vocab_ids = vocab_ids
+        self._matcher = TriggerMatcher(vocab)
+
+    @classmethod
+    def from_skills_dir(cls, skills_dir: Path) -> "SkillRouter":
+        """Build a router from each skill's keywords, as ``score_skill`` extracts them."""
+        keyword_sets = {}
+        for name in list_skills(skills_dir):
+            skill_md = skills_dir / name / "SKILL.md"
+            if skill_md.exists():
+                with SkillDocument(skill_md) as doc:
+                    keyword_sets[name] = extract_keywords(name, doc.head(1000))
+        return cls(keyword_sets)
+
+    def _ranked(self, prompt: str) -> tuple[set[int], list[tuple[float, int, str, int]]]:
+        """Return the keyword hits and (-confidence, -matched, skill, id) of triggered skills, sorted."""
+        hits = self._matcher.hits(prompt)
+        counts: dict[int, int] = {}
+        for vocab_id in hits:
+            for skill_id in self._postings[vocab_id]:
+                counts[skill_id] = counts.get(skill_id, 0) + 1
+        ranked = []
+        for skill_id, matched in counts.items():
+            confidence = matched / max(len(self.keywords[skill_id]), 1)
+            if matched >= 2 or confidence >= 0.2:
+                ranked.append((-confidence, -matched, self.skills[skill_id], skill_id))
+        ranked.sort()
+        return hits, ranked
+
+    def triggered(self, prompt: str) -> list[str]:
+        """Return the skills ``prompt`` triggers, best route first.
+
+        Ranked by confidence, then matched count, then skill name.
+        """
+        return [name for _, _, name, _ in self._ranked(prompt)[1]]
+
+    def candidates(self, prompt: str, top: int | None = None) -> list[tuple[str, list[str], float]]:
+        """Return (skill, matched_keywords, confidence) for the ``top`` skills ``prompt`` triggers."""
+        hits, ranked = self._ranked(prompt)
+        return [
+            (name, [kw for kw in self.keywords[skill_id] if self._vocab_ids[kw] in hits], -neg_conf)
+            for neg_conf, _, name, skill_id in ranked[:top]
+        ]
+
+    def route(self, prompt: str) -> str | None:
+        """Return the skill ``prompt`` routes to, or None if no skill triggers."""
+        ranked = self._ranked(prompt)[1]
+        return ranked[0][2] if ranked else None
+
+
+def confusion_matrix(
+    skills_dir: Path,
+    tests_dir: Path,
+    harness_cache: HarnessCache | None = None,
+    ignore=DEFAULT_TEST_IGNORES,
+    router: SkillRouter | None = None,
+) -> dict:
+    """Route every skill's trigger prompts across all skills.
+
+    Should-trigger prompts of ``tests/<skill>`` are expected to route to
+    ``<skill>``; should-not-trigger prompts must not. Returns:
+      - matrix: {expected skill: {routed skill or UNROUTED: count}}
+      - report: per-skill collision report, in skill-name order
+      - prompts, correct, accuracy: totals over should-trigger prompts
+    """
+    router = router or SkillRouter.from_skills_dir(skills_dir)
+    index = index_tests_tree(tests_dir, ignore)
+    matrix: dict[str, dict[str, int]] = {}
+    report = {
+        name: {"skill": name, "prompts": 0, "correct": 0, "unrouted": 0, "false_routes": 0,
+               "stolen_by": {}, "steals_from": {}, "overlaps": {}}
+        for name in router.skills
+    }
+    for name in router.skills:
+        if name not in index:
+            continue
+        harness = discover_test_harness(tests_dir, name, harness_cache, index[name])
+        row = matrix.setdefault(name, {})
+        entry = report[name]
+        for prompt in harness.should_trigger:
+            triggered = router.triggered(prompt)
+            routed = triggered[0] if triggered else UNROUTED
+            row[routed] = row.get(routed, 0) + 1
+            entry["prompts"] += 1
+            if routed == name:
+                entry["correct"] += 1
+            elif routed == UNROUTED:
+                entry["unrouted"] += 1
+            else:
+                _bump(entry["stolen_by"], routed)
+                _bump(report[routed]["steals_from"], name)
+            # Other skills that also trigger make the routing ambiguous.
+            if name in triggered:
+                for other in triggered:
+                    if other != name:
+                        _bump(entry["overlaps"], other)
+        for prompt in harness.should_not_trigger:
+            if router.route(prompt) == name:
+                entry["false_routes"] += 1
+
+    for name, row in matrix.items():
+        matrix[name] = dict(sorted(row.items(), key=lambda kv: (-kv[1], kv[0])))
+    for entry in report.values():
+        entry["accuracy"] = round(entry["correct"] / entry["prompts"], 2) if entry["prompts"] else None
+        for key in ("stolen_by", "steals_from", "overlaps"):
+            entry[key] = dict(sorted(entry[key].items(), key=lambda kv: (-kv[1], kv[0])))
+    prompts = sum(e["prompts"] for e in report.values())
+    correct = sum(e["correct"] for e in report.values())
+    return {
+        "skills": len(router.skills),
+        "prompts": prompts,
+        "correct": correct,
+        "accuracy": round(correct / prompts, 2) if prompts else None,
+        "matrix": matrix,
+        "report": list(report.values()),
+    }
+
+
+def _bump(counts: dict, key: str):
+    counts[key] = counts.get(key, 0) + 1
@@ -0,0 +1,308 @@
+"""
+Scoring server for the GEPA auto-evaluator (the ``serve`` command).
+
+Keeps scoring state warm in memory and answers line-delimited JSON-RPC 2.0
+over stdin/stdout or a Unix socket.
+"""
+
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+from auto_evaluator import (
+    DEFAULT_TEST_IGNORES,
+    EVAL_MODES,
+    MTIME_GRANULARITY_NS,
+    SORT_KEYS,
+    HarnessCache,
+    QualityRules,
+    SkillDocument,
+    SkillScore,
+    TriggerMatcher,
+    _keyword_matcher,
+    build_evaluator,
+    extract_keywords,
+    index_tests_tree,
+    list_skills,
+    scan_skill_tests,
+    score_skill,
+    sort_scores,
+)
+from bm25 import BM25Index
+from token_budget import TokenLimits, _relative_to_cwd
+
+
+class ScoringSession:
+    """Warm, in-memory scoring state for the ``serve`` command.
+
+    Score results, skill keywords and evaluators are memoized per skill and
+    keyed by the stat data (mtime, size) of the files they were built from:
+    SKILL.md and the skill's trigger files. A call re-stats those files, so
+    an unchanged skill is answered from memory and an edited one is
+    recomputed. Calls are serialized with a lock, so one session can serve
+    several socket clients. A ``bm25`` index keeps the corpus statistics it
+    was built with for the session's lifetime.
+    """
+
+    def __init__(
+        self,
+        skills_dir: Path,
+        tests_dir: Path,
+        harness_cache: HarnessCache | None = None,
+        ignore=DEFAULT_TEST_IGNORES,
+        rules: QualityRules | None = None,
+        token_limits: TokenLimits | None = None,
+        bm25: BM25Index | None = None,
+    ):
+        self.skills_dir = Path(skills_dir)
+        self.tests_dir = Path(tests_dir)
+        self.harness_cache = harness_cache
+        self.ignore = ignore
+        self.rules = rules
+        self.token_limits = token_limits
+        self.bm25 = bm25
+        self._scores: dict[str, tuple] = {}
+        self._keywords: dict[str, tuple] = {}
+        self._evaluators: dict[tuple[str, str], tuple] = {}
+        self._lock = threading.Lock()
+
+    def _skill_md(self, skill: str) -> Path:
+        if not isinstance(skill, str) or not skill or skill in (".", "..") \
+                or "/" in skill or os.sep in skill:
+            raise InvalidParams(f"Invalid skill name {skill!r}")
+        return self.skills_dir / skill / "SKILL.md"
+
+    def _test_signature(self, skill: str, test_files: dict | None = None) -> tuple[dict, tuple | None]:
+        """Return the skill's test files and a signature of their stat data."""
+        if test_files is None:
+            test_files = scan_skill_tests(self.tests_dir / skill, self.ignore)
+        stats = [_stat_signature(f) for f in test_files["trigger_files"]]
+        if None in stats:
+            return test_files, None
+        return test_files, (tuple(stats), test_files["has_integration"], test_files["has_unit"])
+
+    def score(self, skill: str) -> dict:
+        """``score_skill`` for one skill, from memory while its files are unchanged."""
+        return self._score(skill).to_dict()
+
+    def _score(self, skill: str, test_files: dict | None = None) -> SkillScore:
+        skill_md = self._skill_md(skill)
+        test_files, tests_sig = self._test_signature(skill, test_files)
+        md_sig = _stat_signature(skill_md)
+        signature = (md_sig, tests_sig) if md_sig and tests_sig else None
+        cached = self._scores.get(skill)
+        if signature is not None and cached and cached[0] == signature:
+            return cached[1]
+        result = score_skill(
+            skill, self.skills_dir, self.tests_dir, self.harness_cache, test_files, self.rules,
+            self.token_limits, self.bm25,
+        )
+        self._scores[skill] = (signature, result)
+        return result
+
+    def score_all(self, sort: str = "score") -> list[dict]:
+        """Score every skill, reusing results for unchanged skills."""
+        if sort not in SORT_KEYS:
+            raise InvalidParams(f"Unknown sort {sort!r} (expected one of {list(SORT_KEYS)})")
+        skills = list_skills(self.skills_dir)
+        index = index_tests_tree(self.tests_dir, self.ignore)
+        no_tests = {"trigger_files": [], "has_integration": False, "has_unit": False}
+        for gone in set(self._scores) - set(skills):
+            del self._scores[gone]
+        results = [self._score(s, index.get(s, no_tests)) for s in skills]
+        return list(sort_scores(results, sort))
+
+    def keywords(self, skill: str) -> tuple[list[str], TriggerMatcher]:
+        """Return the skill's routing keywords and a matcher over them."""
+        skill_md = self._skill_md(skill)
+        signature = _stat_signature(skill_md)
+        cached = self._keywords.get(skill)
+        if signature is not None and cached and cached[0] == signature:
+            return cached[1]
+        if not skill_md.exists():
+            raise ValueError(f"SKILL.md not found at {skill_md}")
+        with SkillDocument(skill_md) as doc:
+            keywords = extract_keywords(skill, doc.head(1000))
+        value = (keywords, TriggerMatcher(keywords))
+        self._keywords[skill] = (signature, value)
+        return value
+
+    def check_trigger(self, prompt: str, skill: str | None = None, keywords: list[str] | None = None) -> dict:
+        """Match ``prompt`` against a skill's keywords, or an explicit keyword list."""
+        if (skill is None) == (keywords is None):
+            raise InvalidParams("Pass exactly one of 'skill' or 'keywords'")
+        if not isinstance(prompt, str):
+            raise InvalidParams("'prompt' must be a string")
+        if keywords is not None and (
+            not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords)
+        ):
+            raise InvalidParams("'keywords' must be a list of strings")
+        if skill is not None:
+            matcher = self.keywords(skill)[1]
+        else:
+            matcher = _keyword_matcher(tuple(keywords))
+        return matcher.match(prompt).to_dict()
+
+    def evaluate_candidate(
+        self, skill: str, candidate: str, example: dict | None = None, mode: str = "suite",
+    ) -> dict:
+        """Run the skill's GEPA evaluator on a candidate SKILL.md."""
+        skill_md = self._skill_md(skill)
+        if mode not in EVAL_MODES:
+            raise InvalidParams(f"Unknown evaluator mode {mode!r} (expected one of {EVAL_MODES})")
+        if not isinstance(candidate, str):
+            raise InvalidParams("'candidate' must be a string")
+        if example is not None and not isinstance(example, dict):
+            raise InvalidParams("'example' must be an object")
+        test_files, signature = self._test_signature(skill)
+        cached = self._evaluators.get((skill, mode))
+        if signature is None or not cached or cached[0] != signature:
+            token_limit = None
+            if self.token_limits is not None:
+                token_limit = self.token_limits.limit_for(_relative_to_cwd(skill_md))[0]
+            evaluator, _ = build_evaluator(
+                skill, self.tests_dir, mode=mode, harness_cache=self.harness_cache,
+                test_files=test_files, rules=self.rules, token_limit=token_limit, bm25=self.bm25,
+            )
+            cached = (signature, evaluator)
+            self._evaluators[(skill, mode)] = cached
+        score, asi = cached[1](candidate, example or {})
+        return {"score": score, "asi": asi}
+
+    def call(self, method: str, params) -> object:
+        """Dispatch an RPC method call; raises ``RpcError`` for protocol errors."""
+        name = RPC_METHODS.get(method)
+        if name is None:
+            raise RpcError(-32601, f"Method not found: {method}")
+        fn = getattr(self, name)
+        args, kwargs = (params, {}) if isinstance(params, list) else ([], params or {})
+        if not isinstance(kwargs, dict):
+            raise RpcError(-32602, "params must be an object or an array")
+        try:
+            inspect.signature(fn).bind(*args, **kwargs)
+        except TypeError as e:
+            raise RpcError(-32602, f"Invalid params: {e}") from None
+        with self._lock:
+            try:
+                return fn(*args, **kwargs)
+            except InvalidParams as e:
+                raise RpcError(-32602, f"Invalid params: {e}") from None
+
+
+RPC_METHODS = {
+    "score": "score",
+    "score_all": "score_all",
+    "check_trigger": "check_trigger",
+    "evaluate_candidate": "evaluate_candidate",
+}
+
+
+class RpcError(Exception):
+    """A JSON-RPC error with its error code."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class InvalidParams(ValueError):
+    """A ``ScoringSession`` method was called with a bad argument value.
+
+    RPC calls report it as -32602 (invalid params) rather than as a server
+    error.
+    """
+
+
+def _stat_signature(path: Path) -> tuple | None:
+    """Return (mtime_ns, size) for ``path``; None if missing or too recently modified."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    if time.time_ns() - st.st_mtime_ns < MTIME_GRANULARITY_NS:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def handle_rpc(session: ScoringSession, line: str) -> str | None:
+    """Handle one line of JSON-RPC 2.0 (a request or a batch).
+
+    Returns the response line, or None when there is nothing to send back
+    (notifications and blank lines).
+    """
+    if not line.strip():
+        return None
+    try:
+        message = json.loads(line)
+    except json.JSONDecodeError as e:
+        return json.dumps(_rpc_error(None, -32700, f"Parse error: {e}"))
+    if isinstance(message, list):
+        if not message:
+            return json.dumps(_rpc_error(None, -32600, "Invalid Request: empty batch"))
+        responses = [r for r in (_rpc_response(session, m) for m in message) if r is not None]
+        return json.dumps(responses) if responses else None
+    response = _rpc_response(session, message)
+    return json.dumps(response) if response is not None else None
+
+
+def _rpc_response(session: ScoringSession, request) -> dict | None:
+    if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" \
+            or not isinstance(request.get("method"), str):
+        return _rpc_error(None, -32600, "Invalid Request")
+    request_id = request.get("id")
+    try:
+        result = session.call(request["method"], request.get("params"))
+    except RpcError as e:
+        response = _rpc_error(request_id, e.code, str(e))
+    except Exception as e:  # noqa: BLE001 — reported to the client, the server keeps going
+        response = _rpc_error(request_id, -32000, f"{type(e).__name__}: {e}")
+    else:
+        response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+    # Requests without an id are notifications: no response.
+    return response if "id" in request else None
+
+
+def _rpc_error(request_id, code: int, message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def serve_stream(session: ScoringSession, infile, outfile):
+    """Serve line-delimited JSON-RPC from ``infile`` until EOF."""
+    for line in infile:
+        response = handle_rpc(session, line)
+        if response is not None:
+            outfile.write(response + "\n")
+            outfile.flush()
+
+
+def serve_socket(session: ScoringSession, path: Path):
+    """Serve line-delimited JSON-RPC on a Unix socket, one thread per client."""
+    import socketserver
+
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        raise OSError("Unix sockets are not supported on this platform; serve over stdin/stdout")
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for raw in self.rfile:
+                response = handle_rpc(session, raw.decode("utf-8", errors="replace"))
+                if response is not None:
+                    self.wfile.write(response.encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+    path = Path(path)
+    if path.is_socket():
+        path.unlink()
+    with socketserver.ThreadingUnixStreamServer(str(path), Handler) as server:
+        server.daemon_threads = True
+        print(f"Listening on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,911 @@
+"""Tests for auto_evaluator.py (run with: python -m pytest scripts/src/gepa)."""
+
+import dataclasses
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import types
+import time
+from pathlib import Path
+
+import pytest
+
+import auto_evaluator as ae
+
+
+def legacy_check_trigger(prompt, keywords):
+    """The original per-keyword check_trigger loop, kept as a reference."""
+    prompt_lower = prompt.lower()
+    matched = []
+    for kw in keywords:
+        kw_stem = ae.stem(kw)
+        if kw in prompt_lower or kw_stem in prompt_lower:
+            matched.append(kw)
+            continue
+        for word in re.split(r"\s+", prompt_lower):
+            clean = re.sub(r"[^a-z0-9-]", "", word)
+            if clean and ae.stem(clean) == kw_stem:
+                matched.append(kw)
+                break
+    confidence = len(matched) / max(len(keywords), 1)
+    triggered = len(matched) >= 2 or confidence >= 0.2
+    return triggered, matched, confidence
+
+
+WORDS = [
+    "deploy", "deploying", "deployment", "deployments", "azure", "storage",
+    "stores", "function", "functions", "app", "service", "key", "vault",
+    "keyvault", "monitor", "monitoring", "creation", "create", "created",
+    "kubernetes", "aks", "ai", "the", "to", "my", "configure", "config",
+    "DEPLOY", "Azure!", "(storage)", "app-service", "ops", "s", "es", "ing",
+]
+
+
+def random_prompt(rng):
+    sep = rng.choice([" ", "  ", "\t", "\n", ""])
+    return sep.join(rng.choice(WORDS) for _ in range(rng.randint(0, 12)))
+
+
+def test_trigger_matcher_matches_legacy_check_trigger():
+    rng = random.Random(1234)
+    for _ in range(300):
+        desc = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 20)))
+        keywords = ae.extract_keywords(rng.choice(["azure-deploy", "app", "ai-ops"]), desc)
+        matcher = ae.TriggerMatcher(keywords)
+        prompts = [random_prompt(rng) for _ in range(10)]
+        expected = [legacy_check_trigger(p, keywords) for p in prompts]
+        assert matcher.match_many(prompts) == expected
+        assert [ae.check_trigger(p, keywords) for p in prompts] == expected
+
+
+def test_trigger_matcher_handles_arbitrary_keyword_lists():
+    rng = random.Random(99)
+    for _ in range(300):
+        keywords = [rng.choice(WORDS + ["", "de", "deploy"]).lower() for _ in range(rng.randint(0, 8))]
+        matcher = ae.TriggerMatcher(keywords)
+        for _ in range(10):
+            prompt = random_prompt(rng)
+            assert matcher.match(prompt) == legacy_check_trigger(prompt, keywords)
+
+
+SKILL_MD = """---
+name: azure-deploy
+description: "Deploy applications to Azure. USE FOR: deploy, publish. WHEN: user wants to ship an app to Azure App Service or Container Apps."
+---
+
+## Rules
+Only deploy after validation.
+
+## Steps
+1. Build
+2. Deploy
+"""
+
+TRIGGERS_TS = """
+describe('azure-deploy triggers', () => {
+  const shouldTriggerPrompts: string[] = [
+    'Deploy my app to Azure',
+    "Publish this web app to Azure App Service",
+  ];
+  const shouldNotTriggerPrompts: string[] = [
+    'What is the weather today?',
+  ];
+});
+"""
+
+
+def make_tree(tmp_path, skills=("azure-deploy",)):
+    skills_dir = tmp_path / "skills"
+    tests_dir = tmp_path / "tests"
+    for name in skills:
+        (skills_dir / name).mkdir(parents=True)
+        (skills_dir / name / "SKILL.md").write_text(SKILL_MD.replace("azure-deploy", name))
+        (tests_dir / name).mkdir(parents=True)
+        (tests_dir / name / "triggers.test.ts").write_text(TRIGGERS_TS)
+    return skills_dir, tests_dir
+
+
+def test_build_evaluator_memoizes_candidate_analysis(tmp_path):
+    _, tests_dir = make_tree(tmp_path)
+    evaluator, harness = ae.build_evaluator("azure-deploy", tests_dir, cache_size=2)
+    examples = [{"prompt": p} for p in harness.should_trigger]
+
+    first = [evaluator(SKILL_MD, ex) for ex in examples]
+    assert evaluator.cache.info()["misses"] == 1
+    assert evaluator.cache.info()["hits"] == len(examples) - 1
+    assert all(result == first[0] for result in first)
+
+    evaluator(SKILL_MD + "\nextra", examples[0])
+    evaluator(SKILL_MD + "\nmore", examples[0])
+    info = evaluator.cache.info()
+    assert info["size"] == 2
+    assert info["misses"] == 3
+
+
+def test_example_mode_scores_only_the_example_prompt(tmp_path):
+    _, tests_dir = make_tree(tmp_path)
+    evaluator, harness = ae.build_evaluator("azure-deploy", tests_dir, mode="example")
+    dataset = [{"prompt": p, "expected": True} for p in harness.should_trigger]
+    dataset += [{"prompt": p, "expected": False} for p in harness.should_not_trigger]
+
+    results = [evaluator(SKILL_MD, ex) for ex in dataset]
+    entry = evaluator.cache.get(SKILL_MD, None)
+    assert entry["suite"] is None
+    assert len(entry["verdicts"].state) == len({ex["prompt"] for ex in dataset})
+    assert all(entry["verdicts"].state)
+
+    # Re-evaluating an example replays the memoized verdict without matching.
+    calls = []
+    matcher = entry["matcher"]
+    entry["verdicts"].matcher = types.SimpleNamespace(match=lambda p: calls.append(p) or matcher.match(p))
+    assert [evaluator(SKILL_MD, ex) for ex in dataset] == results
+    assert calls == []
+
+    keywords = ae._candidate_keywords("azure-deploy", SKILL_MD)
+    for ex, (score, asi) in zip(dataset, results):
+        triggered, _, _ = ae.check_trigger(ex["prompt"], keywords)
+        trigger_score = 1.0 if triggered == ex["expected"] else 0.0
+        assert score == (entry["quality_score"] + trigger_score) / 2
+        assert ("TriggerFailures" in asi) == (trigger_score == 0.0)
+
+    suite_evaluator, _ = ae.build_evaluator("azure-deploy", tests_dir, mode="suite")
+    assert evaluator(SKILL_MD, {"aspect": "overall"}) == suite_evaluator(SKILL_MD, {})
+
+
+def test_score_all_parallel_matches_serial(tmp_path):
+    skills_dir, tests_dir = make_tree(tmp_path, skills=("beta-skill", "alpha-skill", "gamma-ops"))
+    serial = ae.score_all(skills_dir, tests_dir, jobs=1)
+    assert [r.skill for r in serial] == ["alpha-skill", "beta-skill", "gamma-ops"]
+    assert ae.score_all(skills_dir, tests_dir, jobs=2) == serial
+
+
+def test_result_types_keep_the_dict_schema(tmp_path):
+    skills_dir, tests_dir = make_tree(tmp_path)
+    harness = ae.discover_test_harness(tests_dir, "azure-deploy")
+    assert harness.to_dict() == {
+        "has_triggers": True,
+        "has_integration": False,
+        "has_unit": False,
+        "trigger_prompts": {"should_trigger": list(harness.should_trigger),
+                            "should_not_trigger": list(harness.should_not_trigger)},
+    }
+    assert not hasattr(harness, "__dict__")
+
+    result = ae.score_skill("azure-deploy", skills_dir, tests_dir).to_dict()
+    assert list(result) == [
+        "skill", "quality_score", "quality_detail", "quality_feedback", "has_triggers_test",
+        "has_integration_test", "has_unit_test", "trigger_prompt_count", "trigger_accuracy",
+    ]
+    missing = ae.score_skill("nope", skills_dir, tests_dir).to_dict()
+    assert list(missing) == ["skill", "error"]
+
+    verdict = ae.check_trigger("Deploy my app to Azure", ["deploy", "azure"])
+    assert verdict == (True, ["deploy", "azure"], 1.0)
+    assert verdict.to_dict() == {"triggered": True, "matched": ["deploy", "azure"], "confidence": 1.0}
+
+
+def test_harness_cache_reuses_parse_until_file_changes(tmp_path, monkeypatch):
+    _, tests_dir = make_tree(tmp_path)
+    trigger_file = tests_dir / "azure-deploy" / "triggers.test.ts"
+    cache = ae.HarnessCache(tmp_path / "cache")
+    parses = []
+    real_parse = ae.parse_trigger_source
+    monkeypatch.setattr(ae, "parse_trigger_source", lambda c: parses.append(c) or real_parse(c))
+
+    def age(seconds):
+        ts = time.time() - seconds
+        os.utime(trigger_file, (ts, ts))
+
+    age(60)
+    uncached = ae.discover_test_harness(tests_dir, "azure-deploy")
+    parses.clear()
+    assert ae.discover_test_harness(tests_dir, "azure-deploy", cache) == uncached
+    assert ae.discover_test_harness(tests_dir, "azure-deploy", cache) == uncached
+    assert len(parses) == 1
+
+    # Same content, new mtime: re-hashed but not re-parsed.
+    age(30)
+    assert ae.discover_test_harness(tests_dir, "azure-deploy", cache) == uncached
+    assert len(parses) == 1
+
+    trigger_file.write_text(TRIGGERS_TS.replace("'Deploy my app to Azure',", ""))
+    age(10)
+    harness = ae.discover_test_harness(tests_dir, "azure-deploy", cache)
+    assert len(parses) == 2
+    assert "Deploy my app to Azure" not in harness.should_trigger
+
+    assert cache.clear()
+    assert not cache.path.exists()
+
+
+def test_index_tests_tree_matches_per_skill_discovery(tmp_path):
+    _, tests_dir = make_tree(tmp_path, skills=("alpha-skill", "beta-skill"))
+    nested = tests_dir / "alpha-skill" / "nested"
+    nested.mkdir()
+    (nested / "triggers.test.ts").write_text(TRIGGERS_TS.replace("Deploy my", "Ship my"))
+    (nested / "unit.test.ts").write_text("")
+    fixtures = tests_dir / "beta-skill" / "node_modules" / "pkg"
+    fixtures.mkdir(parents=True)
+    (fixtures / "integration.test.ts").write_text("")
+    (fixtures / "triggers.test.ts").write_text(TRIGGERS_TS)
+
+    index = ae.index_tests_tree(tests_dir)
+    assert sorted(index) == ["alpha-skill", "beta-skill"]
+    assert index["alpha-skill"]["trigger_files"] == [
+        tests_dir / "alpha-skill" / "triggers.test.ts",
+        nested / "triggers.test.ts",
+    ]
+    assert index["alpha-skill"]["has_unit"]
+    assert index["beta-skill"] == {
+        "trigger_files": [tests_dir / "beta-skill" / "triggers.test.ts"],
+        "has_integration": False,
+        "has_unit": False,
+    }
+    assert ae.index_tests_tree(tests_dir, ignore=())["beta-skill"]["has_integration"]
+
+    for skill in index:
+        assert ae.discover_test_harness(tests_dir, skill, test_files=index[skill]) == (
+            ae.discover_test_harness(tests_dir, skill)
+        )
+    harness = ae.discover_test_harness(tests_dir, "alpha-skill")
+    assert harness.should_trigger == (
+        "Deploy my app to Azure",
+        "Publish this web app to Azure App Service",
+        "Ship my app to Azure",
+        "Publish this web app to Azure App Service",
+    )
+    # Repeated prompts share one string and one verdict slot.
+    assert harness.should_trigger[1] is harness.should_trigger[3]
+    assert harness.prompt_index()[harness.should_trigger[3]] == 1
+
+
+def legacy_parse_trigger_source(content):
+    """The original regex-based trigger array parser, kept as a reference."""
+    result = {"should_trigger": [], "should_not_trigger": []}
+
+    # Match arrays like: shouldTrigger = ["...", "..."] or const shouldTriggerPrompts = [...]
+    for var_pattern, key in [
+        (r"shouldTrigger(?:Prompts)?(?:\s*:\s*\w+(?:\[\])?)?\s*=\s*\[", "should_trigger"),
+        (r"shouldNotTrigger(?:Prompts)?(?:\s*:\s*\w+(?:\[\])?)?\s*=\s*\[", "should_not_trigger"),
+    ]:
+        match = re.search(var_pattern, content, re.IGNORECASE)
+        if match:
+            start = match.end()
+            # Find the closing bracket, handling nested strings
+            depth = 1
+            i = start
+            while i < len(content) and depth > 0:
+                if content[i] == "[":
+                    depth += 1
+                elif content[i] == "]":
+                    depth -= 1
+                i += 1
+            array_text = content[start : i - 1]
+            # Strip single-line comments to avoid extracting commented-out prompts
+            array_text = re.sub(r"//.*$", "", array_text, flags=re.MULTILINE)
+            # Strip block comments
+            array_text = re.sub(r"/\*.*?\*/", "", array_text, flags=re.DOTALL)
+            # Extract strings from the array — handle ", ', and ` delimiters
+            # Use separate passes for each quote type to avoid apostrophe truncation
+            strings = re.findall(r'"([^"]*)"', array_text)
+            strings += re.findall(r"'([^']*)'", array_text)
+            strings += re.findall(r"`([^`]*)`", array_text)
+            # Deduplicate while preserving order
+            seen = set()
+            unique = []
+            for s in strings:
+                if s and s not in seen:
+                    seen.add(s)
+                    unique.append(s)
+            result[key] = unique
+
+    return result
+
+
+# The legacy parser mis-reads quotes inside strings, so prompts avoid them.
+PROMPT_WORDS = ["deploy", "my", "app", "to", "Azure", "the", "weather", "(now)", "x-y", "ship it", "42"]
+
+
+def random_trigger_file(rng):
+    """Generate a well-formed triggers.test.ts the legacy parser handles correctly."""
+
+    def array(name):
+        quote = rng.choice(['"', "'", "`"])
+        items = []
+        for _ in range(rng.randint(0, 8)):
+            prompt = " ".join(rng.choice(PROMPT_WORDS) for _ in range(rng.randint(0, 5)))
+            items.append(quote + prompt + quote)
+            if rng.random() < 0.2:
+                items.append(rng.choice(["// commented out", "/* skip\n this */"]))
+            if rng.random() < 0.1:
+                items.append(items[rng.randrange(len(items))])  # duplicate prompt
+        body = ",\n    ".join(i for i in items if not i.startswith(("//", "/*")))
+        comments = [i for i in items if i.startswith(("//", "/*"))]
+        annotation = rng.choice(["", ": string[]", " : string[]", ":string"])
+        decl = rng.choice(["const ", "let ", ""])
+        trailing = rng.choice(["", ","])
+        return (f"  {decl}{name}{annotation} = [\n    {body}{trailing}\n"
+                f"    {' '.join(comments)}\n  ];\n")
+
+    parts = ["import { describe, it } from 'vitest';\n", "describe('triggers', () => {\n"]
+    names = [rng.choice(["shouldTrigger", "shouldTriggerPrompts"]),
+             rng.choice(["shouldNotTrigger", "shouldNotTriggerPrompts"])]
+    rng.shuffle(names)
+    for name in names:
+        if rng.random() < 0.9:
+            parts.append(array(name))
+    parts.append("  it('works', () => { expect(1 / 2).toBe(0.5); });\n});\n")
+    return "".join(parts)
+
+
+def test_trigger_lexer_matches_legacy_parser_on_well_formed_files():
+    rng = random.Random(7)
+    for _ in range(500):
+        source = random_trigger_file(rng)
+        assert ae.parse_trigger_source(source) == legacy_parse_trigger_source(source), source
+
+
+def test_trigger_lexer_handles_strings_comments_and_order():
+    source = r"""
+    // const shouldTrigger = ['commented out'];
+    const re = /shouldTrigger = \['nope'\]/;
+    const label = "shouldNotTrigger = ['also nope']";
+    const shouldTriggerPrompts: string[] = [
+      "Don't stop [now]",
+      'Say "hi" to Azure',
+      `multi
+line`,
+      'it\'s escaped!',
+      /* 'block comment' */
+      "Don't stop [now]",
+      "",
+    ];
+    const shouldNotTriggerPrompts = ['a ] bracket', "b"];
+    describe('more', () => {
+      const shouldNotTrigger = ['c', 'a ] bracket'];
+    });
+    """
+    assert ae.parse_trigger_source(source) == {
+        "should_trigger": [
+            "Don't stop [now]", 'Say "hi" to Azure', "multi\nline", "it's escaped!",
+        ],
+        "should_not_trigger": ["a ] bracket", "b", "c"],
+    }
+
+
+def test_score_candidates_matches_scalar_path(tmp_path):
+    pytest.importorskip("numpy")
+    rng = random.Random(5)
+    _, tests_dir = make_tree(tmp_path)
+    harness = ae.discover_test_harness(tests_dir, "azure-deploy")
+    harness = dataclasses.replace(
+        harness,
+        should_trigger=harness.should_trigger + tuple(random_prompt(rng) for _ in range(40)),
+        should_not_trigger=harness.should_not_trigger + tuple(random_prompt(rng) for _ in range(40)),
+    )
+    candidates = [SKILL_MD] + [
+        SKILL_MD.replace("Deploy applications to Azure.", " ".join(rng.choice(WORDS) for _ in range(12)))
+        for _ in range(20)
+    ]
+
+    batch = ae.score_candidates(candidates, harness, "azure-deploy")
+    prompts = harness.prompts
+    for c, candidate in enumerate(candidates):
+        keywords = ae._candidate_keywords("azure-deploy", candidate)
+        for p, prompt in enumerate(prompts):
+            triggered, matched, conf = ae.check_trigger(prompt, keywords)
+            assert batch["triggered"][c, p] == triggered
+            assert batch["matched"][c, p] == len(matched)
+            assert batch["confidence"][c, p] == conf
+        entry = ae._analyze_candidate("azure-deploy", candidate)
+        assert batch["accuracy"][c] == ae._trigger_suite(entry, harness)[0]
+
+    duplicated = ae.trigger_matrix([["deploy", "deploy"], []], ["deploy now"])
+    assert duplicated["matched"].tolist() == [[2], [0]]
+
+
+def test_profiler_collects_phases_from_worker_processes(tmp_path, monkeypatch):
+    skills_dir, tests_dir = make_tree(tmp_path, skills=("alpha-skill", "beta-skill"))
+    monkeypatch.setattr(ae.PROFILER, "enabled", True)
+    ae.PROFILER.reset()
+    try:
+        ae.score_all(skills_dir, tests_dir, jobs=2)
+        snapshot = ae.PROFILER.snapshot()
+    finally:
+        ae.PROFILER.reset()
+    assert snapshot["phases"]["score_skill"]["calls"] == 2
+    assert snapshot["phases"]["ts_parse"]["calls"] == 2
+    assert snapshot["counters"]["files_read"] == 4
+    skill_files = list(skills_dir.rglob("SKILL.md"))
+    assert snapshot["counters"]["bytes_mapped"] == sum(f.stat().st_size for f in skill_files)
+    trigger_files = list(tests_dir.rglob("triggers.test.ts"))
+    assert snapshot["counters"]["bytes_read"] == sum(f.stat().st_size for f in trigger_files)
+
+
+def test_sort_scores_external_merge_matches_in_memory_sort():
+    rng = random.Random(11)
+    results = [{"skill": f"skill-{i:03d}", "quality_score": rng.choice([0.5, 0.75, 1.0])}
+               for i in range(50)]
+    results.append({"skill": "broken", "error": "SKILL.md not found"})
+    expected = sorted(sorted(results, key=lambda r: r["skill"]), key=lambda r: r.get("quality_score", 0))
+    rng.shuffle(results)
+    assert list(ae.sort_scores(iter(results), "score", chunk_size=7)) == expected
+    assert list(ae.sort_scores(iter(results), "name", chunk_size=7)) == sorted(
+        results, key=lambda r: r["skill"])
+
+
+def test_emit_scores_json_matches_json_dumps(capsys):
+    results = [{"skill": "a", "quality_detail": {"x": 1.0}, "feedback": ["multi\nline"]},
+               {"skill": "b", "error": "missing"}]
+    assert ae._emit_scores(iter(results), "json") is True
+    assert capsys.readouterr().out == json.dumps(results, indent=2) + "\n"
+    assert ae._emit_scores(iter([]), "json") is False
+    assert capsys.readouterr().out == json.dumps([], indent=2) + "\n"
+
+
+@pytest.mark.parametrize("content", [
+    "",
+    "no frontmatter here\n# Rules\nTODO later",
+    "---\nname: x\ndescription: \"Use for: x. When: y\"\n---\n\n# Title\r\n\r\n## Steps\r\n1. go\r\n",
+    "---\nname: x\ndescription: short\n---",
+    "---\nname: x\n---\n   \n" + "é" * 3000 + "\n## Rules\npassword = 1\n",
+    "---\ndescription: ends with use\n---\n for: more\n" + "word " * 2000,
+    "---\nbroken frontmatter with no end\n## rule",
+    "\n\n  leading space, no frontmatter\n" + "\n" * 5000 + "when: later",
+    "---\nname: x\n---\na\n" + "\n" * 5000 + "b\n",
+])
+def test_skill_document_matches_string_scoring(tmp_path, content):
+    path = tmp_path / "SKILL.md"
+    path.write_bytes(content.encode("utf-8"))
+    frontmatter, body = ae.parse_frontmatter(path.read_text())
+    with ae.SkillDocument(path) as doc:
+        assert doc.frontmatter == frontmatter
+        assert doc.head(1000) == body[:1000]
+        assert doc.first_lines(5) == body.strip().split("\n")[:5]
+        assert ae.score_content_quality(doc, doc.frontmatter) == ae.score_content_quality(body, frontmatter)
+
+
+def test_skill_document_headings(tmp_path):
+    path = tmp_path / "SKILL.md"
+    path.write_text("---\nname: x\n---\n# Title\n\n## Rules  \ntext #not\n### Étapes\n")
+    with ae.SkillDocument(path) as doc:
+        assert doc.headings() == [(1, "Title"), (2, "Rules"), (3, "Étapes")]
+
+
+def test_skill_document_rules_search_the_mapping_without_copying(tmp_path):
+    import tracemalloc
+
+    path = tmp_path / "SKILL.md"
+    reference = "Deploy The App To Azure With Care.\n" * 150_000  # ~5 MB
+    path.write_text(f"---\nname: x\n---\n## Rules\n{reference}## STEPS\nPassword: 1\n")
+    with ae.SkillDocument(path) as doc:
+        ae.DEFAULT_RULES.evaluate(doc)  # compile the bytes patterns outside the trace
+        tracemalloc.start()
+        try:
+            scores, feedback = ae.DEFAULT_RULES.evaluate(doc)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    assert peak < 100_000
+    assert scores["has_steps"] == 1.0 and scores["no_bad_patterns"] == 0.0
+    assert "Contains password pattern" in feedback
+
+
+def legacy_score_content_quality(body, frontmatter):
+    """The multi-pass quality checks the rule engine replaced."""
+    scores, feedback = {}, []
+    content_lower = body.lower()
+    for section in ["rule", "step"]:
+        if f"## {section}" in content_lower or f"# {section}" in content_lower:
+            scores[f"has_{section}s"] = 1.0
+        else:
+            scores[f"has_{section}s"] = 0.0
+            feedback.append(f"Missing '## {section.title()}s' section")
+    desc_lower = (frontmatter or {}).get("description", "").lower() if frontmatter else ""
+    combined = desc_lower + " " + content_lower
+    for pattern, label in [("use for:", "has_use_for"), ("when:", "has_when")]:
+        if pattern in combined:
+            scores[label] = 1.0
+        else:
+            scores[label] = 0.0
+            feedback.append(f"Missing '{pattern.upper()}' pattern (best in frontmatter description)")
+    if "do not use for:" in content_lower:
+        feedback.append("Has 'DO NOT USE FOR:' — safe for small skill sets, risky for 10+ skills")
+    for pat, msg in [
+        (r"api[_-]?key\s*[:=]", "Contains API key pattern"),
+        (r"password\s*[:=]", "Contains password pattern"),
+        (r"TODO|FIXME|HACK", "Contains TODO/FIXME markers"),
+    ]:
+        if re.search(pat, body, re.IGNORECASE):
+            scores["no_bad_patterns"] = 0.0
+            feedback.append(msg)
+            break
+    else:
+        scores["no_bad_patterns"] = 1.0
+    return scores, feedback
+
+
+FRAGMENTS = [
+    "## Rules", "# rule", "## STEPS", "#step", "Use for:", "USE", "for:", "WHEN:", "when",
+    ":", "Do not use for:", "API_KEY =", "apikey:", "api-key", "Password:", "password",
+    "todo", "FixMe", "hack", "#", " ", "\n", "word", "é", "api_\u212aey=",
+]
+
+
+def random_doc(rng):
+    return "".join(rng.choice(FRAGMENTS) + rng.choice(["", " ", "\n"]) for _ in range(rng.randint(0, 12)))
+
+
+def test_quality_rules_match_legacy_checks():
+    rng = random.Random(13)
+    for _ in range(3000):
+        body = random_doc(rng)
+        frontmatter = rng.choice([{}, {"description": random_doc(rng)}])
+        assert ae.DEFAULT_RULES.evaluate(ae._TextView(body), frontmatter.get("description", "")) \
+            == legacy_score_content_quality(body, frontmatter)
+
+
+def test_quality_rules_load_house_rules(tmp_path):
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(json.dumps({"include_defaults": True, "rules": [
+        {"kind": "required", "name": "has_mcp_tools", "any": ["## mcp tools"],
+         "feedback": "Missing '## MCP Tools' section"},
+        {"kind": "forbidden", "name": "no_internal_links", "patterns": [
+            {"literal": "go/", "feedback": "Links to an internal go/ link"},
+            {"regex": r"https?://\S*\.corp\b", "feedback": "Links to a corp host"},
+        ]},
+    ]}))
+    rules = ae.QualityRules.load(rules_file)
+    body = "# Title\n## Rules\nSee https://wiki.corp/x and go/here\n"
+    score, detail = ae.score_content_quality(body, {"description": "Use for: x. When: y"}, rules)
+    assert list(detail["scores"])[-2:] == ["has_mcp_tools", "no_internal_links"]
+    assert detail["scores"]["has_mcp_tools"] == 0.0
+    assert detail["scores"]["no_internal_links"] == 0.0
+    assert detail["feedback"][-2:] == ["Missing '## MCP Tools' section", "Links to an internal go/ link"]
+
+    with pytest.raises(ValueError, match="must be lowercase"):
+        ae.QualityRules([{"kind": "forbidden", "name": "x", "patterns": [
+            {"regex": "TODO", "feedback": "todo"}]}])
+    with pytest.raises(ValueError, match="literals only"):
+        ae.QualityRules([{"kind": "required", "name": "x", "regex": ["a"],
+                          "scope": "description+body", "feedback": "x"}])
+
+
+def test_token_budget_scores_oversized_candidates(tmp_path):
+    _, tests_dir = make_tree(tmp_path)
+    evaluator, _ = ae.build_evaluator("azure-deploy", tests_dir, token_limit=100)
+    small = evaluator(SKILL_MD, {})
+    big_candidate = SKILL_MD + "filler " * 200
+    big = evaluator(big_candidate, {})
+    tokens = ae.estimate_tokens(big_candidate)
+    assert f"Exceeds token limit: {tokens} tokens ({tokens - 100} over limit of 100)" in big[1]["QualityIssues"]
+    assert big[0] < small[0]
+
+
+def test_default_score_all_has_no_token_budget(tmp_path, monkeypatch, capsys):
+    skills_dir, _ = make_tree(tmp_path, skills=("azure-deploy", "azure-long"))
+    (skills_dir / "azure-long" / "SKILL.md").write_text(
+        SKILL_MD.replace("azure-deploy", "azure-long")
+        + "\n## Reference\n" + "Deploy the app to Azure with care.\n" * 300
+    )
+    monkeypatch.chdir(tmp_path)
+
+    def score_all(*flags):
+        monkeypatch.setattr(sys, "argv", ["auto_evaluator.py", "score-all", "--json", "--no-cache", *flags])
+        ae.main()
+        return {r["skill"]: r for r in json.loads(capsys.readouterr().out)}
+
+    # Scores from before the token budget existed.
+    results = score_all()
+    assert {name: (r["quality_score"], r["trigger_accuracy"]) for name, r in results.items()} == {
+        "azure-deploy": (0.97, 0.67), "azure-long": (0.97, 0.67),
+    }
+    assert all("token_budget" not in r["quality_detail"] for r in results.values())
+
+    # A config in the cwd is only used when asked for.
+    (tmp_path / ae.TOKEN_LIMITS_FILE).write_text(json.dumps({"defaults": {"*.md": 500}}))
+    assert score_all() == results
+    assert score_all("--token-limits")["azure-long"]["quality_detail"]["token_budget"] < 1.0
+
+
+def test_cached_lm_replays_responses_across_instances(tmp_path):
+    calls = []
+
+    def stub_lm(prompt):
+        calls.append(prompt)
+        if prompt == "boom":
+            raise RuntimeError("rate limited")
+        return f"proposal for {prompt!r}"
+
+    lm = ae.CachedLM(stub_lm, "openai/gpt-4o", ae.LMCache(tmp_path))
+    messages = [{"role": "user", "content": "improve"}]
+    assert lm("improve") == lm("improve") == "proposal for 'improve'"
+    assert lm(messages) == f"proposal for {messages!r}"
+    with pytest.raises(RuntimeError):
+        lm("boom")
+    assert calls == ["improve", messages, "boom"]
+
+    replay = ae.CachedLM(stub_lm, "openai/gpt-4o", ae.LMCache(tmp_path))
+    assert replay("improve") == "proposal for 'improve'"
+    assert replay(list(messages)) == f"proposal for {messages!r}"
+    other_model = ae.CachedLM(stub_lm, "openai/gpt-4o-mini", ae.LMCache(tmp_path))
+    other_model("improve")
+    assert calls == ["improve", messages, "boom", "improve"]
+
+
+@pytest.fixture
+def fake_gepa(monkeypatch):
+    """Install a minimal gepa.optimize_anything that records its config."""
+    oa = types.ModuleType("gepa.optimize_anything")
+    oa.runs = []
+    oa.GEPAConfig = lambda **kw: kw
+    oa.EngineConfig = lambda **kw: kw
+    oa.ReflectionConfig = lambda **kw: kw
+    oa.log = lambda message: None
+
+    def optimize_anything(seed_candidate, evaluator, dataset, objective, background, config):
+        oa.runs.append(config)
+        proposal = config["reflection"]["reflection_lm"](f"Improve:\n{seed_candidate}")
+        score, _ = evaluator(proposal, dataset[0])
+        return types.SimpleNamespace(best_candidate=proposal, best_score=score)
+
+    oa.optimize_anything = optimize_anything
+    gepa = types.ModuleType("gepa")
+    gepa.optimize_anything = oa
+    monkeypatch.setitem(sys.modules, "gepa", gepa)
+    monkeypatch.setitem(sys.modules, "gepa.optimize_anything", oa)
+    return oa
+
+
+def test_optimize_checkpoints_to_run_dir_and_resumes(tmp_path, fake_gepa):
+    skills_dir, tests_dir = make_tree(tmp_path)
+    run_dir = tmp_path / "runs" / "azure-deploy"
+    calls = []
+    stub_lm = lambda prompt: calls.append(prompt) or SKILL_MD + "\n## Steps\n1. Deploy.\n"
+    optimize = lambda **kw: ae.optimize_skill(
+        "azure-deploy", skills_dir, tests_dir, 10, lm=stub_lm,
+        lm_cache=ae.LMCache(tmp_path / "cache"), run_dir=run_dir, **kw)
+
+    first = optimize()
+    assert fake_gepa.runs[-1]["engine"] == {"max_metric_calls": 10, "run_dir": str(run_dir)}
+    assert json.loads((run_dir / "run.json").read_text())["skill"] == "azure-deploy"
+    assert json.loads((run_dir / "result.json").read_text())["optimized"] == first["optimized"]
+
+    assert "pass --resume" in optimize()["error"]
+    resumed = optimize(resume=True)
+    assert resumed["optimized"] == first["optimized"]
+    assert len(calls) == 1  # the rerun replayed the cached proposal
+
+    (skills_dir / "azure-deploy" / "SKILL.md").write_text(SKILL_MD + "\nedited\n")
+    assert "seed_sha256 changed" in optimize(resume=True)["error"]
+    assert "No run to resume" in ae.optimize_skill(
+        "azure-deploy", skills_dir, tests_dir, lm=stub_lm, run_dir=tmp_path / "new", resume=True
+    )["error"]
+
+
+def test_stratified_order_prefixes_keep_class_balance():
+    harness = ae.Harness(
+        should_trigger=tuple(f"deploy {i}" for i in range(60)),
+        should_not_trigger=tuple(f"weather {i}" for i in range(20)),
+    )
+    order = ae._stratified_order(harness)
+    assert sorted(p for _, p in order) == sorted(harness.prompts)
+    for k in (4, 8, 20, 40):
+        assert sum(not expected for expected, _ in order[:k]) == k // 4
+    assert ae._stage_sizes(80, 0.125) == [10, 20, 40, 80]
+    assert ae._stage_sizes(6, 0.125) == [6]
+
+
+def test_staged_evaluator_prunes_weak_candidates_without_changing_winner(tmp_path, monkeypatch):
+    _, tests_dir = make_tree(tmp_path)
+    should = [f"Deploy my app number {i} to Azure" for i in range(48)]
+    should_not = [f"What is the weather on day {i}?" for i in range(16)]
+    (tests_dir / "azure-deploy" / "triggers.test.ts").write_text(
+        "const shouldTriggerPrompts = [\n" + "".join(f"  '{p}',\n" for p in should) + "];\n"
+        "const shouldNotTriggerPrompts = [\n" + "".join(f"  '{p}',\n" for p in should_not) + "];\n"
+    )
+    weak = SKILL_MD.replace("Deploy applications to Azure. USE FOR: deploy, publish.", "Helps.")
+    candidates = [SKILL_MD] + [weak + f"\n<!-- {i} -->\n" for i in range(9)] + [SKILL_MD + "\nmore\n"]
+
+    checks = []
+    real_match = ae.TriggerMatcher.match
+    monkeypatch.setattr(ae.TriggerMatcher, "match", lambda self, p: checks.append(p) or real_match(self, p))
+
+    full, _ = ae.build_evaluator("azure-deploy", tests_dir)
+    full_scores = [full(c, {})[0] for c in candidates]
+    full_checks = len(checks)
+    checks.clear()
+
+    staged, _ = ae.build_evaluator("azure-deploy", tests_dir, stage_margin=0.05)
+    results = [staged(c, {}) for c in candidates]
+    staged_scores = [score for score, _ in results]
+
+    assert staged_scores.index(max(staged_scores)) == full_scores.index(max(full_scores))
+    assert len(checks) * 3 < full_checks
+    assert results[0][1]["Staging"].startswith("promoted to all 64 prompts: no fully scored")
+    assert all(asi["Staging"].startswith("pruned after 8/64 prompts") for _, asi in results[1:-1])
+    assert all(s < max(full_scores) for s in staged_scores[1:-1])
+    assert results[-1][1]["Staging"].startswith("promoted to all 64 prompts: partial score")
+    assert staged(candidates[1], {"prompt": should[0]}) == results[1]
+
+    with pytest.raises(ValueError, match="suite"):
+        ae.build_evaluator("azure-deploy", tests_dir, mode="example", stage_margin=0.1)
+
+
+@pytest.mark.parametrize("flag", [["--stage-fraction", "0"], ["--stage-fraction", "1.5"],
+                                  ["--stage-margin", "-0.1"], ["--stage-margin", "nan"]])
+def test_optimize_rejects_bad_staging_flags(monkeypatch, capsys, flag):
+    monkeypatch.setattr(sys, "argv", ["auto_evaluator.py", "optimize", "--skill", "x",
+                                      "--eval-mode", "suite", *flag])
+    with pytest.raises(SystemExit) as exc:
+        ae.main()
+    assert exc.value.code == 2
+    assert f"argument {flag[0]}" in capsys.readouterr().err
+
+
+def test_allocate_budget_favours_low_scores():
+    scores = [
+        {"skill": "good", "quality_score": 1.0, "trigger_accuracy": 1.0},
+        {"skill": "weak", "quality_score": 0.4, "trigger_accuracy": 0.5},
+        {"skill": "fair", "quality_score": 0.8, "trigger_accuracy": None},
+    ]
+    budget = ae.allocate_budget(scores, 100)
+    assert sum(budget.values()) == 100
+    assert budget["weak"] > budget["fair"] > budget["good"] >= ae.MIN_SKILL_BUDGET
+    assert ae.allocate_budget(scores, 25) == {"weak": 14, "fair": 11, "good": 0}
+    assert ae.allocate_budget(scores, 0) == {"weak": 0, "fair": 0, "good": 0}
+    with pytest.raises(ValueError, match=">= 0"):
+        ae.allocate_budget(scores, -5)
+    with pytest.raises(ValueError, match="lm_concurrency"):
+        next(ae.optimize_all(Path("skills"), Path("tests"), 10, lm_concurrency=0))
+
+
+@pytest.mark.parametrize("command, flag", [
+    ("optimize-all", ["--budget", "-5"]), ("optimize-all", ["--jobs", "0"]),
+    ("optimize-all", ["--jobs", "-1"]), ("optimize-all", ["--lm-concurrency", "0"]),
+    ("optimize-all", ["--lm-concurrency", "x"]), ("score-all", ["--jobs", "0"]),
+])
+def test_cli_rejects_bad_limits(monkeypatch, capsys, command, flag):
+    monkeypatch.setattr(sys, "argv", ["auto_evaluator.py", command, *flag])
+    with pytest.raises(SystemExit) as exc:
+        ae.main()
+    assert exc.value.code == 2
+    assert f"argument {flag[0]}" in capsys.readouterr().err
+
+
+def test_optimize_all_runs_skills_concurrently_and_streams(tmp_path, fake_gepa):
+    skills_dir, tests_dir = make_tree(tmp_path, skills=("s0", "s1", "s2", "s3"))
+    (skills_dir / "s3" / "SKILL.md").write_text("---\nname: s3\ndescription: Short.\n---\nBody\n")
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+    # Each LM call waits for a second one to arrive, so the run only
+    # completes if two skills' calls overlap.
+    pair = threading.Barrier(2, timeout=10)
+
+    def paired_lm(prompt):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        pair.wait()
+        with lock:
+            in_flight[0] -= 1
+        return prompt.removeprefix("Improve:\n")
+
+    results = list(ae.optimize_all(
+        skills_dir, tests_dir, budget=60, lm_concurrency=2, lm=paired_lm,
+        run_dir=tmp_path / "runs",
+    ))
+
+    assert sorted(r["skill"] for r in results) == ["s0", "s1", "s2", "s3"]
+    assert sum(r["budget"] for r in results) == 60
+    assert max(results, key=lambda r: r["budget"])["skill"] == "s3"
+    assert all("optimized" in r and "baseline_score" in r for r in results)
+    assert peak[0] == 2
+    assert (tmp_path / "runs" / "s0" / "result.json").exists()
+
+
+def test_shards_partition_skills_stably():
+    names = [f"skill-{i:04d}" for i in range(300)]
+    shards = {n: ae.shard_of(n, 4) for n in names}
+    assert set(shards.values()) == {1, 2, 3, 4}
+    assert min(list(shards.values()).count(i) for i in range(1, 5)) > 50
+    assert ae.shard_of("skill-0000", 4) == 1  # pinned: assignments must not drift
+    assert ae.parse_shard("2/4") == (2, 4)
+    for bad in ("0/4", "5/4", "2", "a/b"):
+        with pytest.raises(ValueError):
+            ae.parse_shard(bad)
+
+
+def test_ndjson_output_exits_quietly_when_the_reader_closes(tmp_path):
+    skills_dir, tests_dir = make_tree(tmp_path, skills=[f"skill-{i:03d}" for i in range(300)])
+    proc = subprocess.Popen(
+        [sys.executable, str(Path(ae.__file__)), "score-all", "--format", "ndjson", "--jobs", "1",
+         "--no-cache", "--skills-dir", str(skills_dir), "--tests-dir", str(tests_dir)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    assert json.loads(proc.stdout.readline())["skill"] == "skill-000"
+    proc.stdout.close()
+    stderr = proc.stderr.read().decode()
+    proc.wait(timeout=60)
+    assert proc.returncode == 1
+    assert "Traceback" not in stderr and "BrokenPipeError" not in stderr
+
+
+def test_merge_of_shards_matches_single_node(tmp_path, monkeypatch, capsys):
+    names = [f"skill-{i}" for i in range(12)]
+    skills_dir, tests_dir = make_tree(tmp_path, skills=names)
+    single = ae.score_all(skills_dir, tests_dir, jobs=1)
+
+    paths = []
+    for i in (1, 2, 3):
+        part = ae.score_all(skills_dir, tests_dir, jobs=1, shard=(i, 3))
+        path = tmp_path / f"shard-{i}"
+        fmt = "json" if i == 2 else "ndjson"
+        ae._emit_scores(iter(part), fmt)
+        path.write_text(capsys.readouterr().out)
+        paths.append(str(path))
+    merged = list(ae.sort_scores(ae._read_score_inputs(paths), "score"))
+    assert merged == list(ae.sort_scores(iter(single), "score"))
+
+    with pytest.raises(ValueError, match="more than one input"):
+        list(ae._read_score_inputs(paths + paths[:1]))
+
+    missing = str(tmp_path / "shard-4")
+    monkeypatch.setattr(sys, "argv", ["auto_evaluator.py", "merge-scores", *paths, missing])
+    with pytest.raises(SystemExit) as exc:
+        ae.main()
+    assert exc.value.code == 2
+    assert f"can't open '{missing}'" in capsys.readouterr().err
+
+
+def test_since_rescores_only_changed_skills_and_merges_baseline(tmp_path, monkeypatch):
+    if shutil.which("git") is None:
+        pytest.skip("git not installed")
+    names = ["azure-deploy", "azure-publish", "azure-ship", "azure-storage"]
+    skills_dir, tests_dir = make_tree(tmp_path, skills=names)
+
+    def git(*args):
+        subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                       cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q")
+    git("add", "-A")
+    git("commit", "-qm", "base")
+    baseline = {r.skill: r.to_dict() for r in ae.score_all(skills_dir, tests_dir, jobs=1)}
+
+    (skills_dir / "azure-deploy" / "SKILL.md").write_text(SKILL_MD.replace("## Steps", "## Notes"))
+    (tests_dir / "azure-publish" / "unit.test.ts").write_text("")
+    git("rm", "-rq", "skills/azure-ship")
+    git("commit", "-qm", "change")
+    (skills_dir / "azure-new").mkdir()
+    (skills_dir / "azure-new" / "SKILL.md").write_text(SKILL_MD)
+
+    changed = ae.skills_changed_since("HEAD~1", skills_dir, tests_dir)
+    assert changed == {"azure-deploy", "azure-publish", "azure-ship", "azure-new"}
+    with pytest.raises(ValueError, match="git diff failed"):
+        ae.skills_changed_since("no-such-rev", skills_dir, tests_dir)
+
+    names = ae.list_skills(skills_dir)
+    rescore = ae.skills_to_rescore(names, baseline, changed)
+    assert rescore == ["azure-deploy", "azure-new", "azure-publish"]
+    scored = []
+    real = ae.score_skill
+    monkeypatch.setattr(ae, "score_skill", lambda name, *a: scored.append(name) or real(name, *a))
+    fresh = {r.skill: r.to_dict() for r in ae.iter_scores(skills_dir, tests_dir, jobs=1, skills=rescore)}
+    assert scored == rescore
+    merged = list(ae.merge_baseline(names, fresh.values(), baseline))
+    monkeypatch.undo()
+    assert merged == [r.to_dict() for r in ae.score_all(skills_dir, tests_dir, jobs=1)]
+
+    deltas = {d["skill"]: d for d in ae.score_deltas(baseline, fresh, names)}
+    assert {name: d["status"] for name, d in deltas.items()} == {
+        "azure-deploy": "rescored", "azure-new": "new",
+        "azure-publish": "rescored", "azure-ship": "removed",
+    }
+    assert deltas["azure-deploy"]["delta"] < 0
+    assert deltas["azure-publish"]["delta"] == 0
@@ -0,0 +1,86 @@
+"""Tests for bm25.py (run with: python -m pytest scripts/src/gepa)."""
+
+import json
+import sys
+
+import pytest
+
+import auto_evaluator as ae
+import bm25
+from test_auto_evaluator import SKILL_MD, make_tree
+
+
+def test_bm25_weights_rare_terms_and_batches_match_single_prompts():
+    index = bm25.BM25Index({
+        "azure-deploy": "Deploy apps to Azure App Service and Container Apps.",
+        "azure-storage": "Manage Azure storage accounts, blobs and queues.",
+        "azure-cosmos": "Query and model Azure Cosmos DB databases.",
+    })
+    weights = index.weights("azure-deploy", "Deploy apps to Azure App Service and Container Apps.")
+    assert weights["deploy"] > weights["azure"] > 0  # "azure" is in every document
+
+    matcher = index.matcher("azure-deploy", "Deploy apps to Azure App Service and Container Apps.")
+    prompts = ["Deploy my container to Azure", "What's in my Azure blob storage?",
+               "", "the and for", "deploying deployed deploys"]
+    batch = bm25.PromptBatch(prompts)
+    scores = matcher.scores(batch)
+    for prompt, score in zip(prompts, scores):
+        expected = sum(weights.get(t, 0.0) for t in set(bm25.bm25_terms(prompt)))
+        assert score == pytest.approx(expected)
+    assert matcher.match_many(prompts) == [matcher.match(p) for p in prompts]
+    triggered, matched, confidence = matcher.match(prompts[0])
+    assert matched == ["deploy", "container", "azure"]
+    assert triggered == (confidence >= 0.5) == (scores[0] >= matcher.threshold)
+
+
+def test_bm25_batches_with_empty_prompts_match_single_prompts():
+    index = bm25.BM25Index({
+        "azure-deploy": "Deploy apps to Azure App Service and Container Apps.",
+        "azure-storage": "Manage Azure storage accounts, blobs and queues.",
+    })
+    matcher = index.matcher("azure-deploy", "Deploy apps to Azure App Service and Container Apps.")
+    # Prompts without BM25 terms, in the middle and at the end of the batch.
+    prompts = ["deploy my app to azure", "is it ok?", "azure container service", "", "the and"]
+    assert matcher.match_many(prompts) == [matcher.match(p) for p in prompts]
+    assert matcher.scores(prompts)[0] == matcher.scores(prompts[:1])[0] > 0
+
+
+def test_calibrate_threshold_picks_best_split():
+    assert bm25.calibrate_threshold([0.5, 1.0, 3.0, 4.0], [False, False, True, True]) == 2.0
+    assert bm25.calibrate_threshold([1.0, 2.0, 2.0, 5.0], [False, True, False, True]) == 1.5
+    assert bm25.calibrate_threshold([2.0, 3.0], [True, True]) == 1.0
+
+
+def test_bm25_matcher_in_score_skill_and_evaluator(tmp_path):
+    skills_dir, tests_dir = make_tree(tmp_path, skills=("azure-deploy", "azure-storage"))
+    index = bm25.BM25Index.from_skills_dir(skills_dir)
+    threshold = bm25.calibrate_bm25(index, skills_dir, tests_dir)
+    assert threshold == index.threshold > 0
+
+    result = ae.score_skill("azure-deploy", skills_dir, tests_dir, bm25=index)
+    assert result.trigger_accuracy == 1.0
+
+    evaluator, _ = ae.build_evaluator("azure-deploy", tests_dir, bm25=index)
+    good, _ = evaluator(SKILL_MD, {})
+    vague = SKILL_MD.replace(
+        "Deploy applications to Azure. USE FOR: deploy, publish. WHEN: user wants to ship an app "
+        "to Azure App Service or Container Apps.", "Helps with things.")
+    bad, asi = evaluator(vague, {})
+    assert bad < good
+    assert "FN:" in asi["TriggerFailures"]
+
+
+def test_bm25_cli_calibrates_threshold_by_default(tmp_path, monkeypatch, capsys):
+    skills_dir, tests_dir = make_tree(tmp_path, skills=("azure-deploy", "azure-storage"))
+    calibrated = bm25.calibrate_bm25(bm25.BM25Index.from_skills_dir(skills_dir), skills_dir, tests_dir)
+    thresholds = []
+    real_score_skill = ae.score_skill
+    monkeypatch.setattr(ae, "score_skill",
+                        lambda *a, **kw: thresholds.append(a[-1].threshold) or real_score_skill(*a, **kw))
+    monkeypatch.setattr(sys, "argv", [
+        "auto_evaluator.py", "score", "--skill", "azure-deploy", "--json", "--no-cache",
+        "--skills-dir", str(skills_dir), "--tests-dir", str(tests_dir), "--matcher", "bm25",
+    ])
+    ae.main()
+    assert thresholds == [calibrated]
+    assert json.loads(capsys.readouterr().out)["trigger_accuracy"] == 1.0
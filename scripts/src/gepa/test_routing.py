@@ -0,0 +1,41 @@
+"""Tests for routing.py (run with: python -m pytest scripts/src/gepa)."""
+
+import random
+
+import auto_evaluator as ae
+import routing
+from test_auto_evaluator import WORDS, make_tree, random_prompt
+
+
+def test_skill_router_matches_per_skill_check_trigger():
+    rng = random.Random(17)
+    keyword_sets = {
+        f"skill-{i}": sorted({rng.choice(WORDS) for _ in range(rng.randint(1, 8))}) for i in range(30)
+    }
+    router = routing.SkillRouter(keyword_sets)
+    for _ in range(300):
+        prompt = random_prompt(rng)
+        expected = []
+        for name, keywords in keyword_sets.items():
+            triggered, matched, conf = ae.check_trigger(prompt, keywords)
+            if triggered:
+                expected.append((-conf, -len(matched), name, matched))
+        expected.sort()
+        assert router.candidates(prompt) == [(name, m, -c) for c, _, name, m in expected]
+        assert router.route(prompt) == (expected[0][2] if expected else None)
+
+
+def test_confusion_matrix_reports_collisions(tmp_path):
+    skills_dir, tests_dir = make_tree(tmp_path, skills=("azure-deploy", "azure-publish"))
+    result = routing.confusion_matrix(skills_dir, tests_dir)
+    # Same description, so each skill wins only the prompt naming its own verb.
+    assert result["matrix"] == {
+        "azure-deploy": {"azure-deploy": 1, "azure-publish": 1},
+        "azure-publish": {"azure-deploy": 1, "azure-publish": 1},
+    }
+    deploy, publish = result["report"]
+    assert deploy["stolen_by"] == deploy["steals_from"] == {"azure-publish": 1}
+    assert deploy["overlaps"] == {"azure-publish": 1}
+    assert (deploy["correct"], deploy["unrouted"], deploy["accuracy"]) == (1, 0, 0.5)
+    assert publish["stolen_by"] == {"azure-deploy": 1}
+    assert (result["prompts"], result["correct"], result["accuracy"]) == (4, 2, 0.5)
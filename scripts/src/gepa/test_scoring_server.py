@@ -0,0 +1,62 @@
+"""Tests for scoring_server.py (run with: python -m pytest scripts/src/gepa)."""
+
+import json
+import os
+import time
+
+import auto_evaluator as ae
+import scoring_server
+from test_auto_evaluator import SKILL_MD, make_tree
+
+
+def rpc(session, method, request_id=1, **params):
+    request = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+    return json.loads(scoring_server.handle_rpc(session, json.dumps(request)))
+
+
+def test_scoring_session_memoizes_until_files_change(tmp_path, monkeypatch):
+    skills_dir, tests_dir = make_tree(tmp_path, skills=("azure-deploy", "azure-publish"))
+    old = time.time() - 60
+    for f in list(skills_dir.rglob("*")) + list(tests_dir.rglob("*")):
+        os.utime(f, (old, old))
+    session = scoring_server.ScoringSession(skills_dir, tests_dir)
+    calls = []
+    monkeypatch.setattr(scoring_server, "score_skill", lambda *a: calls.append(a[0]) or ae.SkillScore(a[0], error="stub"))
+
+    assert rpc(session, "score", skill="azure-deploy")["result"] == {"skill": "azure-deploy", "error": "stub"}
+    rpc(session, "score", skill="azure-deploy")
+    rpc(session, "score_all", sort="name")
+    assert calls == ["azure-deploy", "azure-publish"]
+
+    skill_md = skills_dir / "azure-deploy" / "SKILL.md"
+    skill_md.write_text(SKILL_MD + "\nMore.\n")
+    os.utime(skill_md, (old + 1, old + 1))
+    rpc(session, "score_all")
+    assert calls == ["azure-deploy", "azure-publish", "azure-deploy"]
+
+
+def test_scoring_session_rpc_methods_and_errors(tmp_path):
+    skills_dir, tests_dir = make_tree(tmp_path)
+    session = scoring_server.ScoringSession(skills_dir, tests_dir)
+    result = rpc(session, "check_trigger", skill="azure-deploy", prompt="Deploy my app to Azure")["result"]
+    keywords = ae.extract_keywords("azure-deploy", ae.parse_frontmatter(SKILL_MD)[1][:1000])
+    assert tuple(result.values()) == ae.check_trigger("Deploy my app to Azure", keywords)
+
+    evaluator, _ = ae.build_evaluator("azure-deploy", tests_dir)
+    score, asi = evaluator(SKILL_MD, {})
+    assert rpc(session, "evaluate_candidate", skill="azure-deploy", candidate=SKILL_MD)["result"] \
+        == {"score": score, "asi": asi}
+
+    assert rpc(session, "nope")["error"]["code"] == -32601
+    assert rpc(session, "score", skil="azure-deploy")["error"]["code"] == -32602
+    assert rpc(session, "score", skill="../etc")["error"]["code"] == -32602
+    assert rpc(session, "score", skill="azure-deploy", test_files={})["error"]["code"] == -32602
+    assert rpc(session, "score_all", sort="bogus")["error"]["code"] == -32602
+    assert rpc(session, "check_trigger", prompt="hi", skill="azure-deploy", keywords=["a"])["error"]["code"] \
+        == -32602
+    assert rpc(session, "evaluate_candidate", skill="azure-deploy", candidate=SKILL_MD, mode="x")["error"]["code"] \
+        == -32602
+    assert rpc(session, "check_trigger", prompt="hi", skill="missing")["error"]["code"] == -32000
+    assert json.loads(scoring_server.handle_rpc(session, "{oops"))["error"]["code"] == -32700
+    notification = {"jsonrpc": "2.0", "method": "score", "params": {"skill": "azure-deploy"}}
+    assert scoring_server.handle_rpc(session, json.dumps(notification)) is None
@@ -0,0 +1,33 @@
+"""Tests for token_budget.py (run with: python -m pytest scripts/src/gepa)."""
+
+import json
+from pathlib import Path
+
+import auto_evaluator as ae
+import token_budget
+
+TOKEN_FIXTURES = Path(__file__).parent / "fixtures" / "token_parity"
+
+
+def test_token_counts_match_ts_counter():
+    # expected.json was produced by the TS counting functions (tokens/commands/
+    # types.ts, utils.ts) run under Node on these fixtures.
+    expected = json.loads((TOKEN_FIXTURES / "expected.json").read_text())
+    for name, counts in expected["files"].items():
+        path = TOKEN_FIXTURES / name
+        assert token_budget.count_file_tokens(path) == counts, name
+        text = path.read_bytes().decode("utf-8")
+        assert token_budget.estimate_tokens(text) == counts["tokens"], name
+        with ae.SkillDocument(path) as doc:
+            assert doc.tokens() == counts["tokens"], name
+
+
+def test_token_limits_match_ts_resolution():
+    expected = json.loads((TOKEN_FIXTURES / "expected.json").read_text())["limits"]
+    configs = {
+        "repo": token_budget.TokenLimits.load(TOKEN_FIXTURES, Path("token-limits.json")),
+        "defaults": token_budget.TokenLimits.load(TOKEN_FIXTURES / "missing"),
+    }
+    for label, limits in configs.items():
+        for path, (limit, pattern) in expected[label].items():
+            assert limits.limit_for(path) == (limit, pattern), (label, path)
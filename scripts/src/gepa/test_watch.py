@@ -0,0 +1,76 @@
+"""Tests for watch.py (run with: python -m pytest scripts/src/gepa)."""
+
+import io
+import json
+
+import pytest
+
+import auto_evaluator as ae
+import scoring_server
+import watch
+from test_auto_evaluator import SKILL_MD, TRIGGERS_TS, make_tree
+
+
+class FakeWatcher:
+    """Replays batches of changed paths, then stops watch_scores like Ctrl-C."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+
+    def read(self, timeout):
+        if timeout is not None:
+            return set()
+        if not self.batches:
+            raise KeyboardInterrupt
+        return self.batches.pop(0)()
+
+    def close(self):
+        pass
+
+
+def test_watch_scores_emits_deltas_for_changed_skills(tmp_path):
+    skills_dir, tests_dir = make_tree(tmp_path, skills=("azure-deploy", "azure-publish", "azure-ship"))
+    skill_md = skills_dir / "azure-deploy" / "SKILL.md"
+
+    def edit():
+        skill_md.write_text(SKILL_MD.replace("## Steps", "## Notes"))
+        return {skill_md, tests_dir / "azure-publish" / "triggers.test.ts"}
+
+    def remove():
+        (skills_dir / "azure-ship" / "SKILL.md").unlink()
+        (skills_dir / "azure-ship").rmdir()
+        return {skills_dir / "azure-ship"}
+
+    out = io.StringIO()
+    session = scoring_server.ScoringSession(skills_dir, tests_dir)
+    watch.watch_scores(session, "ndjson", jobs=1, watcher=FakeWatcher([edit, remove]), out=out)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["skill"] for r in lines[:3]] == ["azure-deploy", "azure-publish", "azure-ship"]
+    assert lines[3] == ae.score_skill("azure-deploy", skills_dir, tests_dir).to_dict()
+    assert lines[3]["quality_detail"]["has_steps"] == 0.0
+    assert lines[4]["skill"] == "azure-publish"
+    assert lines[5] == {"skill": "azure-ship", "removed": True}
+    assert len(lines) == 6
+
+
+@pytest.mark.parametrize("kind", ["inotify", "poll"])
+def test_watchers_report_changed_skills(tmp_path, kind):
+    skills_dir, tests_dir = make_tree(tmp_path, skills=("azure-deploy", "azure-publish"))
+    if kind == "inotify":
+        try:
+            watcher = watch.InotifyWatcher([skills_dir, tests_dir])
+        except OSError:
+            pytest.skip("inotify unavailable")
+    else:
+        watcher = watch.PollingWatcher([skills_dir, tests_dir], interval=0.01)
+    try:
+        (tests_dir / "azure-publish" / "nested").mkdir()
+        (tests_dir / "azure-publish" / "nested" / "triggers.test.ts").write_text(TRIGGERS_TS)
+        (tests_dir / "node_modules").mkdir()
+        changed = set()
+        for batch in watch.watch_changes(watcher, debounce=0.05):
+            changed |= batch
+            break
+        assert ae.changed_skills(changed, skills_dir, tests_dir) == {"azure-publish"}
+    finally:
+        watcher.close()
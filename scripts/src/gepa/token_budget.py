@@ -0,0 +1,171 @@
+"""
+Token budget for the GEPA auto-evaluator.
+
+A port of the counting rules of the TypeScript tokens CLI
+(scripts/src/tokens/commands/types.ts and utils.ts), so the evaluator can
+score token cost without shelling out to Node.
+"""
+
+import functools
+import json
+import re
+import sys
+from pathlib import Path
+
+
+CHARS_PER_TOKEN = 4
+TOKEN_LIMITS_FILE = ".token-limits.json"
+
+# DEFAULT_LIMITS in types.ts, used when there is no .token-limits.json.
+DEFAULT_TOKEN_LIMITS = {
+    "defaults": {
+        "SKILL.md": 500,
+        "references/**/*.md": 1000,
+        "docs/**/*.md": 1500,
+        "*.md": 2000,
+    },
+    "overrides": {
+        "README.md": 3000,
+        "CONTRIBUTING.md": 2500,
+    },
+}
+
+# UTF-8 continuation bytes, and lead bytes of 4-byte sequences (characters
+# that take two UTF-16 code units).
+_UTF8_CONTINUATION = bytes(range(0x80, 0xC0))
+_UTF8_ASTRAL_LEAD = bytes(range(0xF0, 0xF8))
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate tokens like ``estimateTokens`` in the TS CLI (~4 chars/token).
+
+    Characters are counted as JavaScript does, in UTF-16 code units.
+    """
+    return -(-utf16_length(text) // CHARS_PER_TOKEN)
+
+
+def utf16_length(text: "str | bytes") -> int:
+    """Return JavaScript's ``string.length`` for text, or for UTF-8 bytes.
+
+    Bytes are measured without decoding: one unit per character plus one
+    more for each character outside the Basic Multilingual Plane.
+    """
+    if isinstance(text, str):
+        return len(text.encode("utf-16-le", "surrogatepass")) // 2
+    data = bytes(text)
+    astral = len(data) - len(data.translate(None, _UTF8_ASTRAL_LEAD))
+    return len(data.translate(None, _UTF8_CONTINUATION)) + astral
+
+
+def count_file_tokens(path: Path) -> dict:
+    """Count a file like ``countFile`` in the TS CLI: tokens, characters, lines.
+
+    Newlines are counted as stored (no \\r\\n translation), as Node reads them.
+    """
+    data = Path(path).read_bytes()
+    characters = utf16_length(data)
+    lines = data.count(b"\n") + 1
+    return {"tokens": -(-characters // CHARS_PER_TOKEN), "characters": characters, "lines": lines}
+
+
+class TokenLimits:
+    """Token limits from a ``.token-limits.json`` config, resolved per file.
+
+    Matches ``getLimitForFile`` in the TS CLI: overrides match a path or a
+    path suffix exactly; otherwise the most specific matching default glob
+    wins. Lookups are memoized by path.
+    """
+
+    def __init__(self, config: dict = DEFAULT_TOKEN_LIMITS):
+        self.config = config
+        self.overrides = dict(config.get("overrides") or {})
+        self.defaults = sorted(
+            config["defaults"].items(), key=lambda item: -_pattern_specificity(item[0])
+        )
+        self._limits: dict[str, tuple[int, str]] = {}
+
+    @classmethod
+    def load(cls, root: Path = Path("."), config_path: Path | None = None) -> "TokenLimits":
+        """Load limits like ``loadConfig`` in the TS CLI.
+
+        Reads ``config_path`` (relative to ``root``) or ``root/.token-limits.json``.
+        A missing or invalid default config falls back to the CLI defaults;
+        a missing or invalid explicit one raises ValueError.
+        """
+        path = Path(root) / (config_path or TOKEN_LIMITS_FILE)
+        if not path.exists():
+            if config_path:
+                raise ValueError(f"Token limits config not found: {path}")
+            return cls()
+        try:
+            config = json.loads(path.read_text())
+            if not isinstance(config.get("defaults"), dict):
+                raise ValueError('Missing or invalid "defaults" field')
+        except (OSError, ValueError, AttributeError) as e:
+            if config_path:
+                raise ValueError(f"Invalid token limits config at {path}: {e}") from None
+            print(f"⚠️  Warning: Invalid {TOKEN_LIMITS_FILE} ({e}), using defaults", file=sys.stderr)
+            return cls()
+        return cls(config)
+
+    def limit_for(self, file_path: "str | Path") -> tuple[int, str]:
+        """Return (limit, matching pattern) for a path relative to the root."""
+        path = str(file_path).replace("\\", "/")
+        cached = self._limits.get(path)
+        if cached is None:
+            cached = self._limits[path] = self._resolve(path)
+        return cached
+
+    def _resolve(self, path: str) -> tuple[int, str]:
+        for override, limit in self.overrides.items():
+            if path == override or path.endswith("/" + override):
+                return limit, override
+        for pattern, limit in self.defaults:
+            if _matches_glob(path, pattern):
+                return limit, pattern
+        return self.config["defaults"].get("*.md", 2000), "*.md"
+
+    def __getstate__(self):
+        return {"config": self.config}
+
+    def __setstate__(self, state):
+        self.__init__(state["config"])
+
+
+def _pattern_specificity(pattern: str) -> int:
+    """``getPatternSpecificity`` in the TS CLI: higher is more specific."""
+    score = 0
+    if "*" not in pattern:
+        score += 10000
+    score += pattern.count("/") * 100
+    score += len(re.findall(r"(?<!\*)\*(?!\*)", pattern)) * 10
+    score -= len(re.findall(r"\*\*", pattern)) * 50
+    return score + len(pattern)
+
+
+@functools.lru_cache(maxsize=256)
+def _glob_regex(pattern: str) -> re.Pattern:
+    """``globToRegex`` in the TS CLI, translated step by step."""
+    source = (
+        pattern.replace(".", "\\.")
+        .replace("**", "{{GLOBSTAR}}")
+        .replace("*", "[^/]*")
+        .replace("{{GLOBSTAR}}", ".*?")
+        .replace("/", "\\/")
+    )
+    return re.compile(f"(^|\\/){source}$")
+
+
+def _matches_glob(path: str, pattern: str) -> bool:
+    """``matchesPattern`` in the TS CLI."""
+    if "/" not in pattern and "*" not in pattern:
+        return path.endswith("/" + pattern) or path == pattern
+    return _glob_regex(pattern).search(path) is not None
+
+
+def _relative_to_cwd(path: Path) -> Path:
+    """Path relative to the working directory (the TS CLI's default root) when inside it."""
+    try:
+        return Path(path).resolve().relative_to(Path.cwd().resolve())
+    except ValueError:
+        return Path(path)
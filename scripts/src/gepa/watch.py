@@ -0,0 +1,227 @@
+"""
+Watch mode for the GEPA auto-evaluator (``score-all --watch``).
+
+Watches the skills and tests trees (inotify on Linux, mtime polling
+elsewhere) and re-scores only the skills whose files change.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from auto_evaluator import (
+    DEFAULT_TEST_IGNORES,
+    _ignored,
+    _print_score_table,
+    changed_skills,
+    iter_scores,
+    sort_scores,
+)
+from scoring_server import ScoringSession
+
+
+class InotifyWatcher:
+    """Recursive directory watcher on Linux inotify, through ctypes.
+
+    ``read(timeout)`` returns the paths changed since the last call; new
+    subdirectories are watched as they appear. Raises OSError where inotify
+    isn't available.
+    """
+
+    IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE = 0x2, 0x4, 0x8
+    IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x40, 0x80, 0x100, 0x200
+    IN_DELETE_SELF, IN_IGNORED, IN_ISDIR = 0x400, 0x8000, 0x40000000
+    MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+            | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+
+    def __init__(self, roots: list[Path], ignore=DEFAULT_TEST_IGNORES):
+        import ctypes
+        import ctypes.util
+
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+        self.ignore = ignore
+        self._dirs: dict[int, Path] = {}
+        for root in roots:
+            self._watch_tree(Path(root))
+
+    def _watch_tree(self, top: Path):
+        for dirpath, dirnames, _ in os.walk(top):
+            dirnames[:] = [d for d in dirnames if not _ignored(d, self.ignore)]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), self.MASK)
+            if wd >= 0:
+                self._dirs[wd] = Path(dirpath)
+
+    def read(self, timeout: float | None) -> set[Path]:
+        import select
+        import struct
+
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return set()
+        data = b""
+        while True:
+            try:
+                data += os.read(self._fd, 1 << 16)
+            except BlockingIOError:
+                break
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = struct.unpack_from("iIII", data, offset)
+            name = data[offset + 16 : offset + 16 + length].rstrip(b"\0")
+            offset += 16 + length
+            parent = self._dirs.get(wd)
+            if mask & self.IN_IGNORED:
+                self._dirs.pop(wd, None)
+            if parent is None:
+                continue
+            path = parent / os.fsdecode(name) if name else parent
+            if name and _ignored(path.name, self.ignore):
+                continue
+            changed.add(path)
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                self._watch_tree(path)
+                # Files created before the watch was added produced no events.
+                changed.update(path.rglob("*"))
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Portable fallback for ``InotifyWatcher``: compares (mtime, size) snapshots."""
+
+    def __init__(self, roots: list[Path], ignore=DEFAULT_TEST_IGNORES, interval: float = 0.5):
+        self.roots = [Path(r) for r in roots]
+        self.ignore = ignore
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[str, tuple]:
+        snapshot = {}
+        stack = list(self.roots)
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if _ignored(entry.name, self.ignore):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        st = entry.stat(follow_symlinks=False)
+                        snapshot[entry.path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                continue
+        return snapshot
+
+    def read(self, timeout: float | None) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if wait > 0:
+                time.sleep(wait)
+            snapshot = self._scan()
+            old, self._snapshot = self._snapshot, snapshot
+            changed = {Path(p) for p in old.keys() | snapshot.keys() if old.get(p) != snapshot.get(p)}
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(roots: list[Path], ignore=DEFAULT_TEST_IGNORES, poll_interval: float | None = None):
+    """Return an ``InotifyWatcher``, or a ``PollingWatcher`` if inotify is
+    unavailable or ``poll_interval`` is given."""
+    if poll_interval is None:
+        try:
+            return InotifyWatcher(roots, ignore)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots, ignore, poll_interval or 0.5)
+
+
+def watch_changes(watcher, debounce: float = 0.05):
+    """Yield sets of changed paths, merging each burst of changes.
+
+    A batch is yielded once no further change arrives for ``debounce`` seconds.
+    """
+    while True:
+        changed = watcher.read(None)
+        while changed:
+            more = watcher.read(debounce)
+            if not more:
+                break
+            changed |= more
+        if changed:
+            yield changed
+
+
+def watch_scores(
+    session: ScoringSession,
+    fmt: str = "table",
+    sort: str = "score",
+    jobs: int | None = None,
+    watcher=None,
+    debounce: float = 0.05,
+    out=None,
+):
+    """Score every skill, then re-score only the skills whose files change.
+
+    Table output is redrawn after each batch of changes; NDJSON output emits
+    every result once, then one line per re-scored skill and
+    ``{"skill": ..., "removed": true}`` for deleted skills. Runs until
+    interrupted.
+    """
+    out = out or sys.stdout
+    results = {}
+    for result in iter_scores(session.skills_dir, session.tests_dir, jobs, session.harness_cache,
+                              session.ignore, session.rules, session.token_limits,
+                              bm25=session.bm25):
+        results[result.skill] = result
+        if fmt == "ndjson":
+            out.write(json.dumps(result.to_dict()) + "\n")
+    if fmt == "table":
+        _redraw_scores(results, sort, out, "Watching for changes (Ctrl-C to stop)")
+    out.flush()
+
+    watcher = watcher or make_watcher([session.skills_dir, session.tests_dir], session.ignore)
+    try:
+        for paths in watch_changes(watcher, debounce):
+            start = time.perf_counter()
+            rescored = []
+            for skill in sorted(changed_skills(paths, session.skills_dir, session.tests_dir)):
+                if not (session.skills_dir / skill).is_dir():
+                    if results.pop(skill, None) is not None and fmt == "ndjson":
+                        out.write(json.dumps({"skill": skill, "removed": True}) + "\n")
+                    continue
+                results[skill] = session._score(skill)
+                rescored.append(skill)
+                if fmt == "ndjson":
+                    out.write(json.dumps(results[skill].to_dict()) + "\n")
+            if fmt == "table":
+                elapsed = (time.perf_counter() - start) * 1000
+                _redraw_scores(results, sort, out,
+                               f"Re-scored {', '.join(rescored) or 'nothing'} in {elapsed:.1f} ms")
+            out.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def _redraw_scores(results: dict, sort: str, out, status: str):
+    if out.isatty():
+        out.write("\x1b[2J\x1b[H")
+    with redirect_stdout(out):
+        _print_score_table(sort_scores(results.values(), sort))
+        print(f"\n  {status}")